@@ -0,0 +1,172 @@
+# Recherche alpha-beta parallèle à la racine pour le moteur de Content/alpha_beta_play.py
+# Les coups de la racine sont répartis entre les processus d'un pool. La meilleure valeur déjà
+# obtenue à la racine est partagée entre les processus (multiprocessing.Value) : chaque coup est
+# cherché avec cette borne, ce qui garde les coupures de la recherche séquentielle.
+# Chaque processus garde sa propre table de transposition d'une recherche à l'autre et compte
+# ses statistiques dans son propre SearchStats, réunies par pid dans workerStats.
+# Utilisation :
+#     with ParallelSearch(4) as search:
+#         move, value = search.getNextMove(5, board, board.turn == chess.WHITE)
+import multiprocessing
+import os
+import time
+
+import chess
+import chess.polyglot
+
+from Content import alpha_beta_play
+from Content.alpha_beta_play import SearchStats, SearchTimeout
+
+# Borne et numéro d'itération partagés par les processus du pool (définis par initWorker)
+sharedBound = None
+sharedGeneration = None
+
+
+def initWorker(bound, generation):
+    global sharedBound, sharedGeneration
+    sharedBound = bound
+    sharedGeneration = generation
+
+
+# Travail d'un processus : recherche du coup move de la position fen à la profondeur depth
+# Pour les blancs (maximize) la borne partagée est alpha, pour les noirs c'est beta.
+# deadline : échéance absolue (time.monotonic, horloge commune aux processus) ou None
+# generation : numéro de l'itération ; une tâche d'une itération déjà abandonnée n'est pas cherchée
+# Retourne (coup, valeur, valeur exacte ?, recherche terminée ?, pid, statistiques)
+def searchMove(task):
+    fen, moveUci, depth, maximize, deadline, generation = task
+    stats = SearchStats()
+    # Tâche restée en attente au-delà de l'échéance ou d'une itération abandonnée
+    if(generation != sharedGeneration.value or (deadline is not None and time.monotonic() >= deadline)):
+        return (moveUci, None, False, False, os.getpid(), stats)
+    board = chess.Board(fen)
+    move = chess.Move.from_uci(moveUci)
+    start = time.perf_counter()
+    alpha = -10000
+    beta = 10000
+    bound = sharedBound.value
+    if(maximize):
+        alpha = bound
+    else:
+        beta = bound
+    score = alpha_beta_play.eval(board)
+    key = chess.polyglot.zobrist_hash(board)
+    childScore, childKey = alpha_beta_play.pushMove(board, move, score, key)
+    stats.nodes += 1
+    if(deadline is not None):
+        # searchDeadline est exprimée avec time.perf_counter dans alpha_beta_play
+        alpha_beta_play.searchDeadline = time.perf_counter() + (deadline - time.monotonic())
+    try:
+        value = alpha_beta_play.alphaBeta(board, depth - 1, alpha, beta, (not maximize), childScore, childKey, stats)
+    except SearchTimeout:
+        stats.searchTime = time.perf_counter() - start
+        return (moveUci, None, False, False, os.getpid(), stats)
+    finally:
+        alpha_beta_play.searchDeadline = None
+    stats.searchTime = time.perf_counter() - start
+    # Une valeur qui n'améliore pas la borne n'est qu'une borne : le coup n'est pas meilleur
+    exact = value > alpha if maximize else value < beta
+    if(exact):
+        # Numéro vérifié sous le verrou : un processus en retard ne touche pas la borne de l'itération suivante
+        with sharedGeneration.get_lock(), sharedBound.get_lock():
+            if(generation == sharedGeneration.value and maximize and value > sharedBound.value):
+                sharedBound.value = value
+            if(generation == sharedGeneration.value and not maximize and value < sharedBound.value):
+                sharedBound.value = value
+    return (moveUci, value, exact, True, os.getpid(), stats)
+
+
+class ParallelSearch():
+
+    # numWorkers : nombre de processus (None : nombre de coeurs)
+    def __init__(self, numWorkers=None):
+        if(numWorkers is None):
+            numWorkers = os.cpu_count() or 1
+        self.numWorkers = numWorkers
+        context = multiprocessing.get_context("spawn")
+        self.bound = context.Value("i", 0)
+        self.generation = context.Value("i", 0)
+        self.pool = context.Pool(numWorkers, initializer=initWorker, initargs=(self.bound, self.generation))
+        self.stats = SearchStats()  # Total de la dernière recherche
+        self.workerStats = {}  # pid -> SearchStats de la dernière recherche
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    # Même interface que alpha_beta_play.getNextMove : approfondissement itératif de 1 à depth,
+    # chaque profondeur répartissant les coups de la racine entre les processus
+    # Avec timeLimit, les processus reçoivent une échéance absolue ; à l'échéance, les résultats encore
+    # attendus sont abandonnés et le meilleur coup de la dernière profondeur terminée est retourné
+    # (la profondeur 1 est toujours terminée, pour avoir un coup à jouer)
+    def getNextMove(self, depth, board, maximize, timeLimit=None):
+        if(depth is None):
+            depth = alpha_beta_play.MAX_DEPTH
+        start = time.perf_counter()
+        deadline = None
+        if(timeLimit is not None):
+            deadline = time.monotonic() + timeLimit
+        self.stats = SearchStats()
+        self.workerStats = {}
+        fen = board.fen()
+        # Ordre des coups de la racine : celui de la recherche séquentielle, puis les résultats de l'itération précédente
+        moves = [move.uci() for move in alpha_beta_play.orderMoves(board, None, depth)]
+        bestMove = None
+        bestValue = -9999 if maximize else 9999
+        if(len(moves) == 0):
+            return (bestMove, bestValue)  # Aucun coup légal
+        for d in range(1, depth + 1):
+            iterationDeadline = deadline if d > 1 else None
+            if(iterationDeadline is not None and time.monotonic() >= iterationDeadline):
+                break
+            with self.generation.get_lock(), self.bound.get_lock():
+                self.generation.value += 1
+                generation = self.generation.value
+                self.bound.value = -10000 if maximize else 10000
+            tasks = [(fen, moveUci, d, maximize, iterationDeadline, generation) for moveUci in moves]
+            results = {}
+            complete = True
+            iterationStart = time.perf_counter()
+            iterator = self.pool.imap_unordered(searchMove, tasks)
+            for _ in range(0, len(tasks)):
+                try:
+                    if(iterationDeadline is None):
+                        result = iterator.next()
+                    else:
+                        result = iterator.next(max(0.0, iterationDeadline - time.monotonic()))
+                except multiprocessing.TimeoutError:
+                    complete = False
+                    break
+                (moveUci, value, exact, done, pid, stats) = result
+                self.workerStats.setdefault(pid, SearchStats()).merge(stats)
+                self.stats.merge(stats)  # searchTime, depth et depthTimes sont remplacés par le temps réel
+                complete = complete and done
+                results[moveUci] = (value, exact)
+            if(not complete):
+                # Profondeur interrompue par la limite de temps : on garde la précédente, et les tâches
+                # encore en attente de cette itération ne seront pas cherchées
+                with self.generation.get_lock():
+                    self.generation.value += 1
+                break
+            # Meilleur coup parmi les valeurs exactes, en cas d'égalité le premier dans l'ordre de la racine
+            exactMoves = [m for m in moves if results[m][1]]
+            if(len(exactMoves) == 0):
+                exactMoves = moves
+            if(maximize):
+                best = max(exactMoves, key=lambda m: results[m][0])
+            else:
+                best = min(exactMoves, key=lambda m: results[m][0])
+            bestMove = chess.Move.from_uci(best)
+            bestValue = results[best][0]
+            self.stats.depth = d
+            self.stats.depthTimes[d] = time.perf_counter() - iterationStart
+            # Le meilleur coup est cherché en premier à l'itération suivante pour fixer tôt la borne partagée
+            moves = [best] + [m for m in moves if m != best]
+        self.stats.searchTime = time.perf_counter() - start
+        return (bestMove, bestValue)
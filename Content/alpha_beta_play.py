@@ -1,4 +1,9 @@
+import time
+
 import chess
+import chess.polyglot
+
+from common.search_stats import SearchStats
 
 # Définition de la table de valorisation des pièces
 pieceSquareTable = [
@@ -11,41 +16,177 @@ pieceSquareTable = [
   [ -40,-20,  0,  5,  5,  0,-20,-40 ],
   [ -50,-40,-30,-30,-30,-30,-40,-50 ] ]
 
-# Définition de la fonction d'évaluation de l'échiquier
+# Valeur de chaque type de pièce (le roi n'est pas compté)
+pieceValues = {chess.PAWN: 100, chess.KNIGHT: 310, chess.BISHOP: 320, chess.ROOK: 500, chess.QUEEN: 900}
+
+# Valeur matériel + position de chaque type de pièce sur chaque case (indexée par chess.SQUARES)
+# La table est lue [colonne][rangée] et s'applique aux deux couleurs
+pieceSquareValues = {chess.KING: [0] * 64}
+for pieceType, value in pieceValues.items():
+    pieceSquareValues[pieceType] = [value + pieceSquareTable[chess.square_file(sq)][chess.square_rank(sq)]
+                                    for sq in chess.SQUARES]
+
+# Définition de la fonction d'évaluation de l'échiquier (score des blancs - score des noirs)
+# Calculée à partir des bitboards de python-chess : seules les cases occupées sont parcourues
 def eval(board):
-    scoreWhite = 0
-    scoreBlack = 0
-    for i in range(0,8):
-        for j in range(0,8):
-            squareIJ = chess.square(i,j)
-            pieceIJ = board.piece_at(squareIJ)
-            if str(pieceIJ) == "P":
-                scoreWhite += (100 + pieceSquareTable[i][j])
-            if str(pieceIJ) == "N":
-                scoreWhite += (310 + pieceSquareTable[i][j])
-            if str(pieceIJ) == "B":
-                scoreWhite += (320 + pieceSquareTable[i][j])
-            if str(pieceIJ) == "R":
-                scoreWhite += (500 + pieceSquareTable[i][j])
-            if str(pieceIJ) == "Q":
-                scoreWhite += (900 + pieceSquareTable[i][j])
-            if str(pieceIJ) == "p":
-                scoreBlack += (100 + pieceSquareTable[i][j])
-            if str(pieceIJ) == "n":
-                scoreBlack += (310 + pieceSquareTable[i][j])
-            if str(pieceIJ) == "b":
-                scoreBlack += (320 + pieceSquareTable[i][j])
-            if str(pieceIJ) == "r":
-                scoreBlack += (500 + pieceSquareTable[i][j])
-            if str(pieceIJ) == "q":
-                scoreBlack += (900 + pieceSquareTable[i][j])
-    return scoreWhite - scoreBlack
-
-NODECOUNT = 0
+    score = 0
+    whiteMask = board.occupied_co[chess.WHITE]
+    blackMask = board.occupied_co[chess.BLACK]
+    for pieceType in pieceValues:
+        values = pieceSquareValues[pieceType]
+        mask = board.pieces_mask(pieceType, chess.WHITE) | board.pieces_mask(pieceType, chess.BLACK)
+        for sq in chess.scan_forward(mask & whiteMask):
+            score += values[sq]
+        for sq in chess.scan_forward(mask & blackMask):
+            score -= values[sq]
+    return score
+
+# Variation de l'évaluation produite par un coup, calculée avant board.push(move)
+# (pièce déplacée ou promue, pièce capturée, y compris en passant, et tour du roque)
+def moveDelta(board, move):
+    pieceType = board.piece_type_at(move.from_square)
+    if(pieceType == chess.KING):
+        delta = 0
+        if(board.is_castling(move)):
+            rank = chess.square_rank(move.from_square)
+            if(board.is_kingside_castling(move)):
+                delta = pieceSquareValues[chess.ROOK][chess.square(5, rank)] - pieceSquareValues[chess.ROOK][chess.square(7, rank)]
+            else:
+                delta = pieceSquareValues[chess.ROOK][chess.square(3, rank)] - pieceSquareValues[chess.ROOK][chess.square(0, rank)]
+    else:
+        newType = move.promotion if move.promotion else pieceType
+        delta = pieceSquareValues[newType][move.to_square] - pieceSquareValues[pieceType][move.from_square]
+    if(board.is_en_passant(move)):
+        capturedSquare = chess.square(chess.square_file(move.to_square), chess.square_rank(move.from_square))
+        delta += pieceSquareValues[chess.PAWN][capturedSquare]
+    else:
+        capturedType = board.piece_type_at(move.to_square)
+        if(capturedType is not None):
+            delta += pieceSquareValues[capturedType][move.to_square]
+    if(board.turn == chess.WHITE):
+        return delta
+    return -delta
+
+# Clés de Zobrist (celles de chess.polyglot.zobrist_hash), mises à jour coup par coup dans pushMove
+zobristArray = chess.polyglot.POLYGLOT_RANDOM_ARRAY
+zobristHasher = chess.polyglot.ZobristHasher(zobristArray)
+
+# Clé d'une pièce sur une case (même indexation que chess.polyglot)
+def pieceKey(pieceType, color, square):
+    return zobristArray[64 * ((pieceType - 1) * 2 + color) + square]
+
+# Clé des droits de roque (droits nettoyés par clean_castling_rights)
+def castlingKey(rights):
+    key = 0
+    if(rights & chess.BB_H1):
+        key ^= zobristArray[768]
+    if(rights & chess.BB_A1):
+        key ^= zobristArray[769]
+    if(rights & chess.BB_H8):
+        key ^= zobristArray[770]
+    if(rights & chess.BB_A8):
+        key ^= zobristArray[771]
+    return key
+
+# Joue un coup et retourne l'évaluation et la clé de Zobrist de la nouvelle position
+def pushMove(board, move, score, key):
+    score += moveDelta(board, move)
+    color = board.turn
+    pieceType = board.piece_type_at(move.from_square)
+    key ^= pieceKey(pieceType, color, move.from_square)
+    key ^= pieceKey(move.promotion if move.promotion else pieceType, color, move.to_square)
+    if(board.is_en_passant(move)):
+        key ^= pieceKey(chess.PAWN, not color, chess.square(chess.square_file(move.to_square), chess.square_rank(move.from_square)))
+    else:
+        capturedType = board.piece_type_at(move.to_square)
+        if(capturedType is not None):
+            key ^= pieceKey(capturedType, not color, move.to_square)
+        elif(pieceType == chess.KING and board.is_castling(move)):
+            rank = chess.square_rank(move.from_square)
+            if(board.is_kingside_castling(move)):
+                key ^= pieceKey(chess.ROOK, color, chess.square(7, rank)) ^ pieceKey(chess.ROOK, color, chess.square(5, rank))
+            else:
+                key ^= pieceKey(chess.ROOK, color, chess.square(0, rank)) ^ pieceKey(chess.ROOK, color, chess.square(3, rank))
+    rights = board.castling_rights
+    if(rights):
+        rights = board.clean_castling_rights()
+    if(board.ep_square is not None):
+        key ^= zobristHasher.hash_ep_square(board)
+    board.push(move)
+    if(rights):
+        key ^= castlingKey(rights) ^ castlingKey(board.clean_castling_rights())
+    if(board.ep_square is not None):
+        key ^= zobristHasher.hash_ep_square(board)
+    key ^= zobristArray[780]  # Changement du joueur au trait
+    return score, key
+
+# Table de transposition : clé de Zobrist -> (profondeur, valeur, type de borne, meilleur coup)
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+MAX_TABLE_SIZE = 1000000  # La table est vidée au-delà de ce nombre d'entrées
+MAX_DEPTH = 64  # Profondeur maximale de l'approfondissement itératif avec limite de temps
+transpositionTable = {}
+killerMoves = {}  # Profondeur restante -> deux derniers coups calmes ayant provoqué une coupure
+searchDeadline = None  # Heure (time.perf_counter) à laquelle la recherche doit s'arrêter
+
+# Exception levée quand le temps alloué à la recherche est écoulé
+class SearchTimeout(Exception):
+    pass
+
+# Ordre d'exploration des coups : coup de la table de transposition, captures de la victime la plus
+# forte par l'attaquant le plus faible (MVV-LVA), promotions, coups "killer", puis les autres coups
+def orderMoves(board, ttMove, depth):
+    killers = killerMoves.get(depth, ())
+    priorities = []
+    for move in board.legal_moves:
+        if(move == ttMove):
+            priority = 100000
+        else:
+            victim = board.piece_type_at(move.to_square)
+            if(victim is None and board.is_en_passant(move)):
+                victim = chess.PAWN
+            if(victim is not None):
+                priority = 10000 + 10 * victim - board.piece_type_at(move.from_square)
+            elif(move.promotion):
+                priority = 9000 + move.promotion
+            elif(move in killers):
+                priority = 5000
+            else:
+                priority = 0
+        priorities.append((priority, move))
+    priorities.sort(key=lambda x: x[0], reverse=True)
+    return [move for (_, move) in priorities]
+
+# Enregistre un coup calme qui a provoqué une coupure
+def storeKiller(board, move, depth):
+    if(board.is_capture(move)):
+        return
+    killers = killerMoves.get(depth)
+    if(killers is None):
+        killerMoves[depth] = [move]
+    elif(move not in killers):
+        killers.insert(0, move)
+        del killers[2:]
+
+# Enregistre le résultat d'un noeud avec le type de borne qu'il représente
+def storeEntry(key, depth, value, alpha, beta, bestMove):
+    if(value <= alpha):
+        flag = UPPER_BOUND
+    elif(value >= beta):
+        flag = LOWER_BOUND
+    else:
+        flag = EXACT
+    transpositionTable[key] = (depth, value, flag, bestMove)
+
 # Définition de l'algorithme alpha-beta
-def alphaBeta(board, depth, alpha, beta, maximize):
-    # Initialisation du compteur de nœuds explorés
-    global NODECOUNT
+# score : évaluation de la position courante, tenue à jour coup par coup avec moveDelta
+# (None : calculée avec eval au premier appel)
+# key : clé de Zobrist de la position (None : calculée avec chess.polyglot.zobrist_hash)
+# stats : SearchStats (common.search_stats) où sont comptés les noeuds, coupures et consultations de la table
+def alphaBeta(board, depth, alpha, beta, maximize, score=None, key=None, stats=None):
+    if(stats is None):
+        stats = SearchStats()
     
     # Vérification de la fin de la partie
     if(board.is_checkmate()):
@@ -55,60 +196,153 @@ def alphaBeta(board, depth, alpha, beta, maximize):
             return 1000000
     
     # Évaluation de l'échiquier si la profondeur maximale est atteinte
+    if(score is None):
+        score = eval(board)
     if depth == 0:
-        return eval(board)
-    
-    # Génération des coups légaux
-    legals = board.legal_moves
+        return score
+
+    # Arrêt de la recherche si le temps alloué est écoulé (vérifié à chaque noeud intérieur,
+    # un searchDeadline à 0 interrompt la recherche en cours)
+    if(searchDeadline is not None and time.perf_counter() > searchDeadline):
+        raise SearchTimeout()
+
+    # Consultation de la table de transposition
+    if(key is None):
+        key = chess.polyglot.zobrist_hash(board)
+    ttMove = None
+    entry = transpositionTable.get(key)
+    stats.ttProbes += 1
+    if(entry is not None):
+        entryDepth, value, flag, ttMove = entry
+        if(entryDepth >= depth):
+            if(flag == EXACT):
+                stats.ttHits += 1
+                return value
+            if(flag == LOWER_BOUND):
+                alpha = max(alpha, value)
+            else:
+                beta = min(beta, value)
+            if(alpha >= beta):
+                stats.ttHits += 1
+                return value
+    alphaOrig = alpha
+    betaOrig = beta
+    bestMove = None
     
     # Cas de maximisation
     if(maximize):
         bestVal = -9999
-        for move in legals:
-            board.push(move)
-            NODECOUNT += 1
-            bestVal = max(bestVal, alphaBeta(board, depth-1, alpha, beta, (not maximize)))
+        for move in orderMoves(board, ttMove, depth):
+            childScore, childKey = pushMove(board, move, score, key)
+            stats.nodes += 1
+            value = alphaBeta(board, depth-1, alpha, beta, (not maximize), childScore, childKey, stats)
             board.pop()
+            if(value > bestVal or bestMove is None):
+                bestVal = max(bestVal, value)
+                bestMove = move
             alpha = max(alpha, bestVal)
             if alpha >= beta:
-                return bestVal
-        return bestVal
+                stats.cutoffs += 1
+                storeKiller(board, move, depth)
+                break
     
     # Cas de minimisation
     else:
         bestVal = 9999
-        for move in legals:
-            board.push(move)
-            NODECOUNT += 1
-            bestVal = min(bestVal, alphaBeta(board, depth - 1, alpha, beta, (not maximize)))
+        for move in orderMoves(board, ttMove, depth):
+            childScore, childKey = pushMove(board, move, score, key)
+            stats.nodes += 1
+            value = alphaBeta(board, depth - 1, alpha, beta, (not maximize), childScore, childKey, stats)
             board.pop()
+            if(value < bestVal or bestMove is None):
+                bestVal = min(bestVal, value)
+                bestMove = move
             beta = min(beta, bestVal)
             if beta <= alpha:
-                return bestVal
-        return bestVal
+                stats.cutoffs += 1
+                storeKiller(board, move, depth)
+                break
 
-# Définition de la fonction pour obtenir le prochain coup à jouer
-def getNextMove(depth, board, maximize):
-    legals = board.legal_moves
+    storeEntry(key, depth, bestVal, alphaOrig, betaOrig, bestMove)
+    return bestVal
+
+# Recherche à profondeur fixe depuis la racine, en commençant par le meilleur coup de l'itération précédente
+def searchRoot(board, depth, maximize, score, key, stats):
+    entry = transpositionTable.get(key)
+    ttMove = entry[3] if entry is not None else None
+    alpha = -10000
+    beta = 10000
     bestMove = None
     bestValue = -9999
     if(not maximize):
         bestValue = 9999
-    for move in legals:
-        board.push(move)
-        value = alphaBeta(board, depth-1, -10000, 10000, (not maximize))
+    for move in orderMoves(board, ttMove, depth):
+        childScore, childKey = pushMove(board, move, score, key)
+        stats.nodes += 1
+        value = alphaBeta(board, depth-1, alpha, beta, (not maximize), childScore, childKey, stats)
         board.pop()
         if maximize:
-            if value > bestValue:
+            if value > bestValue or bestMove is None:
                 bestValue = value
                 bestMove = move
+                alpha = max(alpha, value)
         else:
-            if value < bestValue:
+            if value < bestValue or bestMove is None:
                 bestValue = value
                 bestMove = move
+                beta = min(beta, value)
+    transpositionTable[key] = (depth, bestValue, EXACT, bestMove)
+    return (bestMove, bestValue)
+
+# Définition de la fonction pour obtenir le prochain coup à jouer
+# Approfondissement itératif de la profondeur 1 à depth ; avec timeLimit (en secondes), la recherche
+# s'arrête quand le temps est écoulé et retourne le résultat de la dernière profondeur terminée
+# (depth=None : jusqu'à MAX_DEPTH). Les noeuds explorés, la profondeur atteinte et le temps de chaque
+# itération sont comptés dans stats ; ses crochets "iteration" et "search" sont appelés s'il y en a.
+def getNextMove(depth, board, maximize, timeLimit=None, stats=None):
+    global searchDeadline
+    if(stats is None):
+        stats = SearchStats()
+    if(depth is None):
+        depth = MAX_DEPTH
+    start = time.perf_counter()
+    if(len(transpositionTable) > MAX_TABLE_SIZE):
+        transpositionTable.clear()
+    killerMoves.clear()
+    score = eval(board)
+    key = chess.polyglot.zobrist_hash(board)
+    plyCount = len(board.move_stack)
+    bestMove = None
+    bestValue = -9999 if maximize else 9999
+    stats.depth = 0
+    try:
+        for d in range(1, depth + 1):
+            iterationStart = time.perf_counter()
+            bestMove, bestValue = searchRoot(board, d, maximize, score, key, stats)
+            stats.depth = d
+            stats.depthTimes[d] = stats.depthTimes.get(d, 0.0) + time.perf_counter() - iterationStart
+            if(stats.hooks):
+                stats.emit("iteration", depth=d, move=bestMove, value=bestValue)
+            if(bestMove is None):
+                break  # Aucun coup légal
+            # La première itération est toujours terminée pour avoir un coup à jouer
+            if(timeLimit is not None):
+                searchDeadline = start + timeLimit
+                if(time.perf_counter() > searchDeadline):
+                    break
+    except SearchTimeout:
+        # Annuler les coups joués par la recherche interrompue
+        while(len(board.move_stack) > plyCount):
+            board.pop()
+    finally:
+        searchDeadline = None
+    stats.searchTime += time.perf_counter() - start
+    if(stats.hooks):
+        stats.emit("search")
     return (bestMove, bestValue)
 
-def play_chess(depth=3):
+# timeLimit : temps de réflexion de l'ordinateur en secondes (depth devient la profondeur maximale)
+def play_chess(depth=3, timeLimit=None):
     board = chess.Board()  # Initialisation du tableau d'échecs
     player_color = input("Choisissez la couleur des pièces que vous voulez jouer (B/N) : ").upper()
 
@@ -142,7 +376,7 @@ def play_chess(depth=3):
 
         else:
             # Au tour de l'algorithme alpha-beta de jouer
-            best_move, _ = getNextMove(depth, board, board.turn == chess.WHITE)
+            best_move, _ = getNextMove(depth, board, board.turn == chess.WHITE, timeLimit)
             board.push(best_move)
             print("Coup de l'ordinateur : ", best_move)
 
@@ -150,4 +384,5 @@ def play_chess(depth=3):
     print("Fin de la partie")
     print("Le gagnant est : ", board.result())
 
-play_chess()
+if __name__ == "__main__":
+    play_chess()
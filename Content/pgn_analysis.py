@@ -0,0 +1,186 @@
+# Analyse en masse de parties PGN avec la recherche alpha-beta de Content/alpha_beta_play.py
+# Les fichiers PGN sont lus partie par partie (jamais chargés en entier) ; chaque position devient une
+# tâche évaluée par getNextMove sur un pool de processus. Les résultats (FEN, meilleur coup, score du
+# point de vue des blancs, noeuds, profondeur, temps) sont ajoutés au fichier de sortie au fur et à mesure,
+# en JSONL ou en CSV selon l'extension. Relancée sur le même fichier, l'analyse saute les positions
+# déjà présentes et reprend là où elle s'était arrêtée.
+# Utilisation : python -m Content.pgn_analysis partie1.pgn partie2.pgn -o analyse.jsonl --depth 4 --workers 4
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import threading
+import time
+
+import chess
+import chess.pgn
+
+from Content import alpha_beta_play
+from Content.alpha_beta_play import SearchStats
+
+# Colonnes du fichier de sortie
+FIELDS = ("id", "fen", "bestmove", "score", "depth", "nodes", "time")
+
+
+# Tâches d'analyse : (identifiant, FEN) pour chaque position de chaque partie, dans l'ordre des fichiers
+# L'identifiant "fichier:partie:demi-coup" permet de reprendre une analyse interrompue
+def iterTasks(pgnPaths):
+    for path in pgnPaths:
+        with open(path, encoding="utf-8-sig", errors="replace") as f:
+            gameIndex = 0
+            while(True):
+                game = chess.pgn.read_game(f)
+                if(game is None):
+                    break
+                board = game.board()
+                ply = 0
+                for move in game.mainline_moves():
+                    if(not board.is_game_over()):
+                        yield (path + ":" + str(gameIndex) + ":" + str(ply), board.fen())
+                    board.push(move)
+                    ply += 1
+                if(not board.is_game_over()):
+                    yield (path + ":" + str(gameIndex) + ":" + str(ply), board.fen())
+                gameIndex += 1
+
+
+# Évaluation d'une position (exécutée dans un processus du pool)
+# La table de transposition et les coups killer sont vidés à chaque tâche : le résultat d'une position ne
+# dépend pas des positions analysées avant elle par le même processus (une analyse reprise donne les mêmes
+# résultats qu'une analyse complète, à profondeur fixe)
+def analyzePosition(task):
+    taskId, fen, depth, timeLimit = task
+    alpha_beta_play.transpositionTable.clear()
+    alpha_beta_play.killerMoves.clear()
+    board = chess.Board(fen)
+    stats = SearchStats()
+    start = time.perf_counter()
+    move, value = alpha_beta_play.getNextMove(depth, board, board.turn == chess.WHITE, timeLimit, stats)
+    return {"id": taskId, "fen": fen, "bestmove": move.uci() if move is not None else None,
+            "score": value, "depth": stats.depth, "nodes": stats.nodes,
+            "time": round(time.perf_counter() - start, 4)}
+
+
+# Écriture incrémentale des résultats, en JSONL ou en CSV selon l'extension du fichier
+class ResultWriter():
+
+    def __init__(self, path):
+        self.path = path
+        self.isCsv = path.lower().endswith(".csv")
+        # Identifiants des positions lues dans le fichier existant ; les positions analysées pendant cette
+        # exécution n'y sont pas ajoutées (chaque identifiant n'est produit qu'une fois par iterTasks)
+        self.done = set()
+        if(os.path.exists(path)):
+            self.truncatePartialLine()
+            with open(path, newline="", encoding="utf-8") as f:
+                if(self.isCsv):
+                    for row in csv.DictReader(f):
+                        self.done.add(row["id"])
+                else:
+                    for line in f:
+                        self.done.add(json.loads(line)["id"])
+        newFile = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "a", newline="", encoding="utf-8")
+        if(self.isCsv):
+            self.csvWriter = csv.DictWriter(self.file, fieldnames=FIELDS)
+            if(newFile):
+                self.csvWriter.writeheader()
+
+    # Supprime la dernière ligne si l'analyse précédente a été interrompue pendant son écriture
+    def truncatePartialLine(self):
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if(len(data) > 0 and not data.endswith(b"\n")):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def write(self, result):
+        if(self.isCsv):
+            self.csvWriter.writerow(result)
+        else:
+            self.file.write(json.dumps(result) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+# Analyse toutes les positions des fichiers PGN et écrit les résultats dans outputPath
+# Au plus maxPending positions sont en attente dans le pool et seuls les identifiants du fichier repris sont
+# gardés (de moins en moins au fil de la reprise) : la mémoire ne dépend pas de la taille des PGN
+def analyzePgn(pgnPaths, outputPath, depth=4, timeLimit=None, numWorkers=None, maxPending=None):
+    if(numWorkers is None):
+        numWorkers = os.cpu_count() or 1
+    if(maxPending is None):
+        maxPending = 4 * numWorkers
+    writer = ResultWriter(outputPath)
+    skipped = 0
+    analyzed = 0
+
+    # Position déjà dans le fichier de sortie : son identifiant ne reviendra plus, il est retiré de writer.done
+    def alreadyDone(taskId):
+        if(taskId in writer.done):
+            writer.done.discard(taskId)
+            return True
+        return False
+
+    try:
+        if(numWorkers == 1):
+            for taskId, fen in iterTasks(pgnPaths):
+                if(alreadyDone(taskId)):
+                    skipped += 1
+                    continue
+                writer.write(analyzePosition((taskId, fen, depth, timeLimit)))
+                analyzed += 1
+        else:
+            slots = threading.BoundedSemaphore(maxPending)
+            errors = []
+
+            # Appelée par le thread de résultats du pool : écrit le résultat et libère une place
+            def onResult(result):
+                writer.write(result)
+                slots.release()
+
+            def onError(error):
+                errors.append(error)
+                slots.release()
+
+            # "spawn" comme pour common.rnf_selfplay
+            with multiprocessing.get_context("spawn").Pool(numWorkers) as pool:
+                for taskId, fen in iterTasks(pgnPaths):
+                    if(alreadyDone(taskId)):
+                        skipped += 1
+                        continue
+                    slots.acquire()
+                    if(len(errors) > 0):
+                        raise errors[0]
+                    pool.apply_async(analyzePosition, ((taskId, fen, depth, timeLimit),),
+                                     callback=onResult, error_callback=onError)
+                    analyzed += 1
+                pool.close()
+                pool.join()
+            if(len(errors) > 0):
+                raise errors[0]
+    finally:
+        writer.close()
+    return analyzed, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk alpha-beta analysis of PGN files")
+    parser.add_argument("pgn", nargs="+", help="PGN files")
+    parser.add_argument("-o", "--output", default="analysis.jsonl", help="output file (.jsonl or .csv)")
+    parser.add_argument("--depth", type=int, default=4, help="search depth (maximum depth with --time)")
+    parser.add_argument("--time", type=float, default=None, help="search time per position in seconds")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    analyzed, skipped = analyzePgn(args.pgn, args.output, args.depth, args.time, args.workers)
+    elapsed = time.perf_counter() - start
+    print(str(analyzed) + " positions analyzed (" + str(skipped) + " already in " + args.output + ") in "
+          + str(round(elapsed, 2)) + " s (" + str(round(analyzed / max(elapsed, 1e-9), 2)) + " positions/s)")
+
+
+if __name__ == "__main__":
+    main()
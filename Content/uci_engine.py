@@ -0,0 +1,260 @@
+# Moteur UCI autour de la recherche alpha-beta de Content/alpha_beta_play.py
+# Le processus reste actif entre les coups : la table de transposition est conservée d'une recherche
+# à l'autre (vidée par ucinewgame). La recherche tourne dans un thread séparé : le moteur continue de
+# lire les commandes (stop, ponderhit, isready...) pendant qu'il réfléchit.
+# Commandes gérées : uci, isready, ucinewgame, position [startpos | fen ...] [moves ...],
+# go [wtime btime winc binc movestogo movetime depth infinite ponder], stop, ponderhit, quit
+# Utilisation : python -m Content.uci_engine (à déclarer comme moteur dans une interface UCI)
+import sys
+import threading
+import time
+
+import chess
+import chess.polyglot
+
+from Content import alpha_beta_play
+from Content.alpha_beta_play import SearchStats, SearchTimeout
+
+ENGINE_NAME = "Chess_IA alpha-beta"
+ENGINE_AUTHOR = "Chess_IA"
+MOVE_OVERHEAD = 0.05  # Marge (en secondes) pour la communication avec l'interface
+DEFAULT_MOVES_TO_GO = 30  # Nombre de coups restants supposé quand l'interface ne le donne pas
+DEFAULT_PONDERHIT_TIME = 5.0  # Temps (en secondes) après ponderhit quand go ponder ne donnait aucune limite de temps
+MATE_THRESHOLD = 100000  # alphaBeta retourne -100000 / 1000000 pour un mat : au-delà, le score est un mat
+
+
+# Temps de réflexion (en secondes) pour une commande go, None si la recherche n'est pas limitée en temps
+def allocateTime(params, turn):
+    if("movetime" in params):
+        return max(0.01, params["movetime"] / 1000 - MOVE_OVERHEAD)
+    remaining = params.get("wtime" if turn == chess.WHITE else "btime")
+    if(remaining is None):
+        return None
+    increment = params.get("winc" if turn == chess.WHITE else "binc", 0)
+    movesToGo = params.get("movestogo", DEFAULT_MOVES_TO_GO)
+    budget = remaining / max(1, movesToGo) + 0.8 * increment
+    budget = min(budget, remaining / 2)  # Ne jamais engager plus de la moitié du temps restant
+    return max(0.01, budget / 1000 - MOVE_OVERHEAD)
+
+
+# Score UCI d'une valeur vue du camp au trait : "cp <n>", ou "mate <n>" pour un mat
+# (n en coups, négatif quand le camp au trait est maté) ; plies : demi-coups jusqu'au mat
+def uciScore(value, plies):
+    if(abs(value) < MATE_THRESHOLD):
+        return "cp " + str(value)
+    moves = (plies + 1) // 2
+    return "mate " + str(moves if value > 0 else -moves)
+
+
+# Nombre de demi-coups jusqu'au mat en suivant la variante principale, None si elle n'y mène pas
+def matePlies(board, pv):
+    board = board.copy(stack=False)
+    for i, move in enumerate(pv):
+        board.push(move)
+        if(board.is_checkmate()):
+            return i + 1
+    return None
+
+
+class UciEngine():
+
+    def __init__(self, output=None):
+        self.output = output if output is not None else sys.stdout
+        self.outputLock = threading.Lock()
+        self.board = chess.Board()
+        self.thread = None  # Thread de la recherche en cours
+        self.stopRequested = False
+        self.released = threading.Event()  # Fin de l'attente d'une recherche go infinite / go ponder
+        self.pondering = False
+        self.timeLimit = None  # Temps alloué au coup en cours (appliqué à ponderhit pendant la réflexion)
+        self.stats = SearchStats()  # Statistiques de la dernière recherche
+
+    def send(self, line):
+        with self.outputLock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    # Traite une ligne reçue de l'interface ; retourne False pour quit
+    def handle(self, line):
+        tokens = line.split()
+        if(len(tokens) == 0):
+            return True
+        command = tokens[0]
+        if(command == "uci"):
+            self.send("id name " + ENGINE_NAME)
+            self.send("id author " + ENGINE_AUTHOR)
+            self.send("uciok")
+        elif(command == "isready"):
+            self.send("readyok")
+        elif(command == "ucinewgame"):
+            self.stop()
+            alpha_beta_play.transpositionTable.clear()
+        elif(command == "position"):
+            self.stop()
+            self.position(tokens[1:])
+        elif(command == "go"):
+            self.stop()
+            self.go(tokens[1:])
+        elif(command == "stop"):
+            self.stop()
+        elif(command == "ponderhit"):
+            self.ponderhit()
+        elif(command == "quit"):
+            self.stop()
+            return False
+        return True
+
+    # position startpos [moves ...] ou position fen <fen> [moves ...]
+    def position(self, tokens):
+        if(len(tokens) == 0):
+            return
+        if(tokens[0] == "startpos"):
+            board = chess.Board()
+            rest = tokens[1:]
+        elif(tokens[0] == "fen"):
+            end = tokens.index("moves") if "moves" in tokens else len(tokens)
+            board = chess.Board(" ".join(tokens[1:end]))
+            rest = tokens[end:]
+        else:
+            return
+        if(len(rest) > 0 and rest[0] == "moves"):
+            for uci in rest[1:]:
+                board.push_uci(uci)
+        self.board = board
+
+    # Lance la recherche dans un thread ; la réponse bestmove est envoyée à la fin de la recherche
+    def go(self, tokens):
+        params = {}
+        flags = set()
+        i = 0
+        while(i < len(tokens)):
+            if(tokens[i] in ("infinite", "ponder")):
+                flags.add(tokens[i])
+                i += 1
+            elif(i + 1 < len(tokens)):
+                try:
+                    params[tokens[i]] = int(tokens[i + 1])
+                except ValueError:
+                    pass
+                i += 2
+            else:
+                i += 1
+        board = self.board.copy()
+        maxDepth = params.get("depth", alpha_beta_play.MAX_DEPTH)
+        self.timeLimit = None if "infinite" in flags else allocateTime(params, board.turn)
+        self.pondering = "ponder" in flags
+        self.stopRequested = False
+        self.released.clear()
+        waitForStop = "infinite" in flags or self.pondering
+        self.thread = threading.Thread(target=self.search, args=(board, maxDepth, waitForStop), daemon=True)
+        self.thread.start()
+
+    # Interrompt la recherche en cours et attend l'envoi de bestmove
+    def stop(self):
+        if(self.thread is None):
+            return
+        self.stopRequested = True
+        alpha_beta_play.searchDeadline = 0  # alphaBeta lève SearchTimeout au prochain noeud
+        self.released.set()
+        self.thread.join()
+        self.thread = None
+        alpha_beta_play.searchDeadline = None
+
+    # Le coup anticipé a été joué : la réflexion continue avec le temps alloué au coup
+    # (DEFAULT_PONDERHIT_TIME si go ponder ne donnait ni wtime / btime ni movetime)
+    def ponderhit(self):
+        if(not self.pondering):
+            return
+        self.pondering = False
+        if(self.timeLimit is None):
+            self.timeLimit = DEFAULT_PONDERHIT_TIME
+        alpha_beta_play.searchDeadline = time.perf_counter() + self.timeLimit
+        self.released.set()
+
+    # Variante principale lue dans la table de transposition
+    def principalVariation(self, board, key, length):
+        pv = []
+        board = board.copy(stack=False)
+        score = 0
+        while(len(pv) < length):
+            entry = alpha_beta_play.transpositionTable.get(key)
+            if(entry is None or entry[3] is None or not board.is_legal(entry[3])):
+                break
+            move = entry[3]
+            pv.append(move)
+            score, key = alpha_beta_play.pushMove(board, move, score, key)
+        return pv
+
+    # Recherche par approfondissement itératif (exécutée dans le thread de recherche)
+    def search(self, board, maxDepth, waitForStop):
+        start = time.perf_counter()
+        maximize = board.turn == chess.WHITE
+        stats = SearchStats()
+        self.stats = stats
+        alpha_beta_play.killerMoves.clear()
+        if(len(alpha_beta_play.transpositionTable) > alpha_beta_play.MAX_TABLE_SIZE):
+            alpha_beta_play.transpositionTable.clear()
+        score = alpha_beta_play.eval(board)
+        key = chess.polyglot.zobrist_hash(board)
+        bestMove = None
+        # Pendant la réflexion sur le temps de l'adversaire, pas de limite avant ponderhit ou stop
+        if(self.pondering or self.timeLimit is None):
+            alpha_beta_play.searchDeadline = float("inf")
+        else:
+            alpha_beta_play.searchDeadline = start + self.timeLimit
+        if(self.stopRequested):
+            alpha_beta_play.searchDeadline = 0
+        try:
+            for d in range(1, maxDepth + 1):
+                move, value = alpha_beta_play.searchRoot(board, d, maximize, score, key, stats)
+                if(move is None):
+                    break  # Aucun coup légal
+                bestMove = move
+                stats.depth = d
+                elapsed = time.perf_counter() - start
+                stats.depthTimes[d] = elapsed - sum(stats.depthTimes.values())
+                pv = self.principalVariation(board, key, d)
+                # Variante principale tronquée : le mat est au plus à d demi-coups
+                plies = matePlies(board, pv) if abs(value) >= MATE_THRESHOLD else None
+                self.send("info depth " + str(d) + " score " + uciScore(value if maximize else -value, plies or d)
+                          + " nodes " + str(stats.nodes) + " nps " + str(int(stats.nodes / max(elapsed, 1e-6)))
+                          + " time " + str(int(elapsed * 1000)) + " pv " + " ".join(m.uci() for m in pv))
+                # La profondeur suivante coûte plusieurs fois la précédente : inutile de la commencer
+                # si plus de la moitié du temps est déjà utilisée
+                if(not self.pondering and self.timeLimit is not None and elapsed > self.timeLimit / 2):
+                    break
+        except SearchTimeout:
+            pass
+        alpha_beta_play.searchDeadline = None
+        stats.searchTime = time.perf_counter() - start
+        if(waitForStop):
+            # go infinite / go ponder : bestmove n'est envoyé qu'après stop (ou ponderhit)
+            self.released.wait()
+        if(bestMove is None):
+            # Recherche interrompue avant la fin de la profondeur 1 : coup de la table ou premier coup légal
+            moves = alpha_beta_play.orderMoves(board, None, 1)
+            entry = alpha_beta_play.transpositionTable.get(key)
+            if(entry is not None and entry[3] in moves):
+                bestMove = entry[3]
+            elif(len(moves) > 0):
+                bestMove = moves[0]
+        if(bestMove is None):
+            self.send("bestmove 0000")
+            return
+        line = "bestmove " + bestMove.uci()
+        pv = self.principalVariation(board, key, 2)
+        if(len(pv) == 2 and pv[0] == bestMove):
+            line += " ponder " + pv[1].uci()
+        self.send(line)
+
+
+def main():
+    engine = UciEngine()
+    for line in sys.stdin:
+        if(not engine.handle(line.strip())):
+            break
+    engine.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# Arène vectorisée (common.rnf_arena) contre la boucle partie par partie du notebook Chapitre 2
+# Vérifie d'abord que les masques de coups légaux et la détection de fin de partie de l'arène sont
+# identiques à Board.generateMoves / Board.isTerminal sur toutes les positions atteignables, puis compare
+# le temps de parties "politique du réseau contre hasard" jouées une par une (un appel au réseau par coup)
+# et jouées toutes ensemble (un appel au réseau par demi-coup pour toutes les parties).
+# Utilisation : python -m benchmarks.arena [model_it0.keras model_it10.keras]
+import random
+import sys
+import time
+
+import numpy as np
+
+from common import rnf_arena
+from common.game import MOVE_INDEX, Board
+from common.np_network import NumpyNetwork
+
+
+# Toutes les positions atteignables depuis la position de départ
+def reachablePositions():
+    start = Board()
+    start.setStartingPosition()
+    seen = {start.hashKey(): start}
+    queue = [start]
+    while(len(queue) > 0):
+        board = queue.pop()
+        if(board.isTerminal()[0]):
+            continue
+        for move in board.generateMoves():
+            child = board.copy()
+            child.applyMove(move)
+            if(child.hashKey() not in seen):
+                seen[child.hashKey()] = child
+                queue.append(child)
+    return list(seen.values())
+
+
+def checkRules():
+    boards = reachablePositions()
+    white = np.array([b.white for b in boards])
+    black = np.array([b.black for b in boards])
+    turn = np.array([b.turn for b in boards])
+    legal = rnf_arena.legalMoveMasks(white, black, turn)
+    finished, winner = rnf_arena.terminalStatus(white, black, turn, legal)
+    inputs = rnf_arena.networkInputs(white, black, turn)
+    for i, board in enumerate(boards):
+        terminal, expected = board.isTerminal()
+        assert finished[i] == terminal and (not terminal or winner[i] == expected), board.toString()
+        if(not terminal):
+            slots = sorted(MOVE_INDEX[(m[0], m[1])] for m in board.generateMoves())
+            assert list(np.flatnonzero(legal[i])) == slots, board.toString()
+        assert np.array_equal(inputs[i], np.array(board.toNetworkInput(), dtype=np.float32)), board.toString()
+    print(str(len(boards)) + " reachable positions: legal masks, terminal status and network inputs match Board")
+
+
+# Boucle du notebook : blancs au hasard, noirs jouent le coup légal le plus probable, une partie à la fois
+def sequentialGames(network, numGames):
+    blackWins = 0
+    for _ in range(0, numGames):
+        board = Board()
+        board.setStartingPosition()
+        while(not board.isTerminal()[0]):
+            moves = board.generateMoves()
+            if(board.turn == Board.WHITE):
+                board.applyMove(random.choice(moves))
+            else:
+                policy = network.predict(np.array([board.toNetworkInput()]))[0][0]
+                board.applyMove(max(moves, key=lambda m: policy[MOVE_INDEX[(m[0], m[1])]]))
+        blackWins += board.isTerminal()[1] == Board.BLACK
+    return blackWins / numGames
+
+
+def main(modelA="model_it0.keras", modelB="model_it10.keras"):
+    checkRules()
+    networkA = NumpyNetwork.load(modelA)
+    networkB = NumpyNetwork.load(modelB)
+    rng = np.random.default_rng(0)
+    random.seed(0)
+
+    numGames = 500
+    start = time.perf_counter()
+    rate = sequentialGames(networkB, numGames)
+    elapsed = time.perf_counter() - start
+    print("one game at a time : " + str(round(numGames / elapsed)) + " games/s (" + modelB + " wins "
+          + str(round(100 * rate, 1)) + "% as black against random)")
+
+    numGames = 10000
+    start = time.perf_counter()
+    winners = rnf_arena.playGames(rnf_arena.RandomPlayer(), rnf_arena.GreedyPlayer(networkB), numGames, rng)
+    elapsed = time.perf_counter() - start
+    print("lockstep arena     : " + str(round(numGames / elapsed)) + " games/s (" + modelB + " wins "
+          + str(round(100 * np.mean(winners == Board.BLACK), 1)) + "% as black against random)")
+
+    start = time.perf_counter()
+    whiteRate, blackRate, rate = rnf_arena.compare(rnf_arena.GreedyPlayer(networkB), rnf_arena.GreedyPlayer(networkA),
+                                                   numGames, rng, randomPlies=1)
+    elapsed = time.perf_counter() - start
+    print(modelB + " vs " + modelA + ", " + str(2 * numGames) + " games in " + str(round(elapsed, 2)) + " s: "
+          + str(round(100 * whiteRate, 1)) + "% as white, " + str(round(100 * blackRate, 1)) + "% as black")
+
+    numGames = 200
+    player = rnf_arena.MctsPlayer(networkB, 50)
+    start = time.perf_counter()
+    winners = rnf_arena.playGames(rnf_arena.RandomPlayer(), player, numGames, rng)
+    elapsed = time.perf_counter() - start
+    print("lockstep MCTS (50 playouts): " + str(round(numGames / elapsed, 1)) + " games/s, "
+          + str(player.searcher.stats.networkCalls) + " network calls, " + modelB + " wins "
+          + str(round(100 * np.mean(winners == Board.BLACK), 1)) + "% as black against random")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
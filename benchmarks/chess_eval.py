@@ -0,0 +1,126 @@
+# Banc d'essai de l'évaluation du moteur alpha-beta (Content/alpha_beta_play.py)
+# Compare, sur les feuilles de l'arbre des positions de Content/Partie_Alpha_Beta.pgn,
+# l'ancienne évaluation case par case, l'évaluation par bitboards et la mise à jour incrémentale
+# (score du parent + moveDelta), en évaluations de feuilles par seconde. Les trois scores doivent être égaux.
+# Utilisation : python -m benchmarks.chess_eval [profondeur de recherche]
+import sys
+import time
+
+import chess
+import chess.pgn
+
+from Content import alpha_beta_play
+from Content.alpha_beta_play import eval, moveDelta, pieceSquareTable
+
+PGN_PATH = "Content/Partie_Alpha_Beta.pgn"
+
+
+# Évaluation historique : 64 appels à piece_at et comparaisons de chaînes pour chaque feuille
+def legacyEval(board):
+    scoreWhite = 0
+    scoreBlack = 0
+    for i in range(0, 8):
+        for j in range(0, 8):
+            squareIJ = chess.square(i, j)
+            pieceIJ = board.piece_at(squareIJ)
+            if str(pieceIJ) == "P":
+                scoreWhite += (100 + pieceSquareTable[i][j])
+            if str(pieceIJ) == "N":
+                scoreWhite += (310 + pieceSquareTable[i][j])
+            if str(pieceIJ) == "B":
+                scoreWhite += (320 + pieceSquareTable[i][j])
+            if str(pieceIJ) == "R":
+                scoreWhite += (500 + pieceSquareTable[i][j])
+            if str(pieceIJ) == "Q":
+                scoreWhite += (900 + pieceSquareTable[i][j])
+            if str(pieceIJ) == "p":
+                scoreBlack += (100 + pieceSquareTable[i][j])
+            if str(pieceIJ) == "n":
+                scoreBlack += (310 + pieceSquareTable[i][j])
+            if str(pieceIJ) == "b":
+                scoreBlack += (320 + pieceSquareTable[i][j])
+            if str(pieceIJ) == "r":
+                scoreBlack += (500 + pieceSquareTable[i][j])
+            if str(pieceIJ) == "q":
+                scoreBlack += (900 + pieceSquareTable[i][j])
+    return scoreWhite - scoreBlack
+
+
+# Positions de la partie enregistrée
+def gamePositions():
+    with open(PGN_PATH) as f:
+        game = chess.pgn.read_game(f)
+    board = game.board()
+    positions = [board.copy()]
+    for move in game.mainline_moves():
+        board.push(move)
+        positions.append(board.copy())
+    return positions
+
+
+# Feuilles (parent, coup) atteintes à la profondeur donnée depuis chaque position ; vérifie au passage
+# que le score incrémental est égal aux deux évaluations complètes à chaque noeud
+def collectLeaves(board, depth, score, leaves):
+    if(depth == 0):
+        return
+    for move in list(board.legal_moves):
+        childScore = score + moveDelta(board, move)
+        if(depth == 1):
+            leaves.append((board.copy(stack=False), move))
+        board.push(move)
+        if(childScore != eval(board) or childScore != legacyEval(board)):
+            raise AssertionError("incremental score mismatch after " + move.uci() + " in " + board.fen())
+        collectLeaves(board, depth - 1, childScore, leaves)
+        board.pop()
+
+
+def timeIt(function, leaves):
+    start = time.perf_counter()
+    function(leaves)
+    return len(leaves) / (time.perf_counter() - start)
+
+
+def runLegacy(leaves):
+    for board, move in leaves:
+        board.push(move)
+        legacyEval(board)
+        board.pop()
+
+
+def runBitboard(leaves):
+    for board, move in leaves:
+        board.push(move)
+        eval(board)
+        board.pop()
+
+
+def runIncremental(leaves):
+    for board, move in leaves:
+        moveDelta(board, move)  # Le score du parent est connu dans alphaBeta : seule la variation est calculée
+        board.push(move)
+        board.pop()
+
+
+def main(depth=2):
+    depth = int(depth)
+    leaves = []
+    for board in gamePositions():
+        collectLeaves(board, depth, eval(board), leaves)
+    print(str(len(leaves)) + " leaves at depth " + str(depth) + ", incremental scores identical to eval")
+    print("legacy eval      : " + str(round(timeIt(runLegacy, leaves))) + " leaf evaluations/s")
+    print("bitboard eval    : " + str(round(timeIt(runBitboard, leaves))) + " leaf evaluations/s")
+    print("incremental      : " + str(round(timeIt(runIncremental, leaves))) + " leaf evaluations/s")
+
+    # Recherche complète à profondeur 3 sur quelques positions du milieu de partie
+    positions = gamePositions()[10:40:10]
+    stats = alpha_beta_play.SearchStats()
+    start = time.perf_counter()
+    for board in positions:
+        alpha_beta_play.getNextMove(3, board, board.turn == chess.WHITE, stats=stats)
+    elapsed = time.perf_counter() - start
+    print("getNextMove(3)   : " + str(stats.nodes) + " nodes in " + str(round(elapsed, 2)) + " s ("
+          + str(round(stats.nodes / elapsed)) + " nodes/s)")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
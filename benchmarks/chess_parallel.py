@@ -0,0 +1,55 @@
+# Banc d'essai de la recherche parallèle à la racine (Content/alpha_beta_parallel.py)
+# Mesure le temps pour atteindre une profondeur fixe sur les positions de Content/Partie_Alpha_Beta.pgn,
+# en séquentiel (alpha_beta_play.getNextMove) puis avec 1, 2, 4... processus, et la répartition des noeuds.
+# Utilisation : python -m benchmarks.chess_parallel [profondeur] [processus max] [nombre de positions]
+import os
+import sys
+import time
+
+import chess
+
+from benchmarks.chess_eval import gamePositions
+from Content import alpha_beta_play
+from Content.alpha_beta_parallel import ParallelSearch
+
+
+def main(depth=4, maxWorkers=None, count=6):
+    depth = int(depth)
+    maxWorkers = int(maxWorkers) if maxWorkers is not None else max(4, os.cpu_count() or 1)
+    count = int(count)
+    positions = gamePositions()[10:70][::max(1, 60 // count)][:count]
+    print(str(len(positions)) + " positions, depth " + str(depth) + ", " + str(os.cpu_count()) + " cores")
+
+    alpha_beta_play.transpositionTable.clear()
+    stats = alpha_beta_play.SearchStats()
+    serialValues = []
+    start = time.perf_counter()
+    for board in positions:
+        serialValues.append(alpha_beta_play.getNextMove(depth, board, board.turn == chess.WHITE, stats=stats)[1])
+    serialTime = time.perf_counter() - start
+    print("serial      : " + str(round(serialTime, 2)) + " s, " + str(stats.nodes) + " nodes")
+
+    workers = 1
+    while(workers <= maxWorkers):
+        with ParallelSearch(workers) as search:
+            search.getNextMove(1, positions[0], positions[0].turn == chess.WHITE)  # Démarrage des processus
+            nodes = 0
+            perWorker = {}
+            same = 0
+            start = time.perf_counter()
+            for board, serialValue in zip(positions, serialValues):
+                _, value = search.getNextMove(depth, board, board.turn == chess.WHITE)
+                nodes += search.stats.nodes
+                for pid, workerStats in search.workerStats.items():
+                    perWorker[pid] = perWorker.get(pid, 0) + workerStats.nodes
+                if(value == serialValue):
+                    same += 1
+            elapsed = time.perf_counter() - start
+        print(str(workers).rjust(2) + " workers  : " + str(round(elapsed, 2)) + " s (speedup "
+              + str(round(serialTime / elapsed, 2)) + "), " + str(nodes) + " nodes, per worker "
+              + str(sorted(perWorker.values(), reverse=True)) + ", same value on " + str(same) + "/" + str(len(positions)))
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,126 @@
+# Banc d'essai de la recherche du moteur alpha-beta (Content/alpha_beta_play.py)
+# 1. Vérifie que les clés de Zobrist incrémentales de pushMove sont égales à chess.polyglot.zobrist_hash.
+# 2. Compare le nombre de noeuds à profondeur fixe entre l'alpha-beta historique (ordre du générateur de coups,
+#    sans table de transposition) et getNextMove (approfondissement itératif, table, ordre des coups).
+# 3. Mesure la profondeur atteinte par getNextMove avec un temps de réflexion donné.
+# Utilisation : python -m benchmarks.chess_search [profondeur] [secondes par coup]
+import sys
+import time
+
+import chess
+import chess.polyglot
+
+from benchmarks.chess_eval import gamePositions
+from Content import alpha_beta_play
+from Content.alpha_beta_play import eval, moveDelta, pushMove
+
+
+# Alpha-beta historique (avec l'évaluation incrémentale) : les coups sont explorés dans l'ordre du générateur
+def plainAlphaBeta(board, depth, alpha, beta, maximize, score, counter):
+    if(board.is_checkmate()):
+        if(board.turn == chess.WHITE):
+            return -100000
+        else:
+            return 1000000
+    if depth == 0:
+        return score
+    bestVal = -9999 if maximize else 9999
+    for move in board.legal_moves:
+        childScore = score + moveDelta(board, move)
+        board.push(move)
+        counter[0] += 1
+        value = plainAlphaBeta(board, depth - 1, alpha, beta, (not maximize), childScore, counter)
+        board.pop()
+        if(maximize):
+            bestVal = max(bestVal, value)
+            alpha = max(alpha, bestVal)
+        else:
+            bestVal = min(bestVal, value)
+            beta = min(beta, bestVal)
+        if alpha >= beta:
+            break
+    return bestVal
+
+
+def plainNextMove(depth, board, maximize, counter):
+    bestMove = None
+    bestValue = -9999 if maximize else 9999
+    score = eval(board)
+    for move in board.legal_moves:
+        childScore = score + moveDelta(board, move)
+        board.push(move)
+        counter[0] += 1
+        value = plainAlphaBeta(board, depth - 1, -10000, 10000, (not maximize), childScore, counter)
+        board.pop()
+        if (maximize and value > bestValue) or (not maximize and value < bestValue):
+            bestValue = value
+            bestMove = move
+    return (bestMove, bestValue)
+
+
+# Parcours de l'arbre en comparant la clé incrémentale à la clé complète
+def checkKeys(board, depth, score, key):
+    if(depth == 0):
+        return 0
+    count = 0
+    for move in list(board.legal_moves):
+        childScore, childKey = pushMove(board, move, score, key)
+        if(childKey != chess.polyglot.zobrist_hash(board)):
+            raise AssertionError("incremental Zobrist key mismatch after " + move.uci() + " in " + board.fen())
+        count += 1 + checkKeys(board, depth - 1, childScore, childKey)
+        board.pop()
+    return count
+
+
+def main(depth=4, seconds=5.0):
+    depth = int(depth)
+    seconds = float(seconds)
+    positions = gamePositions()
+    checked = 0
+    for board in positions:
+        checked += checkKeys(board, 2, eval(board), chess.polyglot.zobrist_hash(board))
+    for fen in ["r3k2r/1P4P1/8/3pP3/8/8/1p4p1/R3K2R w KQkq d6 0 1",
+                "r3k2r/1P4P1/8/8/3pP3/8/1p4p1/R3K2R b KQkq e3 0 1"]:
+        board = chess.Board(fen)
+        checked += checkKeys(board, 3, eval(board), chess.polyglot.zobrist_hash(board))
+    print("incremental Zobrist keys identical to zobrist_hash on " + str(checked) + " nodes")
+
+    # Positions du milieu de partie
+    middlegame = positions[10:50:5]
+    plainNodes = 0
+    plainTime = 0.0
+    nodes = 0
+    searchTime = 0.0
+    sameValue = 0
+    for board in middlegame:
+        maximize = board.turn == chess.WHITE
+        counter = [0]
+        start = time.perf_counter()
+        _, plainValue = plainNextMove(depth, board, maximize, counter)
+        plainTime += time.perf_counter() - start
+        plainNodes += counter[0]
+        alpha_beta_play.transpositionTable.clear()
+        stats = alpha_beta_play.SearchStats()
+        start = time.perf_counter()
+        _, value = alpha_beta_play.getNextMove(depth, board, maximize, stats=stats)
+        searchTime += time.perf_counter() - start
+        nodes += stats.nodes
+        if(value == plainValue):
+            sameValue += 1
+    print("depth " + str(depth) + " on " + str(len(middlegame)) + " middlegame positions")
+    print("plain alpha-beta : " + str(plainNodes) + " nodes, " + str(round(plainTime, 2)) + " s")
+    print("getNextMove      : " + str(nodes) + " nodes, " + str(round(searchTime, 2)) + " s ("
+          + str(round(100 * (1 - nodes / plainNodes), 1)) + "% fewer nodes, same value on "
+          + str(sameValue) + "/" + str(len(middlegame)) + " positions)")
+
+    depths = []
+    alpha_beta_play.transpositionTable.clear()
+    for board in middlegame:
+        stats = alpha_beta_play.SearchStats()
+        alpha_beta_play.getNextMove(None, board, board.turn == chess.WHITE, seconds, stats)
+        depths.append(stats.depth)
+    print("depth reached in " + str(seconds) + " s per move : " + str(depths))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
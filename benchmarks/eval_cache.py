@@ -0,0 +1,55 @@
+# Banc d'essai du cache d'évaluations (common.rnf_cache) pendant l'auto-apprentissage
+# Joue une itération de parties (comme selfPlayWorker) avec et sans cache, à graine égale,
+# et compare le nombre de positions évaluées par le réseau. Les données produites doivent être identiques
+# avec un cache sans symétrie ; le cache canonique (une entrée par paire de positions symétriques)
+# évalue encore moins de positions.
+# Utilisation : python -m benchmarks.eval_cache [parties] [playouts] [taille du cache]
+import random
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.mcts_tree import CountingNetwork
+from common.np_network import NumpyNetwork
+from common.rnf_cache import EvaluationCache
+from common.rnf_selfplay import playGame
+
+
+def measure(games, playouts, cacheSize, canonical=False):
+    network = CountingNetwork(NumpyNetwork.random(0))
+    cache = None
+    if(cacheSize > 0):
+        cache = EvaluationCache(network, cacheSize, canonical)
+    random.seed(0)
+    rng = np.random.default_rng(0)
+    data = []
+    start = time.perf_counter()
+    for _ in range(0, games):
+        data.append(playGame(network, rng, playouts, cache=cache))
+    return network.calls, time.perf_counter() - start, data, cache
+
+
+def main(games=10, playouts=100, cacheSize=4096):
+    games = int(games)
+    playouts = int(playouts)
+    cacheSize = int(cacheSize)
+    plainCalls, plainTime, plainData, _ = measure(games, playouts, 0)
+    cachedCalls, cachedTime, cachedData, cache = measure(games, playouts, cacheSize)
+    canonicalCalls, canonicalTime, _, canonicalCache = measure(games, playouts, cacheSize, True)
+    same = all(np.array_equal(np.array(a[i]), np.array(b[i]))
+               for a, b in zip(plainData, cachedData) for i in range(0, 3))
+    print(str(games) + " games, " + str(playouts) + " playouts/move")
+    print("without cache : " + str(plainCalls) + " positions evaluated, " + str(round(plainTime, 2)) + " s")
+    print("with cache    : " + str(cachedCalls) + " positions evaluated, " + str(round(cachedTime, 2)) + " s ("
+          + str(len(cache)) + " entries, hit rate " + str(round(100 * cache.hitRate(), 1)) + "%)")
+    print("canonical     : " + str(canonicalCalls) + " positions evaluated, " + str(round(canonicalTime, 2))
+          + " s (" + str(len(canonicalCache)) + " entries, hit rate "
+          + str(round(100 * canonicalCache.hitRate(), 1)) + "%)")
+    print("saved         : " + str(round(100 * (1 - cachedCalls / plainCalls), 1)) + "% of network evaluations, "
+          + str(round(100 * (1 - canonicalCalls / plainCalls), 1)) + "% with symmetry")
+    print("identical data: " + str(same))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,82 @@
+# Serveur d'inférence par lots (common.rnf_inference) : débit de parties d'auto-apprentissage simultanées
+# Pour 1, 2, 4, ... parties jouées en même temps (threads, ou processus avec --processes), chaque partie
+# fait ses recherches MCTS avec son propre client du serveur. Affiche les positions évaluées par seconde,
+# la taille moyenne des lots et l'attente dans la file, et le débit d'une partie seule sans serveur.
+# Utilisation : python -m benchmarks.inference_server [--games 1 2 4 8 16] [--processes] [--model modèle]
+import argparse
+import multiprocessing
+import random
+import threading
+import time
+
+import numpy as np
+
+from common.np_network import NumpyNetwork
+from common.rnf_inference import InferenceServer
+from common.rnf_selfplay import playGame
+
+
+# Joue numGames parties avec le réseau donné (client du serveur ou réseau local)
+def playGames(network, numGames, seed, playouts, results=None):
+    rng = np.random.default_rng(seed)
+    positions = 0
+    for _ in range(0, numGames):
+        positions += len(playGame(network, rng, playouts)[0])
+    if(results is not None):
+        results.put(positions)
+    return positions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of the batched inference server")
+    parser.add_argument("--games", type=int, nargs="+", default=[1, 2, 4, 8, 16], help="concurrent games")
+    parser.add_argument("--rounds", type=int, default=2, help="games played by each concurrent player")
+    parser.add_argument("--playouts", type=int, default=50)
+    parser.add_argument("--processes", action="store_true", help="players in processes instead of threads")
+    parser.add_argument("--model", default=None, help="model file (random weights by default)")
+    args = parser.parse_args()
+
+    network = NumpyNetwork.load(args.model) if args.model is not None else NumpyNetwork.random(0)
+    random.seed(0)
+    start = time.perf_counter()
+    calls = [0]
+    predict = network.predict
+
+    def countingPredict(x, verbose=None):
+        calls[0] += len(x)
+        return predict(x)
+
+    network.predict = countingPredict
+    playGames(network, args.rounds, 0, args.playouts)
+    elapsed = time.perf_counter() - start
+    print("local network, 1 game : " + str(round(calls[0] / elapsed)) + " positions/s")
+    network.predict = predict
+
+    context = multiprocessing.get_context("spawn")
+    for count in args.games:
+        # Un serveur par mesure : il ne connaît que les clients de la mesure
+        with InferenceServer(network, maxClients=count) as server:
+            clients = [server.client() for _ in range(0, count)]
+            start = time.perf_counter()
+            if(args.processes):
+                results = context.Queue()
+                players = [context.Process(target=playGames, args=(clients[i], args.rounds, i, args.playouts, results))
+                           for i in range(0, count)]
+            else:
+                results = None
+                players = [threading.Thread(target=playGames, args=(clients[i], args.rounds, i, args.playouts))
+                           for i in range(0, count)]
+            for player in players:
+                player.start()
+            for player in players:
+                player.join()
+            elapsed = time.perf_counter() - start
+            m = server.metrics()
+            print(str(count).rjust(2) + " games: " + str(round(m["positions"] / elapsed)) + " positions/s, mean batch "
+                  + str(round(m["meanBatch"], 1)) + " (max " + str(m["maxBatch"]) + "), queue latency "
+                  + str(round(1000 * m["meanQueueLatency"], 2)) + " ms mean, "
+                  + str(round(1000 * m["maxQueueLatency"], 2)) + " ms max, batch sizes " + str(m["batchSizes"]))
+
+
+if __name__ == "__main__":
+    main()
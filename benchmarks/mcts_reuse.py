@@ -0,0 +1,64 @@
+# Banc d'essai de la réutilisation du sous-arbre MCTS entre les coups d'une partie d'auto-apprentissage
+# Compare le nombre d'évaluations du réseau par partie, à budget de playouts égal,
+# entre une recherche repartant de zéro à chaque coup et MCTS.advance.
+# Utilisation : python -m benchmarks.mcts_reuse [parties] [playouts] [maxReusedNodes]
+import random
+import sys
+import time
+
+import numpy as np
+
+from benchmarks.mcts_tree import CountingNetwork
+from common import rnf_mcts
+from common.game import Board
+from common.np_network import NumpyNetwork
+
+
+# Partie jouée comme ReinfLearn.playGame : coup tiré selon les probabilités de la recherche
+def playGame(network, playouts, reuse, maxReusedNodes=None):
+    board = Board()
+    board.setStartingPosition()
+    searcher = rnf_mcts.MCTS(network, maxReusedNodes=maxReusedNodes)
+    searcher.numPlayouts = playouts
+    rootEdge = rnf_mcts.Edge(None, None)
+    rootEdge.N = 1
+    searcher.rootNode = rnf_mcts.Node(board.copy(), rootEdge)
+    while(not board.isTerminal()[0]):
+        moveProbs = searcher.search()
+        probs = np.array([prob for (_, prob, _, _) in moveProbs])
+        move = moveProbs[np.random.choice(len(moveProbs), p=probs / probs.sum())][0]
+        board.applyMove(move)
+        if(reuse):
+            searcher.advance(move)
+        else:
+            rootEdge = rnf_mcts.Edge(None, None)
+            rootEdge.N = 1
+            searcher.rootNode = rnf_mcts.Node(board.copy(), rootEdge)
+
+
+def measure(games, playouts, reuse, maxReusedNodes=None):
+    network = CountingNetwork(NumpyNetwork.random(0))
+    random.seed(0)
+    np.random.seed(0)
+    start = time.perf_counter()
+    for _ in range(0, games):
+        playGame(network, playouts, reuse, maxReusedNodes)
+    return network.calls / games, time.perf_counter() - start
+
+
+def main(games=50, playouts=100, maxReusedNodes=None):
+    games = int(games)
+    playouts = int(playouts)
+    if(maxReusedNodes is not None):
+        maxReusedNodes = int(maxReusedNodes)
+    freshCalls, freshTime = measure(games, playouts, False)
+    reuseCalls, reuseTime = measure(games, playouts, True, maxReusedNodes)
+    print("fresh tree per move : " + str(round(freshCalls, 1)) + " network evaluations/game, "
+          + str(round(freshTime, 2)) + " s")
+    print("subtree reuse       : " + str(round(reuseCalls, 1)) + " network evaluations/game, "
+          + str(round(reuseTime, 2)) + " s")
+    print("reduction           : " + str(round(100 * (1 - reuseCalls / freshCalls), 1)) + "%")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,82 @@
+# Banc d'essai de l'arbre MCTS : parties jouées par seconde (playouts/s) et mémoire par noeud
+# Le module MCTS testé est un argument, ce qui permet de comparer avec une autre version
+# (par exemple une copie de l'ancien rnf_mcts.py) ayant la même interface Edge/Node/MCTS.
+# Utilisation : python -m benchmarks.mcts_tree [module] [parties] [playouts]
+import importlib
+import random
+import sys
+import time
+import tracemalloc
+
+from common.game import Board
+from common.np_network import NumpyNetwork
+
+
+# Réseau qui compte les positions évaluées (une position évaluée = un noeud étendu)
+class CountingNetwork():
+    def __init__(self, network):
+        self.network = network
+        self.calls = 0
+
+    def predict(self, x, verbose=None):
+        self.calls += len(x)
+        return self.network.predict(x)
+
+
+# Recherche depuis une position, retourne les probabilités de coups et la racine
+def runSearch(module, network, board, playouts):
+    rootEdge = module.Edge(None, None)
+    rootEdge.N = 1
+    rootNode = module.Node(board.copy(), rootEdge)
+    searcher = module.MCTS(network)
+    searcher.numPlayouts = playouts
+    return searcher.search(rootNode), rootNode
+
+
+# Partie d'auto-apprentissage : une recherche par coup, le coup le plus visité est joué
+def playGame(module, network, playouts):
+    board = Board()
+    board.setStartingPosition()
+    searches = 0
+    while(not board.isTerminal()[0]):
+        moveProbs, _ = runSearch(module, network, board, playouts)
+        board.applyMove(max(moveProbs, key=lambda m: m[2])[0])
+        searches += 1
+    return searches
+
+
+def main(moduleName="common.rnf_mcts", games=20, playouts=100):
+    module = importlib.import_module(moduleName)
+    network = CountingNetwork(NumpyNetwork.random(0))
+    games = int(games)
+    playouts = int(playouts)
+    random.seed(0)
+
+    # Vitesse : parties complètes, meilleur temps sur trois mesures
+    best = None
+    for _ in range(0, 3):
+        searches = 0
+        start = time.perf_counter()
+        for _ in range(0, games):
+            searches += playGame(module, network, playouts)
+        elapsed = time.perf_counter() - start
+        if(best is None or elapsed < best):
+            best = elapsed
+
+    # Mémoire : taille de l'arbre conservé après une recherche depuis la position de départ
+    board = Board()
+    board.setStartingPosition()
+    network.calls = 0
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    _, rootNode = runSearch(module, network, board, playouts)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(moduleName + ": " + str(int(searches * playouts / best)) + " playouts/s, "
+          + str(network.calls) + " expanded nodes, "
+          + str(int((after - before) / max(1, network.calls))) + " bytes/node")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,49 @@
+# Banc d'essai de latence : NumpyNetwork contre keras predict
+# La parité des sorties est vérifiée par tests/test_np_network.py ; ici, seul l'écart maximal est affiché.
+# Utilisation : python -m benchmarks.numpy_inference [modèle.keras] [positions.npy]
+import sys
+import time
+
+import keras
+import numpy as np
+
+from common.np_network import NumpyNetwork
+
+# Écart maximal entre les sorties des deux moteurs sur toutes les positions
+def maxDifference(model, network, positions):
+    kerasPolicy, kerasValue = model.predict(positions, verbose=0)
+    policy, value = network.predict(positions)
+    return float(np.max(np.abs(kerasPolicy - policy))), float(np.max(np.abs(kerasValue - value)))
+
+
+# Temps moyen d'un appel à predict, en microsecondes
+def latency(predict, x, repeat):
+    predict(x)
+    start = time.perf_counter()
+    for _ in range(0, repeat):
+        predict(x)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main(modelPath="model_it10.keras", positionsPath="positions.npy"):
+    model = keras.models.load_model(modelPath)
+    network = NumpyNetwork.fromKerasModel(model)
+    positions = np.load(positionsPath).astype(np.float32)
+
+    policyDiff, valueDiff = maxDifference(model, network, positions)
+    print("difference on " + str(len(positions)) + " positions: max |dpolicy| = " + str(policyDiff)
+          + ", max |dvalue| = " + str(valueDiff))
+
+    single = positions[:1]
+    kerasSingle = latency(lambda x: model.predict(x, verbose=0), single, 50)
+    numpySingle = latency(network.predict, single, 2000)
+    kerasBatch = latency(lambda x: model.predict(x, verbose=0), positions, 20)
+    numpyBatch = latency(network.predict, positions, 500)
+    print("single position : keras " + str(round(kerasSingle, 1)) + " us, numpy " + str(round(numpySingle, 1))
+          + " us (" + str(round(kerasSingle / numpySingle, 1)) + "x)")
+    print("batch of " + str(len(positions)) + "   : keras " + str(round(kerasBatch, 1)) + " us, numpy "
+          + str(round(numpyBatch, 1)) + " us (" + str(round(kerasBatch / numpyBatch, 1)) + "x)")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
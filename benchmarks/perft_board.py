@@ -0,0 +1,62 @@
+# Banc d'essai perft pour common.game.Board
+# Compare le parcours historique de l'arbre (copy.deepcopy à chaque enfant) avec l'ancienne classe
+# (copie figée dans benchmarks/legacy_board.py) et avec la classe actuelle, au parcours en place
+# avec applyMove/undoMove, en noeuds par seconde.
+# Utilisation : python -m benchmarks.perft_board [profondeur] [répétitions]
+import copy
+import sys
+import time
+
+from benchmarks.legacy_board import Board as LegacyBoard
+from common.game import Board
+
+
+# Parcours de l'arbre en copiant le plateau à chaque enfant (méthode de minimax et rnf_mcts)
+def perftDeepcopy(board, depth):
+    if(depth == 0):
+        return 1
+    if(board.isTerminal()[0]):
+        return 0
+    nodes = 0
+    for move in board.generateMoves():
+        next = copy.deepcopy(board)
+        next.applyMove(move)
+        nodes += perftDeepcopy(next, depth - 1)
+    return nodes
+
+
+# Nombre total de noeuds visités jusqu'à la profondeur donnée
+def totalNodes(perftFunction, depth, boardClass=Board):
+    nodes = 0
+    for d in range(1, depth + 1):
+        board = boardClass()
+        board.setStartingPosition()
+        nodes += perftFunction(board, d)
+    return nodes
+
+
+def timeIt(perftFunction, depth, repeat, boardClass=Board):
+    start = time.perf_counter()
+    for _ in range(0, repeat):
+        nodes = totalNodes(perftFunction, depth, boardClass)
+    elapsed = time.perf_counter() - start
+    return nodes, (nodes * repeat) / elapsed
+
+
+def main(depth=9, repeat=20):
+    nodesLegacy, npsLegacy = timeIt(perftDeepcopy, depth, repeat, LegacyBoard)
+    nodesCopy, npsCopy = timeIt(perftDeepcopy, depth, repeat)
+    nodesInPlace, npsInPlace = timeIt(lambda board, d: board.perft(d), depth, repeat)
+    if(nodesLegacy != nodesInPlace or nodesCopy != nodesInPlace):
+        raise ValueError("perft mismatch: " + str(nodesLegacy) + ", " + str(nodesCopy) + ", " + str(nodesInPlace))
+    print("perft nodes (depth 1.." + str(depth) + "): " + str(nodesInPlace))
+    print("legacy deepcopy : " + str(int(npsLegacy)) + " nodes/s")
+    print("deepcopy        : " + str(int(npsCopy)) + " nodes/s")
+    print("applyMove/undo  : " + str(int(npsInPlace)) + " nodes/s")
+    print("speedup         : " + str(round(npsInPlace / npsLegacy, 2)) + "x over the legacy class ("
+          + str(round(npsInPlace / npsCopy, 2)) + "x over deepcopy of the new class)")
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    main(*args)
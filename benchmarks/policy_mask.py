@@ -0,0 +1,82 @@
+# Masquage de la politique du réseau sur les coups légaux : recherche dans le dictionnaire MOVE_INDEX
+# coup par coup contre les index entiers et masques de 28 sorties de common.game
+# Vérifie que les probabilités a priori obtenues sont identiques sur toutes les positions atteignables,
+# puis mesure le temps d'expansion d'un noeud MCTS (une position) et d'un lot de positions.
+# Utilisation : python -m benchmarks.policy_mask
+import time
+
+import numpy as np
+
+from benchmarks.arena import reachablePositions
+from common import rnf_mcts
+from common.game import MOVE_INDEX, legalMoveMasks, maskPolicy
+
+
+# Ancienne version : index de chaque coup par le dictionnaire, puis normalisation
+def legacyPriors(board, policy):
+    P = np.asarray(policy, dtype=np.float64)[[MOVE_INDEX[(m[0], m[1])] for m in board.generateMoves()]]
+    return P / P.sum()
+
+
+def legacyExpand(node, policy, v):
+    node.moves = node.board.generateMoves()
+    node.children = [None] * len(node.moves)
+    node.stats = np.zeros((5, len(node.moves)))
+    node.stats[rnf_mcts.STAT_P] = legacyPriors(node.board, policy)
+    return v
+
+
+def bestTime(function, repeat=5):
+    best = None
+    for _ in range(0, repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    boards = [b for b in reachablePositions() if not b.isTerminal()[0]]
+    rng = np.random.default_rng(0)
+    policies = rng.random((len(boards), 28)).astype(np.float32)
+
+    masked = maskPolicy(policies, legalMoveMasks(boards))
+    for i, board in enumerate(boards):
+        expected = legacyPriors(board, policies[i])
+        assert np.allclose(masked[i, board.legalMoveIndices()], expected)
+        assert np.allclose(maskPolicy(policies[i], board.legalMoveMask())[board.legalMoveIndices()], expected)
+    print(str(len(boards)) + " positions: masked priors match the MOVE_INDEX lookup")
+
+    rounds = 20
+
+    def expandOne(expand):
+        for _ in range(0, rounds):
+            for i, board in enumerate(boards):
+                expand(rnf_mcts.Node(board, None), policies[i], 0.0)
+
+    legacy = bestTime(lambda: expandOne(legacyExpand))
+    current = bestTime(lambda: expandOne(rnf_mcts.Node.expandWithPrediction))
+    count = rounds * len(boards)
+    print("single expansion : " + str(round(1e6 * legacy / count, 2)) + " us legacy, "
+          + str(round(1e6 * current / count, 2)) + " us with integer indices")
+
+    def expandBatchLegacy():
+        for _ in range(0, rounds):
+            for i, board in enumerate(boards):
+                legacyExpand(rnf_mcts.Node(board, None), policies[i], 0.0)
+
+    def expandBatch():
+        for _ in range(0, rounds):
+            P = maskPolicy(policies, legalMoveMasks(boards))
+            for i, board in enumerate(boards):
+                rnf_mcts.Node(board, None).expandWithPriors(P[i, board.legalMoveIndices()], 0.0)
+
+    legacy = bestTime(expandBatchLegacy)
+    current = bestTime(expandBatch)
+    print("batch of " + str(len(boards)) + "   : " + str(round(1e6 * legacy / rounds, 1)) + " us legacy, "
+          + str(round(1e6 * current / rounds, 1)) + " us with one masked renormalization")
+
+
+if __name__ == "__main__":
+    main()
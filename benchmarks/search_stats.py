@@ -0,0 +1,66 @@
+# Exemple de journal par coup avec common.search_stats et coût des crochets
+# Affiche stats.toDict() en JSON pour une recherche de chaque moteur (alpha-beta d'échecs, minimax et
+# MCTS de hexapawn), puis compare le temps d'une recherche MCTS sans crochet et avec un crochet "predict".
+# Utilisation : python -m benchmarks.search_stats
+import json
+import random
+import time
+
+import chess
+
+from benchmarks.chess_eval import gamePositions
+from common import mnx_minimax, rnf_mcts
+from common.game import Board
+from common.np_network import NumpyNetwork
+from common.search_stats import SearchStats
+from Content import alpha_beta_play
+
+
+def mctsSearch(network, stats, playouts=2000):
+    random.seed(0)
+    board = Board()
+    board.setStartingPosition()
+    rootEdge = rnf_mcts.Edge(None, None)
+    rootEdge.N = 1
+    searcher = rnf_mcts.MCTS(network, stats=stats)
+    searcher.numPlayouts = playouts
+    searcher.search(rnf_mcts.Node(board, rootEdge))
+    return searcher
+
+
+def main():
+    board = gamePositions()[20]
+    stats = SearchStats()
+    stats.addHook("iteration", lambda s, depth, move, value: print("  depth " + str(depth) + ": " + move.uci()
+                                                                   + " " + str(value) + ", " + str(s.nodes) + " nodes"))
+    alpha_beta_play.getNextMove(4, board, board.turn == chess.WHITE, stats=stats)
+    print("alphabeta " + json.dumps(stats.toDict()))
+
+    solver = mnx_minimax.Solver()
+    board = Board()
+    board.setStartingPosition()
+    solver.bestMove(board)
+    print("minimax   " + json.dumps(solver.stats.toDict()))
+
+    network = NumpyNetwork.random(0)
+    stats = SearchStats()
+    searcher = mctsSearch(network, stats)
+    print("mcts      " + json.dumps(stats.toDict()))
+    print("mcts tree widths by depth: " + str(searcher.treeWidths()))
+
+    # Coût des crochets : meilleur temps sur cinq recherches
+    for label, hook in (("no hooks  ", None), ("with hook ", lambda s, positions, seconds: None)):
+        best = None
+        for _ in range(0, 5):
+            stats = SearchStats()
+            if(hook is not None):
+                stats.addHook("predict", hook)
+            start = time.perf_counter()
+            mctsSearch(network, stats)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        print(label + ": " + str(round(1000 * best, 1)) + " ms per 2000-playout search")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# Banc d'essai de la montée en charge de l'auto-apprentissage parallèle (common.rnf_selfplay)
+# Joue le même nombre de parties avec 1, 2, 4... processus et affiche le débit en parties/s
+# Utilisation : python -m benchmarks.selfplay_scaling [modèle] [parties] [processus max]
+import os
+import sys
+import tempfile
+import time
+
+from common.rnf_selfplay import runSelfPlay
+
+
+def main(modelPath="common/random_model.keras", games=64, maxWorkers=None):
+    games = int(games)
+    if(maxWorkers is None):
+        maxWorkers = os.cpu_count() or 1
+    maxWorkers = int(maxWorkers)
+    workerCounts = []
+    n = 1
+    while(n < maxWorkers):
+        workerCounts.append(n)
+        n *= 2
+    workerCounts.append(maxWorkers)
+
+    baseline = None
+    for workers in workerCounts:
+        with tempfile.TemporaryDirectory() as outputDir:
+            start = time.perf_counter()
+            runSelfPlay(modelPath, outputDir, games, workers, seed=0)
+            elapsed = time.perf_counter() - start
+        rate = games / elapsed
+        if(baseline is None):
+            baseline = rate
+        print(str(workers).rjust(3) + " workers: " + str(round(rate, 2)) + " games/s, speedup "
+              + str(round(rate / baseline, 2)) + "x, efficiency "
+              + str(round(100 * rate / baseline / workers)) + "%")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,263 @@
+# Suite de bancs d'essai de tous les moteurs du dépôt, avec comparaison à une référence enregistrée
+# Chaque cas joue un ensemble fixe de positions avec des graines fixes et retourne ses mesures :
+#   perft      : common.game.Board.perft, noeuds par seconde
+#   minimax    : résolution complète de hexapawn par common.mnx_minimax (table vide)
+#   mcts       : common.rnf_mcts.MCTS.search, playouts par seconde et appels au réseau
+#   alphabeta  : getNextMove de Content/alpha_beta_play.py sur des positions de Partie_Alpha_Beta.pgn
+# Les résultats sont écrits en JSON et comparés à benchmarks/baseline.json : une mesure de temps
+# moins bonne que la référence au-delà de la tolérance, ou un compteur qui augmente, est une régression
+# (code de sortie 1). Les temps sont la médiane de plusieurs répétitions ; une mesure plus courte que
+# SHORT_MEASUREMENT a une tolérance d'au moins SHORT_TOLERANCE, le bruit de la machine y pesant davantage.
+# --profile affiche les fonctions les plus coûteuses d'un cas (cProfile).
+# Utilisation : python -m benchmarks.suite [--only perft mcts] [--output résultats.json]
+#               [--update-baseline] [--tolerance 0.25] [--profile alphabeta]
+import argparse
+import cProfile
+import json
+import os
+import platform
+import pstats
+import random
+import sys
+import time
+
+import numpy as np
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Sens de chaque mesure : "higher" (débit), "lower" (temps, travail) ou "exact" (résultat qui ne doit pas changer)
+HIGHER = "higher"
+LOWER = "lower"
+EXACT = "exact"
+
+SHORT_MEASUREMENT = 0.25  # Durée (secondes) d'une répétition en dessous de laquelle une mesure est courte
+SHORT_TOLERANCE = 0.5
+
+
+# Temps médian sur plusieurs répétitions (une répétition perturbée par le reste de la machine ne compte pas)
+def medianTime(function, repeat):
+    times = []
+    result = None
+    for _ in range(0, repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)), result
+
+
+def benchPerft(repeat):
+    from common.game import Board
+
+    rounds = 200  # L'arbre complet de hexapawn est petit : il est parcouru plusieurs fois par mesure
+
+    def run():
+        nodes = 0
+        for depth in range(1, 10):
+            board = Board()
+            board.setStartingPosition()
+            nodes += board.perft(depth)
+        for _ in range(1, rounds):
+            for depth in range(1, 10):
+                board.perft(depth)
+        return nodes
+
+    elapsed, nodes = medianTime(run, repeat)
+    return {"nodes": (nodes, EXACT), "nodesPerSecond": (rounds * nodes / elapsed, HIGHER, elapsed)}
+
+
+def benchMinimax(repeat):
+    from common import mnx_minimax
+    from common.game import Board
+
+    rounds = 100  # Nombre de résolutions complètes (table vide) par mesure
+
+    # Résolution de la position de départ puis des positions de 200 parties aléatoires (graine fixe)
+    def solve():
+        solver = mnx_minimax.Solver()
+        rng = random.Random(0)
+        board = Board()
+        board.setStartingPosition()
+        value = mnx_minimax.minimax(board, mnx_minimax.SOLVED_DEPTH, True, solver)
+        for _ in range(0, 200):
+            board = Board()
+            board.setStartingPosition()
+            while(not board.isTerminal()[0]):
+                solver.bestMove(board)
+                board.applyMove(rng.choice(board.generateMoves()))
+        return value, solver.nodeCount, len(solver.table)
+
+    def run():
+        for _ in range(0, rounds):
+            result = solve()
+        return result
+
+    elapsed, (value, nodes, entries) = medianTime(run, repeat)
+    return {"startValue": (value, EXACT), "nodes": (nodes, LOWER), "tableEntries": (entries, EXACT),
+            "solveMilliseconds": (1000 * elapsed / rounds, LOWER, elapsed)}
+
+
+def benchMcts(repeat):
+    from benchmarks.mcts_tree import CountingNetwork
+    from common import rnf_mcts
+    from common.game import Board
+    from common.np_network import NumpyNetwork
+
+    network = CountingNetwork(NumpyNetwork.random(0))
+    searches = 20
+    playouts = 100
+
+    def run():
+        random.seed(0)
+        network.calls = 0
+        for _ in range(0, searches):
+            board = Board()
+            board.setStartingPosition()
+            rootEdge = rnf_mcts.Edge(None, None)
+            rootEdge.N = 1
+            searcher = rnf_mcts.MCTS(network)
+            searcher.numPlayouts = playouts
+            searcher.search(rnf_mcts.Node(board, rootEdge))
+        return network.calls
+
+    elapsed, calls = medianTime(run, repeat)
+    return {"playoutsPerSecond": (searches * playouts / elapsed, HIGHER, elapsed), "networkCalls": (calls, LOWER)}
+
+
+def benchAlphaBeta(repeat):
+    import chess
+    from benchmarks.chess_eval import gamePositions
+    from Content import alpha_beta_play
+
+    positions = gamePositions()[10:50:10]
+    depth = 3
+
+    def run():
+        alpha_beta_play.transpositionTable.clear()
+        stats = alpha_beta_play.SearchStats()
+        moves = []
+        for board in positions:
+            move, _ = alpha_beta_play.getNextMove(depth, board, board.turn == chess.WHITE, stats=stats)
+            moves.append(move.uci())
+        return stats.nodes, moves
+
+    elapsed, (nodes, moves) = medianTime(run, repeat)
+    return {"nodes": (nodes, LOWER), "nodesPerSecond": (nodes / elapsed, HIGHER, elapsed),
+            "bestMoves": (" ".join(moves), EXACT)}
+
+
+CASES = {"perft": benchPerft, "minimax": benchMinimax, "mcts": benchMcts, "alphabeta": benchAlphaBeta}
+
+
+# Tolérance d'une mesure de temps : au moins SHORT_TOLERANCE si la mesure ou sa référence est courte
+def timingTolerance(entry, reference, tolerance):
+    seconds = min(entry.get("seconds", SHORT_MEASUREMENT), reference.get("seconds", SHORT_MEASUREMENT))
+    if(seconds < SHORT_MEASUREMENT):
+        return max(tolerance, SHORT_TOLERANCE)
+    return tolerance
+
+
+# Compare les mesures à la référence ; retourne la liste des régressions (texte)
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, metrics in results["cases"].items():
+        reference = baseline.get("cases", {}).get(name)
+        if(reference is None):
+            print(name + ": no baseline")
+            continue
+        for metric, entry in metrics.items():
+            value = entry["value"]
+            if(metric not in reference):
+                continue
+            old = reference[metric]["value"]
+            direction = entry["direction"]
+            line = "  " + name + "." + metric + ": " + str(old) + " -> " + str(value)
+            if(direction == EXACT):
+                regressed = value != old
+            elif(direction == HIGHER):
+                regressed = value < old * (1 - timingTolerance(entry, reference[metric], tolerance))
+                line += " (" + str(round(100 * (value / old - 1), 1)) + "%)" if old else ""
+            else:
+                # Les compteurs déterministes (noeuds, appels) n'ont pas de tolérance, les temps si
+                allowed = timingTolerance(entry, reference[metric], tolerance) if isinstance(value, float) else 0
+                regressed = value > old * (1 + allowed)
+                line += " (" + str(round(100 * (value / old - 1), 1)) + "%)" if old else ""
+            if(regressed):
+                line += "  REGRESSION"
+                regressions.append(line.strip())
+            print(line)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark suite for the hexapawn and chess engines")
+    parser.add_argument("--only", nargs="+", choices=sorted(CASES), default=None, help="cases to run")
+    parser.add_argument("--repeat", type=int, default=5, help="repetitions (the median time is kept)")
+    parser.add_argument("--output", default=None, help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown on timings (0.25 = 25%%)")
+    parser.add_argument("--profile", choices=sorted(CASES), default=None, help="profile one case with cProfile")
+    args = parser.parse_args()
+
+    if(args.profile is not None):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        CASES[args.profile](1)
+        profiler.disable()
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+        return 0
+
+    np.random.seed(0)
+    names = args.only if args.only is not None else list(CASES)
+    results = {"machine": {"python": platform.python_version(), "platform": platform.platform(),
+                           "cpus": os.cpu_count()},
+               "cases": {}}
+    for name in names:
+        start = time.perf_counter()
+        metrics = CASES[name](args.repeat)
+        # Mesure de temps : (valeur, sens, durée d'une répétition en secondes) ; autre mesure : (valeur, sens)
+        results["cases"][name] = {}
+        for metric, measure in metrics.items():
+            entry = {"value": measure[0], "direction": measure[1]}
+            if(len(measure) > 2):
+                entry["seconds"] = measure[2]
+            results["cases"][name][metric] = entry
+        print(name + " (" + str(round(time.perf_counter() - start, 1)) + " s): "
+              + ", ".join(metric + "=" + (str(round(measure[0], 1)) if isinstance(measure[0], float)
+                                          else str(measure[0]))
+                          for metric, measure in metrics.items()))
+
+    if(args.output is not None):
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+
+    if(args.update_baseline):
+        baseline = {"cases": {}}
+        if(os.path.exists(args.baseline)):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline["machine"] = results["machine"]
+        baseline["cases"].update(results["cases"])
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=1)
+            f.write("\n")
+        print("baseline written to " + args.baseline)
+        return 0
+
+    if(not os.path.exists(args.baseline)):
+        print("no baseline at " + args.baseline + " (run with --update-baseline)")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print("comparison with " + args.baseline + " (tolerance " + str(int(100 * args.tolerance)) + "% on timings, "
+          + str(int(100 * max(args.tolerance, SHORT_TOLERANCE))) + "% under " + str(SHORT_MEASUREMENT) + " s)")
+    regressions = compare(results, baseline, args.tolerance)
+    if(len(regressions) > 0):
+        print(str(len(regressions)) + " regression(s)")
+        return 1
+    print("no regression")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+# Symétrie gauche-droite de hexapawn (common.game) dans les tables et les données d'apprentissage
+# Vérifie sur toutes les positions atteignables que :
+#   - la position image a les coups, les entrées du réseau et le résultat attendus,
+#   - le solveur minimax à table canonique donne les mêmes valeurs qu'une recherche sans table,
+#     et un meilleur coup légal qui atteint cette valeur,
+#   - le cache d'évaluations canonique rend, pour une position image, les probabilités de la
+#     position canonique permutées par MIRROR_OUTPUT,
+# puis compare le nombre d'entrées des tables avec et sans symétrie.
+# Utilisation : python -m benchmarks.symmetry
+import numpy as np
+
+from benchmarks.arena import reachablePositions
+from common import mnx_minimax
+from common.game import MIRROR_INPUT, MIRROR_OUTPUT, Board, mirrorMove
+from common.np_network import NumpyNetwork
+from common.rnf_cache import EvaluationCache
+
+
+# Valeur exacte sans table de transposition (référence)
+def plainValue(board):
+    terminal, winner = board.isTerminal()
+    if(terminal):
+        return mnx_minimax.WIN_SCORE if winner == Board.WHITE else -mnx_minimax.WIN_SCORE
+    values = []
+    for move in board.generateMoves():
+        board.applyMove(move)
+        values.append(plainValue(board))
+        board.undoMove()
+    return max(values) if board.turn == Board.WHITE else min(values)
+
+
+def main():
+    boards = reachablePositions()
+    for board in boards:
+        image = board.mirrored()
+        assert image.mirrored().hashKey() == board.hashKey()
+        assert image.isTerminal() == board.isTerminal()
+        assert sorted(mirrorMove(m) for m in board.generateMoves()) == sorted(image.generateMoves())
+        assert np.array_equal(np.array(image.toNetworkInput())[MIRROR_INPUT], board.toNetworkInput())
+        assert board.canonicalKey()[0] == image.canonicalKey()[0]
+    canonical = {board.canonicalKey()[0] for board in boards}
+    print(str(len(boards)) + " reachable positions, " + str(len(canonical)) + " up to symmetry")
+
+    solver = mnx_minimax.Solver()
+    for board in boards:
+        move, value = solver.bestMove(board)
+        assert value == plainValue(board), board.toString()
+        if(move is not None):
+            assert move in board.generateMoves(), board.toString()
+            board.applyMove(move)
+            assert plainValue(board) == value, board.toString()
+            board.undoMove()
+    print("minimax: values and best moves verified, " + str(len(solver.table)) + " table entries")
+
+    network = NumpyNetwork.random(0)
+    plain = EvaluationCache(network, canonical=False)
+    cache = EvaluationCache(network)
+    cache.evaluateBatch(boards)
+    plain.evaluateBatch(boards)
+    for board in boards:
+        key, mirrored = board.canonicalKey()
+        if(not mirrored or board.isTerminal()[0]):
+            continue
+        priors, value = cache.evaluate(board)
+        canonicalPriors, canonicalValue = plain.evaluate(board.mirrored())
+        policy = np.zeros(28)
+        policy[board.mirrored().legalMoveIndices()] = canonicalPriors
+        assert np.allclose(priors, policy[MIRROR_OUTPUT][board.legalMoveIndices()]) and value == canonicalValue
+    print("evaluation cache: " + str(len(plain)) + " entries without symmetry, " + str(len(cache)) + " with")
+
+
+if __name__ == "__main__":
+    main()
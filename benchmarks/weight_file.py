@@ -0,0 +1,83 @@
+# Fichier de poids plat (NumpyNetwork.save / load) contre keras.models.load_model
+# Pour chaque format, un nouveau processus Python charge le réseau et évalue une position : le temps total
+# (démarrage de l'interpréteur compris), le temps de chargement et la mémoire résidente (privée et partagée
+# par le cache de pages, lues dans /proc/self/status) sont mesurés. Les variantes float16 et int8 sont
+# comparées au réseau float32 sur toutes les positions atteignables (écart maximal, coup choisi identique).
+# Utilisation : python -m benchmarks.weight_file [modèle.keras]
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.arena import reachablePositions
+from common.np_network import FLAT_DTYPES, NumpyNetwork
+
+# Code exécuté dans le processus mesuré
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+path = sys.argv[1]
+if(path.endswith(".keras")):
+    import keras
+    model = keras.models.load_model(path)
+    predict = lambda x: model.predict(x, verbose=0)
+else:
+    from common.np_network import NumpyNetwork
+    predict = NumpyNetwork.load(path).predict
+import numpy as np
+predict(np.zeros((1, 21), dtype=np.float32))
+loaded = time.perf_counter() - start
+status = dict(line.split(":", 1) for line in open("/proc/self/status") if ":" in line)
+memory = {key: int(status[key].split()[0]) // 1024 for key in ("VmRSS", "RssAnon", "RssFile") if key in status}
+print(json.dumps({"load": loaded, "memory": memory, "framework": "keras" in sys.modules or "tensorflow" in sys.modules}))
+"""
+
+
+def coldStart(path, repeat=3):
+    best = None
+    for _ in range(0, repeat):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", CHILD, path], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result["total"] = time.perf_counter() - start
+        if(best is None or result["total"] < best["total"]):
+            best = result
+    return best
+
+
+def main(modelPath="model_it10.keras"):
+    modelPath = os.path.abspath(modelPath)
+    network = NumpyNetwork.load(modelPath)
+    directory = tempfile.mkdtemp()
+    paths = {"keras": modelPath}
+    for dtype in FLAT_DTYPES:
+        paths[dtype] = os.path.join(directory, "model_" + dtype + ".npw")
+        network.save(paths[dtype], dtype)
+
+    for name, path in paths.items():
+        r = coldStart(path)
+        print(name.ljust(8) + ": " + str(os.path.getsize(path) // 1024).rjust(4) + " KB, process "
+              + str(round(r["total"], 2)) + " s (load + first predict " + str(round(r["load"], 3)) + " s), RSS "
+              + str(r["memory"].get("VmRSS")) + " MB (private " + str(r["memory"].get("RssAnon")) + " MB, file "
+              + str(r["memory"].get("RssFile")) + " MB), keras imported: " + str(r["framework"]))
+
+    boards = [b for b in reachablePositions() if not b.isTerminal()[0]]
+    x = np.array([b.toNetworkInput() for b in boards], dtype=np.float32)
+    masks = np.array([b.legalMoveMask() for b in boards])
+    reference = NumpyNetwork.load(paths["float32"]).predict(x)
+    for dtype in ("float16", "int8"):
+        policy, value = NumpyNetwork.load(paths[dtype]).predict(x)
+        same = np.mean(np.argmax(np.where(masks, policy, -1), axis=1)
+                       == np.argmax(np.where(masks, reference[0], -1), axis=1))
+        print(dtype.ljust(8) + ": max |dpolicy| " + str(round(float(np.abs(policy - reference[0]).max()), 5))
+              + ", max |dvalue| " + str(round(float(np.abs(value - reference[1]).max()), 5)) + ", same move on "
+              + str(round(100 * same, 1)) + "% of " + str(len(boards)) + " positions")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
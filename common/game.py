@@ -1,182 +1,242 @@
-# Définition d'une class python Board
+# Représentation compacte du plateau de hexapawn
+# Chaque case i (0..8) correspond au bit (1 << i) d'un masque entier sur 9 bits :
+#   0 1 2   <- rangée d'arrivée des blancs
+#   3 4 5
+#   6 7 8   <- rangée d'arrivée des noirs
+# Les tables de mouvements et d'index de sortie du réseau sont calculées une seule fois
+# au niveau du module et partagées par toutes les instances (plus de copie à chaque noeud).
+import numpy as np
+
+EMPTY = 0
+WHITE = 1
+BLACK = 2
+
+# Masques des rangées de promotion
+WHITE_GOAL_MASK = (1 << 0) | (1 << 1) | (1 << 2)
+BLACK_GOAL_MASK = (1 << 6) | (1 << 7) | (1 << 8)
+
+# Dictionnaire pour mapper les mouvements possibles aux index de sortie du réseau
+# Les clés sont les tuples (case de départ, case d'arrivée)
+MOVE_INDEX = {
+    # Indices de sortie pour les mouvements des pions blancs vers l'avant
+    (6, 3): 0, (7, 4): 1, (8, 5): 2, (3, 0): 3, (4, 1): 4, (5, 2): 5,
+    # Indices de sortie pour les mouvements des pions noirs vers l'avant
+    (0, 3): 6, (1, 4): 7, (2, 5): 8, (3, 6): 9, (4, 7): 10, (5, 8): 11,
+    # Indices de sortie pour les captures de pions blancs
+    (6, 4): 12, (7, 3): 13, (7, 5): 14, (8, 4): 15,
+    (3, 1): 16, (4, 0): 17, (4, 2): 18, (5, 1): 19,
+    # Indices de sortie pour les captures de pions noirs
+    (0, 4): 20, (1, 3): 21, (1, 5): 22, (2, 4): 23,
+    (3, 7): 24, (4, 6): 25, (4, 8): 26, (5, 7): 27,
+}
+
+# Même table indexée par la représentation textuelle "(ligne, colonne)" historique
+OUTPUT_INDEX = {str(move): idx for move, idx in MOVE_INDEX.items()}
+
+# Même table sous forme de liste plate : l'index de sortie du coup (départ, arrivée) est
+# MOVE_INDEX_TABLE[9 * départ + arrivée] (-1 pour un coup qui n'existe pas)
+MOVE_INDEX_TABLE = [-1] * 81
+for (fromSquare, toSquare), idx in MOVE_INDEX.items():
+    MOVE_INDEX_TABLE[9 * fromSquare + toSquare] = idx
+
+# Nombre de sorties de politique du réseau
+NUM_OUTPUTS = len(MOVE_INDEX)
+
+# Index de sortie et masque des coups légaux de chaque position déjà rencontrée (clé : hashKey)
+# Hexapawn n'a que quelques centaines de positions : ces tables restent petites
+LEGAL_INDICES = {}
+LEGAL_MASKS = {}
+
+# Liste indiquant les cases de capture possibles pour les pions blancs
+WHITE_PAWN_CAPTURES = [[], [], [], [1], [0, 2], [1], [4], [3, 5], [4]]
+
+# Liste indiquant les cases de capture possibles pour les pions noirs
+BLACK_PAWN_CAPTURES = [[4], [3, 5], [4], [7], [6, 8], [7], [], [], []]
+
+# Case d'avance (ou None) depuis chaque case, pour chaque couleur
+WHITE_PUSHES = [i - 3 if i - 3 >= 0 else None for i in range(0, 9)]
+BLACK_PUSHES = [i + 3 if i + 3 < 9 else None for i in range(0, 9)]
+
+# Liste des cases occupées pour chaque masque possible (0..511)
+SQUARES_OF_MASK = [tuple(i for i in range(0, 9) if mask & (1 << i)) for mask in range(0, 512)]
+
+# Vecteur 0/1 des 9 cases pour chaque masque, utilisé par toNetworkInput
+BITS_OF_MASK = [[(mask >> i) & 1 for i in range(0, 9)] for mask in range(0, 512)]
+
+# Symétrie gauche-droite du plateau : case image de chaque case (colonne 0 <-> colonne 2)
+MIRROR_SQUARE = [3 * (i // 3) + 2 - i % 3 for i in range(0, 9)]
+
+# Masque image de chaque masque (0..511)
+MIRROR_MASK = [sum(1 << MIRROR_SQUARE[i] for i in SQUARES_OF_MASK[mask]) for mask in range(0, 512)]
+
+# Permutations des 21 entrées et des 28 sorties du réseau pour la position symétrique :
+# x[..., MIRROR_INPUT] est l'entrée de la position image, policy[..., MIRROR_OUTPUT] sa politique
+# (chaque permutation est sa propre inverse)
+MIRROR_INPUT = np.array(MIRROR_SQUARE + [9 + i for i in MIRROR_SQUARE] + [18, 19, 20], dtype=np.intp)
+MIRROR_OUTPUT = np.zeros(NUM_OUTPUTS, dtype=np.intp)
+for (fromSquare, toSquare), idx in MOVE_INDEX.items():
+    MIRROR_OUTPUT[idx] = MOVE_INDEX[(MIRROR_SQUARE[fromSquare], MIRROR_SQUARE[toSquare])]
+
+
 class Board():
 
     # Définition des constantes pour les pièces et les couleurs
-    EMPTY = 0
-    WHITE = 1
-    BLACK = 2
+    EMPTY = EMPTY
+    WHITE = WHITE
+    BLACK = BLACK
+
+    # Tables partagées, conservées comme attributs de classe pour la compatibilité
+    outputIndex = OUTPUT_INDEX
+    WHITE_PAWN_CAPTURES = WHITE_PAWN_CAPTURES
+    BLACK_PAWN_CAPTURES = BLACK_PAWN_CAPTURES
+
+    # Seuls ces attributs existent : pas de __dict__ par instance
+    __slots__ = ("white", "black", "turn", "legal_moves", "history")
 
     def __init__(self):
-        # Initialisation du plateau de jeu avec les pièces et les couleurs par défaut
-        self.board = [self.EMPTY, self.EMPTY, self.EMPTY,
-                      self.EMPTY, self.EMPTY, self.EMPTY,
-                      self.EMPTY, self.EMPTY, self.EMPTY ]
+        # Masques des pions blancs et noirs (plateau vide au départ)
+        self.white = 0
+        self.black = 0
 
         # Initialisation du joueur dont c'est le tour
-        self.turn = self.WHITE
-
-        # Dictionnaire pour mapper les mouvements possibles aux index de sortie du réseau
-        self.outputIndex = {}
+        self.turn = WHITE
 
         # Liste des mouvements légaux (initialisée à None car elle sera calculée dynamiquement)
         self.legal_moves = None
 
-        # Définition des indices de sortie pour les différents types de mouvements possibles
-        # (mouvements en avant, captures de pions adverses, etc.)
-        # Chaque mouvement possible est associé à un index de sortie correspondant dans le réseau
-        # Ces indices sont utilisés pour l'apprentissage et l'inférence du réseau de neurones
-        # Les mouvements sont représentés par des coordonnées (ligne, colonne) de la forme "(ligne, colonne)"
-        # Ces coordonnées sont stockées sous forme de chaînes de caractères dans le dictionnaire outputIndex
-
-        # Indices de sortie pour les mouvements des pions blancs vers l'avant
-        self.outputIndex["(6, 3)"] = 0
-        self.outputIndex["(7, 4)"] = 1
-        self.outputIndex["(8, 5)"] = 2
-        self.outputIndex["(3, 0)"] = 3
-        self.outputIndex["(4, 1)"] = 4
-        self.outputIndex["(5, 2)"] = 5
-
-        # Indices de sortie pour les mouvements des pions noirs vers l'avant
-        self.outputIndex["(0, 3)"] = 6
-        self.outputIndex["(1, 4)"] = 7
-        self.outputIndex["(2, 5)"] = 8
-        self.outputIndex["(3, 6)"] = 9
-        self.outputIndex["(4, 7)"] = 10
-        self.outputIndex["(5, 8)"] = 11
-
-        # Indices de sortie pour les captures de pions blancs
-        self.outputIndex["(6, 4)"] = 12
-        self.outputIndex["(7, 3)"] = 13
-        self.outputIndex["(7, 5)"] = 14
-        self.outputIndex["(8, 4)"] = 15
-        self.outputIndex["(3, 1)"] = 16
-        self.outputIndex["(4, 0)"] = 17
-        self.outputIndex["(4, 2)"] = 18
-        self.outputIndex["(5, 1)"] = 19
-
-        # Indices de sortie pour les captures de pions noirs
-        self.outputIndex["(0, 4)"] = 20
-        self.outputIndex["(1, 3)"] = 21
-        self.outputIndex["(1, 5)"] = 22
-        self.outputIndex["(2, 4)"] = 23
-        self.outputIndex["(3, 7)"] = 24
-        self.outputIndex["(4, 6)"] = 25
-        self.outputIndex["(4, 8)"] = 26
-        self.outputIndex["(5, 7)"] = 27
-
-        # Liste indiquant les cases de capture possibles pour les pions blancs
-        self.WHITE_PAWN_CAPTURES = [
-            [],
-            [],
-            [],
-            [1],
-            [0,2],
-            [1],
-            [4],
-            [3,5],
-            [4]
-        ]
-
-        # Liste indiquant les cases de capture possibles pour les pions noirs
-        self.BLACK_PAWN_CAPTURES = [
-            [4],
-            [3,5],
-            [4],
-            [7],
-            [6,8],
-            [7],
-            [],
-            [],
-            []
-        ]
+        # Pile des mouvements joués (case de départ, case d'arrivée, capture, coups légaux) pour undoMove
+        self.history = []
+
+    # Vue du plateau sous forme de liste de 9 cases (EMPTY/WHITE/BLACK)
+    @property
+    def board(self):
+        return [WHITE if self.white & (1 << i) else (BLACK if self.black & (1 << i) else EMPTY)
+                for i in range(0, 9)]
+
+    @board.setter
+    def board(self, squares):
+        self.white = 0
+        self.black = 0
+        for i in range(0, 9):
+            if(squares[i] == WHITE):
+                self.white |= (1 << i)
+            elif(squares[i] == BLACK):
+                self.black |= (1 << i)
+        self.legal_moves = None
+
+    # Copie rapide du plateau (remplace copy.deepcopy)
+    # withHistory=False donne une copie plus légère qui ne permet pas d'annuler les coups déjà joués
+    def copy(self, withHistory=True):
+        other = Board.__new__(Board)
+        other.white = self.white
+        other.black = self.black
+        other.turn = self.turn
+        other.legal_moves = self.legal_moves
+        if(withHistory):
+            other.history = list(self.history)
+        else:
+            other.history = []
+        return other
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    # Clé entière compacte de la position (masques et trait), utilisable comme clé de table
+    def hashKey(self):
+        return self.white | (self.black << 9) | ((self.turn == BLACK) << 18)
+
+    # Clé canonique de la position : la plus petite des clés de la position et de son image.
+    # Retourne (clé, True si la position est l'image de la position canonique)
+    # Les deux positions symétriques partagent ainsi une seule entrée de table ou de cache.
+    def canonicalKey(self):
+        key = self.hashKey()
+        mirrorKey = MIRROR_MASK[self.white] | (MIRROR_MASK[self.black] << 9) | ((self.turn == BLACK) << 18)
+        if(mirrorKey < key):
+            return mirrorKey, True
+        return key, False
+
+    # Position symétrique (sans historique)
+    def mirrored(self):
+        other = Board.__new__(Board)
+        other.white = MIRROR_MASK[self.white]
+        other.black = MIRROR_MASK[self.black]
+        other.turn = self.turn
+        other.legal_moves = None
+        other.history = []
+        return other
 
     # Méthode pour déterminer si le jeu est terminé et qui a gagné
     def isTerminal(self):
-        winner = None
-        # Le joueur noir gagne s'il a placé un pion sur la première rangée
-        if(self.board[6] == Board.BLACK or
-                self.board[7] == self.BLACK or
-                self.board[8] == self.BLACK):
-            winner = self.BLACK
         # Le joueur blanc gagne s'il a placé un pion sur la quatrième rangée
-        if (self.board[0] == self.WHITE or
-                self.board[1] == self.WHITE or
-                self.board[2] == self.WHITE):
-            winner = self.WHITE
-        if(winner != None):
-            return (True, winner)
-        else:
-            # Match nul s'il n'y a pas de gagnant et que le joueur actuel ne peut pas jouer
-            if(len(self.generateMoves()) == 0):
-                if(self.turn == Board.WHITE):
-                    return (True, Board.BLACK)
-                else:
-                    return (True, Board.WHITE)
+        if(self.white & WHITE_GOAL_MASK):
+            return (True, WHITE)
+        # Le joueur noir gagne s'il a placé un pion sur la première rangée
+        if(self.black & BLACK_GOAL_MASK):
+            return (True, BLACK)
+        # Le joueur qui ne peut plus jouer a perdu
+        if(len(self.generateMoves()) == 0):
+            if(self.turn == WHITE):
+                return (True, BLACK)
             else:
-                return (False, None)
+                return (True, WHITE)
+        return (False, None)
 
     # Méthode pour obtenir une représentation textuelle du plateau de jeu
     def toString(self):
-        if(self.turn == self.WHITE):
-            return "w:"  + "".join([ str(x) for x in self.board])
+        if(self.turn == WHITE):
+            return "w:" + "".join([str(x) for x in self.board])
         else:
-            return "b:"  + "".join([ str(x) for x in self.board])
+            return "b:" + "".join([str(x) for x in self.board])
 
     # Méthode pour obtenir une représentation visuelle du plateau de jeu
     def toDisplayString(self):
+        symbols = {WHITE: "W", BLACK: "B", EMPTY: "_"}
+        squares = self.board
         s = ""
-        for i in range(0,3):
-            if(self.board[i] == self.WHITE):
-                s += "W"
-            if(self.board[i] == self.BLACK):
-                s += "B"
-            if(self.board[i] == self.EMPTY):
-                s += "_"
-        s += "\n"
-        for i in range(3,6):
-            if(self.board[i] == self.WHITE):
-                s += "W"
-            if(self.board[i] == self.BLACK):
-                s += "B"
-            if(self.board[i] == self.EMPTY):
-                s += "_"
-        s += "\n"
-        for i in range(6,9):
-            if(self.board[i] == self.WHITE):
-                s += "W"
-            if(self.board[i] == self.BLACK):
-                s += "B"
-            if(self.board[i] == self.EMPTY):
-                s += "_"
-        s += "\n"
+        for row in range(0, 3):
+            s += "".join([symbols[squares[3 * row + col]] for col in range(0, 3)])
+            s += "\n"
         return s
 
     # Méthode pour obtenir une représentation du plateau de jeu adaptée à l'entrée du réseau de neurones
+    # 9 cases des pions blancs, 9 cases des pions noirs, puis 3 fois la couleur du joueur actuel
     def toNetworkInput(self):
-        posVec = []
-        # Ajoute les pions blancs
-        for i in range(0,9):
-            if(self.board[i] == Board.WHITE):
-                posVec.append(1)
-            else:
-                posVec.append(0)
-        # Ajoute les pions noirs
-        for i in range(0,9):
-            if(self.board[i] == Board.BLACK):
-                posVec.append(1)
-            else:
-                posVec.append(0)
-        # Ajoute la couleur du joueur actuel
-        for i in range(0,3):
-            if(self.turn == Board.WHITE):
-                posVec.append(1)
-            else:
-                posVec.append(0)
-        return posVec
+        if(self.turn == WHITE):
+            return BITS_OF_MASK[self.white] + BITS_OF_MASK[self.black] + [1, 1, 1]
+        return BITS_OF_MASK[self.white] + BITS_OF_MASK[self.black] + [0, 0, 0]
 
     # Méthode pour obtenir l'index de sortie du réseau de neurones correspondant à un mouvement donné
+    # (ValueError pour un coup qui n'existe pas en hexapawn)
     def getNetworkOutputIndex(self, move):
-        return self.outputIndex[str(move)]
+        fromSquare, toSquare = move
+        idx = MOVE_INDEX_TABLE[9 * fromSquare + toSquare] if 0 <= fromSquare < 9 and 0 <= toSquare < 9 else -1
+        if(idx < 0):
+            raise ValueError("no network output for move " + str(move))
+        return idx
+
+    # Index de sortie du réseau des coups légaux, dans l'ordre de generateMoves (tableau d'entiers)
+    def legalMoveIndices(self):
+        key = self.hashKey()
+        indices = LEGAL_INDICES.get(key)
+        if(indices is None):
+            indices = np.array([MOVE_INDEX_TABLE[9 * m[0] + m[1]] for m in self.generateMoves()], dtype=np.intp)
+            indices.flags.writeable = False
+            LEGAL_INDICES[key] = indices
+        return indices
+
+    # Masque booléen des coups légaux sur les 28 sorties du réseau
+    def legalMoveMask(self):
+        key = self.hashKey()
+        mask = LEGAL_MASKS.get(key)
+        if(mask is None):
+            mask = np.zeros(NUM_OUTPUTS, dtype=bool)
+            mask[self.legalMoveIndices()] = True
+            mask.flags.writeable = False
+            LEGAL_MASKS[key] = mask
+        return mask
 
     # Méthode pour définir la position de départ du plateau de jeu
     def setStartingPosition(self):
@@ -184,51 +244,102 @@ class Board():
         # NOIR NOIR NOIR
         # ####### #######
         # BLANC BLANC BLANC
-        self.board = [self.BLACK, self.BLACK, self.BLACK,
-                      self.EMPTY, self.EMPTY, self.EMPTY,
-                      self.WHITE, self.WHITE, self.WHITE ]
+        self.white = BLACK_GOAL_MASK
+        self.black = WHITE_GOAL_MASK
+        self.legal_moves = None
+        self.history = []
 
-    # Méthode pour appliquer un mouvement sur le plateau de jeu
+    # Méthode pour appliquer un mouvement sur le plateau de jeu (en place)
     def applyMove(self, move):
-        fromSquare = move[0]
-        toSquare = move[1]
-        # Déplace la pièce
-        self.board[toSquare] = self.board[fromSquare]
-        self.board[fromSquare] = self.EMPTY
-        # Change le tour du joueur
-        if(self.turn == self.WHITE):
-            self.turn = self.BLACK
+        fromSquare, toSquare = move
+        fromBit = 1 << fromSquare
+        toBit = 1 << toSquare
+        if(self.turn == WHITE):
+            captured = (self.black & toBit) != 0
+            self.white ^= fromBit | toBit
+            self.black &= ~toBit
+            self.turn = BLACK
         else:
-            self.turn = self.WHITE
+            captured = (self.white & toBit) != 0
+            self.black ^= fromBit | toBit
+            self.white &= ~toBit
+            self.turn = WHITE
+        self.history.append((fromSquare, toSquare, captured, self.legal_moves))
         self.legal_moves = None  # Réinitialise les mouvements légaux
 
+    # Méthode pour annuler le dernier mouvement appliqué (en place)
+    def undoMove(self):
+        fromSquare, toSquare, captured, legal_moves = self.history.pop()
+        fromBit = 1 << fromSquare
+        toBit = 1 << toSquare
+        if(self.turn == BLACK):
+            # Le dernier mouvement a été joué par les blancs
+            self.white ^= fromBit | toBit
+            if(captured):
+                self.black |= toBit
+            self.turn = WHITE
+        else:
+            self.black ^= fromBit | toBit
+            if(captured):
+                self.white |= toBit
+            self.turn = BLACK
+        self.legal_moves = legal_moves  # Restaure les mouvements légaux déjà calculés
+
     # Méthode pour générer tous les mouvements légaux possibles pour le joueur actuel
     def generateMoves(self):
-        if(self.legal_moves == None):
+        if(self.legal_moves is None):
             moves = []
-            for i in range(0, 9):
-                if(self.board[i] == self.turn):
-                    if(self.turn == self.WHITE):
-                        # Vérifie si le joueur blanc peut avancer d'une case
-                        toSquare = i - 3
-                        if(toSquare >= 0):
-                            if(self.board[toSquare] == self.EMPTY):
-                                moves.append((i, toSquare))
-                        # Vérifie s'il peut capturer à gauche ou à droite
-                        potCaptureSquares = self.WHITE_PAWN_CAPTURES[i]
-                        for toSquare in potCaptureSquares:
-                            if(self.board[toSquare] == self.BLACK):
-                                moves.append((i, toSquare))
-                    if (self.turn == self.BLACK):
-                        # Vérifie si le joueur noir peut avancer d'une case
-                        toSquare = i + 3
-                        if(toSquare < 9):
-                            if (self.board[toSquare] == self.EMPTY):
-                                moves.append((i, toSquare))
-                        # Vérifie s'il peut capturer à gauche ou à droite
-                        potCaptureSquares = self.BLACK_PAWN_CAPTURES[i]
-                        for toSquare in potCaptureSquares:
-                            if (self.board[toSquare] == self.WHITE):
-                                moves.append((i, toSquare))
+            if(self.turn == WHITE):
+                own, opp, pushes, captures = self.white, self.black, WHITE_PUSHES, WHITE_PAWN_CAPTURES
+            else:
+                own, opp, pushes, captures = self.black, self.white, BLACK_PUSHES, BLACK_PAWN_CAPTURES
+            occupied = own | opp
+            for i in SQUARES_OF_MASK[own]:
+                # Vérifie si le pion peut avancer d'une case
+                toSquare = pushes[i]
+                if(toSquare is not None and not (occupied & (1 << toSquare))):
+                    moves.append((i, toSquare))
+                # Vérifie s'il peut capturer à gauche ou à droite
+                for toSquare in captures[i]:
+                    if(opp & (1 << toSquare)):
+                        moves.append((i, toSquare))
             self.legal_moves = moves
         return self.legal_moves
+
+    # Compte le nombre de feuilles de l'arbre des coups à une profondeur donnée (perft)
+    # Les positions terminales ne sont pas développées
+    def perft(self, depth):
+        if(depth == 0):
+            return 1
+        if(self.isTerminal()[0]):
+            return 0
+        nodes = 0
+        for move in self.generateMoves():
+            self.applyMove(move)
+            nodes += self.perft(depth - 1)
+            self.undoMove()
+        return nodes
+
+
+# Masques des coups légaux de plusieurs positions (n x 28)
+def legalMoveMasks(boards):
+    return np.array([board.legalMoveMask() for board in boards], dtype=bool).reshape(len(boards), NUM_OUTPUTS)
+
+
+# Politique du réseau restreinte aux coups légaux et renormalisée, pour une position (28,)
+# ou un lot de positions (n x 28) ; une ligne sans coup légal (ou de somme nulle) reste à zéro
+def maskPolicy(policy, mask):
+    P = np.where(mask, np.asarray(policy, dtype=np.float64), 0.0)
+    total = P.sum(axis=-1, keepdims=True)
+    return np.divide(P, total, out=np.zeros_like(P), where=total > 0)
+
+
+# Coup image d'un coup (case de départ, case d'arrivée)
+def mirrorMove(move):
+    return (MIRROR_SQUARE[move[0]], MIRROR_SQUARE[move[1]])
+
+
+# Augmentation des données d'apprentissage par symétrie : retourne les entrées (n x 21) et les
+# probabilités de coups (n x 28) des positions images (les valeurs sont inchangées)
+def mirrorTrainingData(positions, moveProbs):
+    return np.asarray(positions)[..., MIRROR_INPUT], np.asarray(moveProbs)[..., MIRROR_OUTPUT]
@@ -0,0 +1,141 @@
+# Construction du jeu de données supervisé de hexapawn (positions.npy, moveprobs.npy, outcomes.npy)
+# Toutes les positions atteignables depuis la position de départ sont énumérées une seule fois par un
+# parcours en largeur (doublons éliminés par Board.toString()), le jeu est résolu une seule fois par
+# common.mnx_minimax, puis les positions non terminales sont étiquetées par morceaux (meilleur coup,
+# résultat) sur un pool de processus qui reçoit la table du solveur. Chaque morceau est écrit dans
+# les fichiers .npy de sortie (projetés en mémoire) dès qu'il est prêt.
+# Utilisation : python -m common.mnx_dataset [--output-dir .] [--workers 4] [--chunk-size 1024]
+import argparse
+import multiprocessing
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+from common.game import NUM_OUTPUTS, Board
+from common.mnx_minimax import SOLVED_DEPTH, Solver
+
+# Nom et largeur de chaque tableau du jeu de données (None : une valeur par position)
+FIELDS = (("positions", 21), ("moveprobs", NUM_OUTPUTS), ("outcomes", None))
+
+# Solveur d'un processus du pool (table reçue à l'initialisation)
+workerSolver = None
+
+
+# Toutes les positions atteignables depuis start (position de départ par défaut), sans doublon,
+# dans l'ordre du parcours en largeur
+def reachablePositions(start=None):
+    if(start is None):
+        start = Board()
+        start.setStartingPosition()
+    start = start.copy(withHistory=False)
+    seen = {start.toString()}
+    positions = [start]
+    queue = deque([start])
+    while(len(queue) > 0):
+        board = queue.popleft()
+        if(board.isTerminal()[0]):
+            continue
+        for move in board.generateMoves():
+            child = board.copy(withHistory=False)
+            child.applyMove(move)
+            key = child.toString()
+            if(key not in seen):
+                seen.add(key)
+                positions.append(child)
+                queue.append(child)
+    return positions
+
+
+# Résolution exacte de toutes les positions : les plus profondes d'abord, pour que chaque
+# recherche trouve ses suites déjà dans la table
+def solvePositions(boards, solver=None):
+    if(solver is None):
+        solver = Solver()
+    for board in reversed(boards):
+        if(not board.isTerminal()[0]):
+            solver.bestMove(board, SOLVED_DEPTH)
+    return solver
+
+
+# Étiquettes d'une liste de positions : entrées du réseau, meilleur coup (vecteur one-hot sur les
+# 28 sorties) et résultat (1 : gain blanc, -1 : gain noir ; hexapawn n'a pas de match nul et le jeu est
+# résolu jusqu'au bout, la valeur n'est jamais 0)
+def labelPositions(boards, solver):
+    positions = np.zeros((len(boards), 21), dtype=np.int32)
+    moveProbs = np.zeros((len(boards), NUM_OUTPUTS), dtype=np.int32)
+    outcomes = np.zeros(len(boards), dtype=np.int32)
+    for i, board in enumerate(boards):
+        bestMove, bestVal = solver.bestMove(board, SOLVED_DEPTH)
+        positions[i] = board.toNetworkInput()
+        moveProbs[i, board.getNetworkOutputIndex(bestMove)] = 1
+        outcomes[i] = np.sign(bestVal)
+    return positions, moveProbs, outcomes
+
+
+# Plateau à partir de (pions blancs, pions noirs, trait)
+def makeBoard(state):
+    board = Board()
+    board.white, board.black, board.turn = state
+    return board
+
+
+def initWorker(table):
+    global workerSolver
+    workerSolver = Solver()
+    workerSolver.table = table
+
+
+# Travail d'un processus : étiquette un morceau (indice de début, états des positions)
+def labelChunk(task):
+    start, states = task
+    return start, labelPositions([makeBoard(state) for state in states], workerSolver)
+
+
+# Construit le jeu de données dans outputDir ; retourne le nombre de positions écrites
+def buildDataset(outputDir=".", numWorkers=1, chunkSize=1024):
+    boards = [board for board in reachablePositions() if not board.isTerminal()[0]]
+    solver = solvePositions(boards)
+    os.makedirs(outputDir, exist_ok=True)
+    arrays = []
+    for name, width in FIELDS:
+        shape = (len(boards),) if width is None else (len(boards), width)
+        arrays.append(np.lib.format.open_memmap(os.path.join(outputDir, name + ".npy"), mode="w+",
+                                                dtype=np.int32, shape=shape))
+    tasks = [(start, [(b.white, b.black, b.turn) for b in boards[start:start + chunkSize]])
+             for start in range(0, len(boards), chunkSize)]
+
+    def write(start, labels):
+        for array, rows in zip(arrays, labels):
+            array[start:start + len(rows)] = rows
+
+    if(numWorkers <= 1):
+        for start, states in tasks:
+            write(start, labelPositions([makeBoard(state) for state in states], solver))
+    else:
+        # "spawn" comme pour common.rnf_selfplay
+        with multiprocessing.get_context("spawn").Pool(numWorkers, initializer=initWorker,
+                                                      initargs=(solver.table,)) as pool:
+            for start, labels in pool.imap_unordered(labelChunk, tasks):
+                write(start, labels)
+    for array in arrays:
+        array.flush()
+    return len(boards)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Supervised hexapawn dataset over every reachable position")
+    parser.add_argument("--output-dir", default=".")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--chunk-size", type=int, default=1024, help="positions labelled per task")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = buildDataset(args.output_dir, args.workers, args.chunk_size)
+    print(str(count) + " positions written to " + args.output_dir + " in "
+          + str(round(time.perf_counter() - start, 3)) + " s")
+
+
+if __name__ == "__main__":
+    main()
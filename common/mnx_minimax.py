@@ -1,37 +1,138 @@
-# L'importation de la bibliothèque copy est nécessaire pour créer des copies profondes des objets.
-import copy
-
-def minimax(board, depth, maximize):
-    # Vérifie si le jeu est terminé et retourne le score en conséquence
-    isTerminal, winner = board.isTerminal()
-    if(isTerminal):
-        if(winner == board.WHITE):
-            return 1000
-        if(winner == board.BLACK):
-            return -1000
-        if(winner == board.DRAW):
-            return 0
-    
-    # Génère les mouvements possibles pour le joueur actuel
-    moves = board.generateMoves()
-    
-    if(maximize):
-        bestVal = -999999999999
-        # Parcourt tous les mouvements possibles
-        for move in moves:
-            # Crée une copie du plateau pour simuler le mouvement
-            next = copy.deepcopy(board)
-            next.applyMove(move)
-            # Appelle récursivement minimax sur la nouvelle configuration
-            bestVal = max(bestVal, minimax(next, depth - 1, (not maximize)))
+# Solveur minimax avec élagage alpha-bêta et table de transposition pour hexapawn
+# Les positions sont jouées en place (applyMove/undoMove) : plus de copie profonde à chaque noeud.
+import time
+
+from common.game import Board, mirrorMove
+from common.search_stats import SearchStats
+
+# Valeurs retournées du point de vue des blancs
+WIN_SCORE = 1000
+UNKNOWN_SCORE = 0
+
+# Profondeur associée aux résultats prouvés (indépendants de la profondeur de recherche)
+SOLVED_DEPTH = 1000
+
+# Types d'entrées de la table de transposition
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+# Classe qui résout les positions et conserve les résultats d'un appel à l'autre
+class Solver():
+
+    # stats : SearchStats (common.search_stats) où sont comptés noeuds, coupures et consultations de la table
+    def __init__(self, stats=None):
+        # Table de transposition : clé canonique du plateau -> (profondeur, valeur, type, meilleur coup)
+        # Une position et son image par symétrie partagent la même entrée ; le meilleur coup est
+        # enregistré pour la position canonique
+        self.table = {}
+        self.stats = stats if stats is not None else SearchStats()
+
+    # Nombre de noeuds visités depuis la création
+    @property
+    def nodeCount(self):
+        return self.stats.nodes
+
+    # Méthode alpha-bêta, retourne la valeur de la position (1000 : gain blanc, -1000 : gain noir,
+    # 0 : inconnu à cette profondeur)
+    def search(self, board, depth, alpha=-WIN_SCORE - 1, beta=WIN_SCORE + 1):
+        stats = self.stats
+        stats.nodes += 1
+        isTerminal, winner = board.isTerminal()
+        if(isTerminal):
+            if(winner == Board.WHITE):
+                return WIN_SCORE
+            return -WIN_SCORE
+        # La profondeur maximale est atteinte sans résultat
+        if(depth <= 0):
+            return UNKNOWN_SCORE
+
+        # Consultation de la table de transposition
+        key, mirrored = board.canonicalKey()
+        entry = self.table.get(key)
+        stats.ttProbes += 1
+        if(entry is not None and entry[0] >= depth):
+            _, value, flag, _ = entry
+            if(flag == EXACT or (flag == LOWER_BOUND and value >= beta) or (flag == UPPER_BOUND and value <= alpha)):
+                stats.ttHits += 1
+                return value
+
+        alphaOrig = alpha
+        betaOrig = beta
+        maximize = board.turn == Board.WHITE
+        bestMove = None
+        if(maximize):
+            bestVal = -WIN_SCORE - 1
+        else:
+            bestVal = WIN_SCORE + 1
+        for move in board.generateMoves():
+            board.applyMove(move)
+            val = self.search(board, depth - 1, alpha, beta)
+            board.undoMove()
+            if(maximize):
+                if(val > bestVal):
+                    bestVal = val
+                    bestMove = move
+                alpha = max(alpha, bestVal)
+            else:
+                if(val < bestVal):
+                    bestVal = val
+                    bestMove = move
+                beta = min(beta, bestVal)
+            if(alpha >= beta):
+                stats.cutoffs += 1
+                break
+
+        # Enregistrement dans la table de transposition
+        if(bestVal <= alphaOrig):
+            flag = UPPER_BOUND
+        elif(bestVal >= betaOrig):
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        storedDepth = depth
+        if(bestVal != UNKNOWN_SCORE):
+            # Un gain ou une perte trouvé reste vrai quelle que soit la profondeur
+            storedDepth = SOLVED_DEPTH
+        if(mirrored and bestMove is not None):
+            bestMove = mirrorMove(bestMove)
+        self.table[key] = (storedDepth, bestVal, flag, bestMove)
         return bestVal
-    else:
-        bestVal = 9999999999999
-        # Parcourt tous les mouvements possibles
-        for move in moves:
-            # Crée une copie du plateau pour simuler le mouvement
-            next = copy.deepcopy(board)
-            next.applyMove(move)
-            # Appelle récursivement minimax sur la nouvelle configuration
-            bestVal = min(bestVal, minimax(next, depth - 1, (not maximize)))
-        return bestVal
\ No newline at end of file
+
+    # Méthode qui retourne le meilleur coup et sa valeur pour le joueur au trait
+    # Une position déjà résolue ne coûte qu'une consultation de la table
+    def bestMove(self, board, depth=SOLVED_DEPTH):
+        key, mirrored = board.canonicalKey()
+        entry = self.table.get(key)
+        if(entry is None or entry[0] < depth or entry[2] != EXACT):
+            self.timedSearch(board, depth)
+            entry = self.table.get(key)
+        if(entry is None):
+            # Position terminale : aucun coup à jouer
+            return None, self.search(board, depth)
+        if(mirrored and entry[3] is not None):
+            return mirrorMove(entry[3]), entry[1]
+        return entry[3], entry[1]
+
+    # Recherche depuis la racine, chronométrée dans stats (crochet "search" appelé à la fin)
+    def timedSearch(self, board, depth):
+        start = time.perf_counter()
+        value = self.search(board, depth, -WIN_SCORE - 1, WIN_SCORE + 1)
+        self.stats.searchTime += time.perf_counter() - start
+        if(self.stats.hooks):
+            self.stats.emit("search")
+        return value
+
+
+# Solveur partagé par les appels à minimax : les résultats persistent d'un appel à l'autre
+defaultSolver = Solver()
+
+
+# Valeur minimax de la position (1000 : gain blanc, -1000 : gain noir)
+# Le camp qui maximise est celui des blancs : maximize doit valoir board.turn == Board.WHITE
+# et n'est conservé que pour la compatibilité avec les appels existants
+def minimax(board, depth, maximize, solver=None):
+    if(solver is None):
+        solver = defaultSolver
+    return solver.timedSearch(board, depth)
@@ -0,0 +1,177 @@
+# Moteur d'inférence en NumPy pour le réseau politique/valeur de common/init_random_model.py
+# 21 entrées -> 5 couches Dense(128, relu) -> policyHead Dense(28, softmax) et valueHead Dense(1, tanh)
+# Le réseau ne fait qu'environ 80k multiplications-additions : appeler keras.predict position par position
+# coûte surtout le surcoût du framework. Cette classe expose la même méthode predict que le modèle Keras
+# et peut donc le remplacer partout où un "network" est attendu (MCTS, matchs d'évaluation).
+# Les poids peuvent être exportés dans un fichier plat (save) relu par projection en mémoire (load), sans
+# importer TensorFlow ni Keras : en float32 les processus qui chargent le même fichier partagent ses pages.
+# Utilisation : python -m common.np_network modèle.keras modèle.npw [--dtype float16]
+import argparse
+import json
+import struct
+
+import numpy as np
+
+# Fichier de poids plat : FLAT_MAGIC, longueur de l'en-tête JSON (uint32), en-tête JSON (description
+# des tableaux : nom, forme, type, position), puis les tableaux alignés sur FLAT_ALIGN octets
+FLAT_MAGIC = b"HXPWTS1\n"
+FLAT_ALIGN = 64
+
+# Types de stockage des poids : float32 (sans perte, partagé), float16 ou int8 (échelle par colonne)
+# Les biais restent en float32. Les poids float16 et int8 sont convertis en float32 au chargement.
+FLAT_DTYPES = ("float32", "float16", "int8")
+
+
+class NumpyNetwork():
+
+    # hiddenLayers : liste de (poids, biais) des couches cachées relu, dans l'ordre
+    # policyLayer, valueLayer : (poids, biais) des têtes de politique et de valeur
+    def __init__(self, hiddenLayers, policyLayer, valueLayer, dtype=np.float32):
+        self.dtype = dtype
+        self.hiddenLayers = [(np.ascontiguousarray(w, dtype=dtype), np.asarray(b, dtype=dtype))
+                             for (w, b) in hiddenLayers]
+        self.policyW = np.ascontiguousarray(policyLayer[0], dtype=dtype)
+        self.policyB = np.asarray(policyLayer[1], dtype=dtype)
+        self.valueW = np.ascontiguousarray(valueLayer[0], dtype=dtype)
+        self.valueB = np.asarray(valueLayer[1], dtype=dtype)
+        self.version = 0  # À incrémenter si les poids sont modifiés (invalide les caches d'évaluation)
+
+    # Construction à partir d'un modèle Keras déjà chargé (architecture de init_random_model.py)
+    @staticmethod
+    def fromKerasModel(model):
+        hiddenLayers = []
+        policyLayer = None
+        valueLayer = None
+        for layer in model.layers:
+            weights = layer.get_weights()
+            if(len(weights) != 2):
+                continue  # Couche d'entrée ou couche sans poids
+            if(layer.name == 'policyHead'):
+                policyLayer = weights
+            elif(layer.name == 'valueHead'):
+                valueLayer = weights
+            else:
+                hiddenLayers.append(weights)
+        if(policyLayer is None or valueLayer is None):
+            raise ValueError("model has no policyHead/valueHead Dense layers")
+        return NumpyNetwork(hiddenLayers, policyLayer, valueLayer)
+
+    # Réseau aux poids aléatoires (initialisation de Glorot comme Keras), sans fichier ni Keras
+    # Utile pour les bancs d'essai et les vérifications
+    @staticmethod
+    def random(seed=0, hiddenSize=128, hiddenCount=5):
+        rng = np.random.default_rng(seed)
+
+        def dense(inputs, outputs):
+            limit = np.sqrt(6.0 / (inputs + outputs))
+            return (rng.uniform(-limit, limit, (inputs, outputs)), np.zeros(outputs))
+
+        hiddenLayers = [dense(21 if i == 0 else hiddenSize, hiddenSize) for i in range(0, hiddenCount)]
+        return NumpyNetwork(hiddenLayers, dense(hiddenSize, 28), dense(hiddenSize, 1))
+
+    # Chargement d'un fichier .keras (Keras n'est importé que pour la lecture des poids)
+    # ou d'un fichier de poids plat écrit par save (sans Keras)
+    @staticmethod
+    def load(path):
+        if(not path.endswith(".keras")):
+            return NumpyNetwork.loadFlat(path)
+        import keras
+        return NumpyNetwork.fromKerasModel(keras.models.load_model(path))
+
+    # Couches dans l'ordre du fichier plat : (nom, poids, biais)
+    def layers(self):
+        layers = [("hidden" + str(i), w, b) for i, (w, b) in enumerate(self.hiddenLayers)]
+        return layers + [("policyHead", self.policyW, self.policyB), ("valueHead", self.valueW, self.valueB)]
+
+    # Export des poids dans un fichier plat (dtype : "float32", "float16" ou "int8")
+    # En int8, chaque colonne de poids est quantifiée symétriquement avec sa propre échelle float32
+    def save(self, path, dtype="float32"):
+        if(dtype not in FLAT_DTYPES):
+            raise ValueError("dtype must be one of " + ", ".join(FLAT_DTYPES))
+        arrays = []
+        for name, w, b in self.layers():
+            w = np.asarray(w, dtype=np.float32)
+            if(dtype == "int8"):
+                scale = np.abs(w).max(axis=0) / 127.0
+                scale[scale == 0] = 1.0
+                arrays.append((name + ".w", np.round(w / scale).astype(np.int8)))
+                arrays.append((name + ".scale", scale.astype(np.float32)))
+            else:
+                arrays.append((name + ".w", w.astype(dtype)))
+            arrays.append((name + ".b", np.asarray(b, dtype=np.float32)))
+        entries = []
+        offset = 0
+        for name, array in arrays:
+            offset = -(-offset // FLAT_ALIGN) * FLAT_ALIGN
+            entries.append({"name": name, "shape": list(array.shape), "dtype": array.dtype.str, "offset": offset})
+            offset += array.nbytes
+        header = json.dumps({"dtype": dtype, "layers": [name for name, _, _ in self.layers()],
+                             "arrays": entries}).encode()
+        start = -(-(len(FLAT_MAGIC) + 4 + len(header)) // FLAT_ALIGN) * FLAT_ALIGN
+        with open(path, "wb") as f:
+            f.write(FLAT_MAGIC + struct.pack("<I", len(header)) + header)
+            for (name, array), entry in zip(arrays, entries):
+                f.seek(start + entry["offset"])
+                f.write(np.ascontiguousarray(array).tobytes())
+
+    # Lecture d'un fichier plat par projection en mémoire (np.memmap, lecture seule)
+    # Les poids float32 ne sont pas copiés : ils restent dans le cache de pages du système
+    @staticmethod
+    def loadFlat(path):
+        with open(path, "rb") as f:
+            magic = f.read(len(FLAT_MAGIC))
+            if(magic != FLAT_MAGIC):
+                raise ValueError(path + " is not a flat weight file")
+            headerSize = struct.unpack("<I", f.read(4))[0]
+            header = json.loads(f.read(headerSize))
+        start = -(-(len(FLAT_MAGIC) + 4 + headerSize) // FLAT_ALIGN) * FLAT_ALIGN
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+        arrays = {}
+        for entry in header["arrays"]:
+            dtype = np.dtype(entry["dtype"])
+            count = int(np.prod(entry["shape"]))
+            begin = start + entry["offset"]
+            arrays[entry["name"]] = data[begin:begin + count * dtype.itemsize].view(dtype).reshape(entry["shape"])
+        layers = []
+        for name in header["layers"]:
+            w = arrays[name + ".w"]
+            if(header["dtype"] == "int8"):
+                w = w.astype(np.float32) * arrays[name + ".scale"]
+            layers.append((w, arrays[name + ".b"]))
+        return NumpyNetwork(layers[:-2], layers[-2], layers[-1])
+
+    # Passe avant sur une position (vecteur de 21) ou un lot (n x 21)
+    # Retourne [politiques (n x 28), valeurs (n x 1)] comme model.predict
+    def predict(self, x, verbose=None):
+        h = np.asarray(x, dtype=self.dtype)
+        if(h.ndim == 1):
+            h = h[np.newaxis, :]
+        for (w, b) in self.hiddenLayers:
+            h = h @ w
+            h += b
+            np.maximum(h, 0, out=h)
+        logits = h @ self.policyW
+        logits += self.policyB
+        logits -= logits.max(axis=1, keepdims=True)
+        policy = np.exp(logits)
+        policy /= policy.sum(axis=1, keepdims=True)
+        value = np.tanh(h @ self.valueW + self.valueB)
+        return [policy, value]
+
+    # Raccourci pour une seule position : (politique sur 28 sorties, valeur)
+    def evaluate(self, position):
+        policy, value = self.predict(position)
+        return policy[0], value[0][0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a policy/value network to a flat weight file")
+    parser.add_argument("model", help="model file (.keras)")
+    parser.add_argument("output", help="flat weight file")
+    parser.add_argument("--dtype", choices=FLAT_DTYPES, default="float32")
+    args = parser.parse_args()
+    NumpyNetwork.load(args.model).save(args.output, args.dtype)
+
+
+if __name__ == "__main__":
+    main()
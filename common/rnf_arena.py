@@ -0,0 +1,222 @@
+# Arène vectorisée pour hexapawn : des milliers de parties jouées en parallèle, coup par coup
+# Les positions sont rangées dans des tableaux NumPy (masques des pions blancs et noirs, trait) et les
+# coups légaux de toutes les parties sont calculés d'un coup sous forme de masques sur les 28 sorties
+# du réseau (mêmes règles que Board.generateMoves). À chaque demi-coup, toutes les parties où c'est
+# au réseau de jouer sont évaluées en un seul appel à network.predict.
+# Joueurs disponibles : RandomPlayer, GreedyPlayer (coup le plus probable de la politique) et
+# MctsPlayer (une recherche MCTS par partie, les feuilles de toutes les parties évaluées ensemble).
+# Utilisation : python -m common.rnf_arena model_it0.keras model_it10.keras --games 10000
+import argparse
+import time
+
+import numpy as np
+
+import common.rnf_mcts as rnf_mcts
+from common.game import BLACK, BLACK_GOAL_MASK, MOVE_INDEX, WHITE, WHITE_GOAL_MASK, Board
+
+# Description des 28 sorties du réseau : case de départ, case d'arrivée, couleur et capture
+MOVE_FROM = np.zeros(28, dtype=np.int64)
+MOVE_TO = np.zeros(28, dtype=np.int64)
+for (fromSquare, toSquare), idx in MOVE_INDEX.items():
+    MOVE_FROM[idx] = fromSquare
+    MOVE_TO[idx] = toSquare
+MOVE_COLOR = np.where(MOVE_TO < MOVE_FROM, WHITE, BLACK)  # Les blancs avancent vers les cases 0..2
+MOVE_CAPTURE = np.abs(MOVE_TO - MOVE_FROM) != 3
+MOVE_FROM_BIT = 1 << MOVE_FROM
+MOVE_TO_BIT = 1 << MOVE_TO
+
+# Vecteur 0/1 des 9 cases pour chaque masque (0..511)
+MASK_BITS = ((np.arange(512)[:, np.newaxis] >> np.arange(9)) & 1).astype(np.float32)
+
+
+# Masques (n x 28) des coups légaux de n positions
+def legalMoveMasks(white, black, turn):
+    whiteToMove = (turn == WHITE)[:, np.newaxis]
+    own = np.where(whiteToMove[:, 0], white, black)[:, np.newaxis]
+    opp = np.where(whiteToMove[:, 0], black, white)[:, np.newaxis]
+    occupied = (white | black)[:, np.newaxis]
+    colorOk = MOVE_COLOR[np.newaxis, :] == np.where(whiteToMove, WHITE, BLACK)
+    fromOk = (own & MOVE_FROM_BIT) != 0
+    toOk = np.where(MOVE_CAPTURE, (opp & MOVE_TO_BIT) != 0, (occupied & MOVE_TO_BIT) == 0)
+    return colorOk & fromOk & toOk
+
+
+# Fin de partie de n positions : (terminée ?, vainqueur) avec les mêmes règles que Board.isTerminal
+def terminalStatus(white, black, turn, legal):
+    winner = np.zeros(len(white), dtype=np.int64)
+    noMoves = ~legal.any(axis=1)
+    winner[noMoves] = np.where(turn[noMoves] == WHITE, BLACK, WHITE)
+    winner[(black & BLACK_GOAL_MASK) != 0] = BLACK
+    winner[(white & WHITE_GOAL_MASK) != 0] = WHITE
+    return winner != 0, winner
+
+
+# Entrées du réseau (n x 21) comme Board.toNetworkInput
+def networkInputs(white, black, turn):
+    toMove = np.repeat((turn == WHITE).astype(np.float32)[:, np.newaxis], 3, axis=1)
+    return np.concatenate([MASK_BITS[white], MASK_BITS[black], toMove], axis=1)
+
+
+# Joue les coups (indices de sortie) de n positions ; retourne les nouveaux tableaux
+def applyMoves(white, black, turn, slots):
+    fromBit = MOVE_FROM_BIT[slots]
+    toBit = MOVE_TO_BIT[slots]
+    whiteToMove = turn == WHITE
+    newWhite = np.where(whiteToMove, white ^ (fromBit | toBit), white & ~toBit)
+    newBlack = np.where(whiteToMove, black & ~toBit, black ^ (fromBit | toBit))
+    return newWhite, newBlack, np.where(whiteToMove, BLACK, WHITE)
+
+
+# Plateau common.game.Board correspondant à une position de l'arène
+def toBoard(white, black, turn):
+    board = Board()
+    board.white = int(white)
+    board.black = int(black)
+    board.turn = int(turn)
+    return board
+
+
+# Joueur aléatoire : un coup légal tiré uniformément
+class RandomPlayer():
+
+    def chooseMoves(self, white, black, turn, legal, rng):
+        return np.argmax(rng.random(legal.shape) * legal, axis=1)
+
+
+# Joueur qui suit la politique du réseau : coup légal de plus forte probabilité (comme rand_vs_net)
+class GreedyPlayer():
+
+    def __init__(self, network):
+        self.network = network
+        self.networkCalls = 0
+
+    def chooseMoves(self, white, black, turn, legal, rng):
+        policy = self.network.predict(networkInputs(white, black, turn))[0]
+        self.networkCalls += 1
+        return np.argmax(np.where(legal, policy, -1.0), axis=1)
+
+
+# Joueur MCTS : une recherche par partie, toutes les recherches avancent ensemble playout par playout
+# et les feuilles à évaluer de toutes les parties sont envoyées au réseau (ou au cache) en un seul appel.
+# Le coup joué est le plus visité.
+class MctsPlayer():
+
+    # cache : EvaluationCache (common.rnf_cache) partagé par toutes les recherches
+    # stats : SearchStats (common.search_stats) où sont comptés noeuds étendus et appels au réseau
+    def __init__(self, network, numPlayouts=100, cache=None, stats=None):
+        self.numPlayouts = numPlayouts
+        self.searcher = rnf_mcts.MCTS(network, cache=cache, stats=stats)
+
+    def chooseMoves(self, white, black, turn, legal, rng):
+        searcher = self.searcher
+        if(searcher.cache is not None):
+            searcher.cache.checkVersion()
+        roots = []
+        for i in range(0, len(white)):
+            rootEdge = rnf_mcts.Edge(None, None)
+            rootEdge.N = 1
+            roots.append(rnf_mcts.Node(toBoard(white[i], black[i], turn[i]), rootEdge))
+        searcher.expandNodes(roots)
+        for _ in range(0, self.numPlayouts):
+            leaves = [searcher.select(root) for root in roots]
+            values = [searcher.terminalValue(leaf) for leaf in leaves]
+            pending = [leaf for leaf, v in zip(leaves, values) if v is None]
+            if(len(pending) > 0):
+                expanded = iter(searcher.expandNodes(pending))
+                values = [next(expanded) if v is None else v for v in values]
+            for leaf, v in zip(leaves, values):
+                searcher.backup(v, leaf)
+        searcher.stats.playouts += self.numPlayouts * len(roots)
+        slots = np.zeros(len(roots), dtype=np.int64)
+        for i, root in enumerate(roots):
+            move = root.moves[int(np.argmax(root.stats[rnf_mcts.STAT_N]))]
+            slots[i] = MOVE_INDEX[(move[0], move[1])]
+        return slots
+
+
+# Joue numGames parties en parallèle entre deux joueurs
+# randomPlies : nombre de premiers demi-coups joués au hasard (1 pour reproduire le protocole du notebook)
+# Retourne le vainqueur de chaque partie (Board.WHITE ou Board.BLACK)
+def playGames(whitePlayer, blackPlayer, numGames, rng=None, randomPlies=0):
+    if(rng is None):
+        rng = np.random.default_rng()
+    randomPlayer = RandomPlayer()
+    white = np.full(numGames, BLACK_GOAL_MASK, dtype=np.int64)
+    black = np.full(numGames, WHITE_GOAL_MASK, dtype=np.int64)
+    turn = np.full(numGames, WHITE, dtype=np.int64)
+    winners = np.zeros(numGames, dtype=np.int64)
+    active = np.arange(numGames)
+    ply = 0
+    while(len(active) > 0):
+        w, b, t = white[active], black[active], turn[active]
+        legal = legalMoveMasks(w, b, t)
+        finished, winner = terminalStatus(w, b, t, legal)
+        winners[active[finished]] = winner[finished]
+        keep = ~finished
+        active, w, b, t, legal = active[keep], w[keep], b[keep], t[keep], legal[keep]
+        if(len(active) == 0):
+            break
+        # Tous les pions avancent : toutes les parties actives ont le même trait au même demi-coup
+        slots = np.zeros(len(active), dtype=np.int64)
+        for color, player in ((WHITE, whitePlayer), (BLACK, blackPlayer)):
+            sel = t == color
+            if(sel.any()):
+                if(ply < randomPlies):
+                    player = randomPlayer
+                slots[sel] = player.chooseMoves(w[sel], b[sel], t[sel], legal[sel], rng)
+        white[active], black[active], turn[active] = applyMoves(w, b, t, slots)
+        ply += 1
+    return winners
+
+
+# Compare deux joueurs : numGames parties avec chaque couleur
+# Retourne le taux de victoire du joueur A avec les blancs, avec les noirs, et au total
+def compare(playerA, playerB, numGames, rng=None, randomPlies=0):
+    if(rng is None):
+        rng = np.random.default_rng()
+    asWhite = playGames(playerA, playerB, numGames, rng, randomPlies)
+    asBlack = playGames(playerB, playerA, numGames, rng, randomPlies)
+    whiteRate = float(np.mean(asWhite == WHITE))
+    blackRate = float(np.mean(asBlack == BLACK))
+    return whiteRate, blackRate, (whiteRate + blackRate) / 2
+
+
+# Construction d'un joueur à partir de son nom ("random", "greedy", "mcts") et d'un fichier de modèle
+def makePlayer(kind, modelPath=None, numPlayouts=100):
+    if(kind == "random"):
+        return RandomPlayer()
+    from common.np_network import NumpyNetwork
+    network = NumpyNetwork.load(modelPath)
+    if(kind == "greedy"):
+        return GreedyPlayer(network)
+    if(kind == "mcts"):
+        return MctsPlayer(network, numPlayouts)
+    raise ValueError("unknown player " + kind)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized hexapawn arena")
+    parser.add_argument("modelA", help="model file (.keras) of player A, or 'random'")
+    parser.add_argument("modelB", help="model file (.keras) of player B, or 'random'")
+    parser.add_argument("--player", choices=("greedy", "mcts"), default="greedy", help="how the models play")
+    parser.add_argument("--games", type=int, default=10000, help="games per color")
+    parser.add_argument("--playouts", type=int, default=100)
+    parser.add_argument("--random-plies", type=int, default=0, help="opening plies played at random")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    players = []
+    for model in (args.modelA, args.modelB):
+        players.append(makePlayer("random" if model == "random" else args.player, model, args.playouts))
+    start = time.perf_counter()
+    whiteRate, blackRate, rate = compare(players[0], players[1], args.games, np.random.default_rng(args.seed),
+                                         args.random_plies)
+    elapsed = time.perf_counter() - start
+    print(args.modelA + " vs " + args.modelB + " (" + str(2 * args.games) + " games in "
+          + str(round(elapsed, 2)) + " s)")
+    print("A wins " + str(round(100 * whiteRate, 1)) + "% as white, " + str(round(100 * blackRate, 1))
+          + "% as black, " + str(round(100 * rate, 1)) + "% overall")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# Cache des évaluations du réseau, partagé entre recherches, coups et parties
+# Hexapawn n'a que quelques centaines de positions atteignables : une position déjà évaluée
+# n'a pas besoin d'un nouvel appel au réseau tant que ses poids n'ont pas changé.
+# Les entrées sont indexées par Board.canonicalKey() (ou Board.hashKey() sans symétrie) et contiennent
+# les probabilités normalisées sur les coups légaux (dans l'ordre de generateMoves de la position
+# canonique) et la valeur de la position.
+from collections import OrderedDict
+
+import numpy as np
+
+from common.game import MIRROR_OUTPUT, NUM_OUTPUTS, legalMoveMasks, maskPolicy
+
+
+# Version des poids du réseau : attribut version (NumpyNetwork) ou nombre de pas
+# d'optimisation effectués par model.fit pour un modèle Keras compilé
+def weightsVersion(network):
+    version = getattr(network, "version", None)
+    if(version is not None):
+        return version
+    optimizer = getattr(network, "optimizer", None)
+    if(optimizer is not None):
+        return int(np.asarray(optimizer.iterations))
+    return None
+
+
+# Probabilités des coups légaux d'une position à partir de celles de son image (priors, dans l'ordre
+# des coups de l'image) : passage par les 28 sorties et la permutation MIRROR_OUTPUT
+def mirrorPriors(board, priors):
+    policy = np.zeros(NUM_OUTPUTS)
+    policy[MIRROR_OUTPUT[board.mirrored().legalMoveIndices()]] = priors
+    return policy[board.legalMoveIndices()]
+
+
+class EvaluationCache():
+
+    # maxSize : nombre maximal de positions conservées (les moins récemment utilisées sont retirées)
+    # canonical : une seule entrée pour une position et son image par symétrie gauche-droite
+    # (la position canonique est évaluée par le réseau et sert aussi à son image)
+    def __init__(self, network, maxSize=4096, canonical=True):
+        self.network = network
+        self.maxSize = maxSize
+        self.canonical = canonical
+        self.entries = OrderedDict()  # Clé -> (probabilités des coups légaux, valeur)
+        self.version = weightsVersion(network)
+        self.hits = 0
+        self.misses = 0
+        self.networkCalls = 0  # Nombre d'appels à network.predict
+
+    def __len__(self):
+        return len(self.entries)
+
+    # Vide le cache (les compteurs sont conservés)
+    def clear(self):
+        self.entries.clear()
+
+    # Vide le cache si les poids du réseau ont changé depuis la dernière vérification
+    def checkVersion(self):
+        version = weightsVersion(self.network)
+        if(version != self.version):
+            self.version = version
+            self.clear()
+
+    # Remplace le réseau évalué (les entrées existantes sont supprimées)
+    def setNetwork(self, network):
+        self.network = network
+        self.version = weightsVersion(network)
+        self.clear()
+
+    # Enregistre une évaluation et retire l'entrée la plus ancienne si le cache est plein
+    def store(self, key, entry):
+        self.entries[key] = entry
+        if(len(self.entries) > self.maxSize):
+            self.entries.popitem(last=False)
+
+    # Évaluation d'une position : (probabilités des coups légaux, valeur)
+    def evaluate(self, board):
+        return self.evaluateBatch([board])[0]
+
+    # Évaluation de plusieurs positions : les positions absentes du cache sont évaluées en un seul appel
+    # stats : SearchStats (common.search_stats) facultatif où sont comptés les succès du cache et l'appel au réseau
+    def evaluateBatch(self, boards, stats=None):
+        results = [None] * len(boards)
+        missing = {}  # Clé absente du cache -> (position évaluée, indices des positions qui en dépendent)
+        keys = []
+        for i, board in enumerate(boards):
+            key, mirrored = board.canonicalKey() if self.canonical else (board.hashKey(), False)
+            keys.append((key, mirrored))
+            entry = self.entries.get(key)
+            if(entry is None):
+                if(key not in missing):
+                    missing[key] = (board.mirrored() if mirrored else board, [])
+                missing[key][1].append(i)
+            else:
+                self.entries.move_to_end(key)
+                results[i] = entry
+        missCount = sum(len(indices) for (_, indices) in missing.values())
+        self.hits += len(boards) - missCount
+        self.misses += missCount
+        if(stats is not None):
+            stats.cacheHits += len(boards) - missCount
+            stats.cacheMisses += missCount
+        if(len(missing) > 0):
+            evaluated = [board for (board, _) in missing.values()]
+            x = np.array([board.toNetworkInput() for board in evaluated])
+            if(stats is not None):
+                q = stats.predict(self.network, x)
+            else:
+                q = self.network.predict(x)
+            self.networkCalls += 1
+            P = maskPolicy(q[0], legalMoveMasks(evaluated))
+            for j, (key, (board, indices)) in enumerate(missing.items()):
+                entry = (P[j, board.legalMoveIndices()], q[1][j][0])
+                self.store(key, entry)
+                for i in indices:
+                    results[i] = entry
+        # Les entrées sont celles de la position canonique : probabilités remises dans l'ordre des
+        # coups des positions images
+        for i, (key, mirrored) in enumerate(keys):
+            if(mirrored):
+                results[i] = (mirrorPriors(boards[i], results[i][0]), results[i][1])
+        return results
+
+    # Proportion des évaluations servies par le cache
+    def hitRate(self):
+        total = self.hits + self.misses
+        if(total == 0):
+            return 0.0
+        return self.hits / total
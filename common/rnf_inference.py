@@ -0,0 +1,249 @@
+# Serveur d'inférence par lots partagé par plusieurs recherches MCTS simultanées
+# Chaque recherche (thread, tâche asyncio ou processus) évalue ses positions une à une : le réseau ne voit
+# jamais de lot utile. Le serveur est un processus qui possède le réseau ; chaque client dispose d'une
+# place dans deux tampons en mémoire partagée (entrées 21 colonnes, sorties 28 + 1 colonnes). Un client
+# écrit ses positions dans sa place et envoie (place, nombre de positions, instant) dans la file de
+# requêtes ; le serveur réunit les requêtes arrivées avant l'échéance maxDelay (ou jusqu'à maxBatch
+# positions, ou jusqu'à une requête de chaque client), fait un seul appel au réseau, écrit les résultats
+# et réveille les clients.
+# InferenceClient expose la méthode predict d'un réseau : il remplace le réseau dans rnf_mcts.MCTS,
+# EvaluationCache ou rnf_selfplay.playGame sans autre changement.
+# Les mesures (taille des lots, attente dans la file) sont lues par InferenceServer.metrics().
+# Un client n'attend jamais indéfiniment : si le processus serveur s'arrête (fermeture, plantage ou
+# terminate), la requête en cours lève RuntimeError au plus SERVER_CHECK_INTERVAL secondes plus tard.
+import asyncio
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+INPUT_WIDTH = 21
+OUTPUT_WIDTH = 29  # 28 probabilités de coups puis la valeur
+
+# Compteurs partagés : lots, positions, plus grand lot, somme et maximum de l'attente dans la file
+# (secondes), puis histogramme des tailles de lot (1, 2-3, 4-7, 8-15, ...)
+METRIC_BATCHES = 0
+METRIC_POSITIONS = 1
+METRIC_MAX_BATCH = 2
+METRIC_LATENCY_SUM = 3
+METRIC_LATENCY_MAX = 4
+METRIC_REQUESTS = 5
+METRIC_HISTOGRAM = 6
+HISTOGRAM_BINS = 12
+
+# Intervalle (secondes) entre deux vérifications que le serveur tourne encore, pendant l'attente d'un client
+SERVER_CHECK_INTERVAL = 0.5
+
+
+# Boucle du processus serveur
+# clients : nombre de clients créés ; quand tous ont envoyé leur requête, le lot part sans attendre l'échéance
+# serverWriter : extrémité d'écriture d'un tube, jamais écrite ; elle n'est ouverte que dans ce processus et
+# reste référencée jusqu'à sa fin : sa fermeture (quelle qu'en soit la cause) signale l'arrêt aux clients
+def serveRequests(network, inputName, outputName, shape, requests, events, metrics, clients, maxBatch, maxDelay,
+                  serverWriter=None):
+    if(isinstance(network, str)):
+        from common.np_network import NumpyNetwork
+        network = NumpyNetwork.load(network)
+    inputMemory = shared_memory.SharedMemory(name=inputName)
+    outputMemory = shared_memory.SharedMemory(name=outputName)
+    inputs = np.ndarray(shape + (INPUT_WIDTH,), dtype=np.float32, buffer=inputMemory.buf)
+    outputs = np.ndarray(shape + (OUTPUT_WIDTH,), dtype=np.float32, buffer=outputMemory.buf)
+    try:
+        stopping = False
+        while(not stopping):
+            request = requests.get()
+            if(request is None):
+                break
+            batch = [request]
+            count = request[1]
+            deadline = time.monotonic() + maxDelay
+            # Réunit les requêtes arrivées avant l'échéance
+            while(count < maxBatch and len(batch) < clients.value):
+                timeout = deadline - time.monotonic()
+                try:
+                    request = requests.get(timeout=timeout) if timeout > 0 else requests.get_nowait()
+                except queue.Empty:
+                    break
+                if(request is None):
+                    stopping = True
+                    break
+                batch.append(request)
+                count += request[1]
+            started = time.monotonic()
+            x = np.concatenate([inputs[slot, :n] for slot, n, _ in batch])
+            policy, value = network.predict(x)
+            row = 0
+            for slot, n, _ in batch:
+                outputs[slot, :n, :28] = policy[row:row + n]
+                outputs[slot, :n, 28] = value[row:row + n, 0]
+                row += n
+                events[slot].set()
+            with metrics.get_lock():
+                metrics[METRIC_BATCHES] += 1
+                metrics[METRIC_POSITIONS] += count
+                metrics[METRIC_REQUESTS] += len(batch)
+                metrics[METRIC_MAX_BATCH] = max(metrics[METRIC_MAX_BATCH], count)
+                for _, _, submitted in batch:
+                    metrics[METRIC_LATENCY_SUM] += started - submitted
+                    metrics[METRIC_LATENCY_MAX] = max(metrics[METRIC_LATENCY_MAX], started - submitted)
+                metrics[METRIC_HISTOGRAM + min(count.bit_length() - 1, HISTOGRAM_BINS - 1)] += 1
+    finally:
+        del inputs, outputs
+        inputMemory.close()
+        outputMemory.close()
+        if(serverWriter is not None):
+            serverWriter.close()
+
+
+# Client du serveur : une place dans les tampons partagés, utilisable par un seul thread à la fois
+# Peut être transmis à un processus lancé avec "spawn" (arguments de multiprocessing.Process)
+class InferenceClient():
+
+    # serverRunning : extrémité de lecture du tube dont le serveur garde l'extrémité d'écriture
+    def __init__(self, slot, slotSize, inputName, outputName, shape, requests, event, serverRunning):
+        self.slot = slot
+        self.slotSize = slotSize
+        self.inputName = inputName
+        self.outputName = outputName
+        self.shape = shape
+        self.requests = requests
+        self.event = event
+        self.serverRunning = serverRunning
+        self.attach()
+
+    def attach(self):
+        self.inputMemory = shared_memory.SharedMemory(name=self.inputName)
+        self.outputMemory = shared_memory.SharedMemory(name=self.outputName)
+        self.inputs = np.ndarray(self.shape + (INPUT_WIDTH,), dtype=np.float32, buffer=self.inputMemory.buf)
+        self.outputs = np.ndarray(self.shape + (OUTPUT_WIDTH,), dtype=np.float32, buffer=self.outputMemory.buf)
+
+    # Les tampons sont rattachés par leur nom dans le processus qui reçoit le client
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        for name in ("inputMemory", "outputMemory", "inputs", "outputs"):
+            del state[name]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.attach()
+
+    def close(self):
+        self.inputs = None
+        self.outputs = None
+        self.inputMemory.close()
+        self.outputMemory.close()
+
+    # Le serveur ne tourne plus quand le tube est en fin de fichier (rien n'y est jamais écrit)
+    def serverStopped(self):
+        try:
+            return self.serverRunning.poll()
+        except (EOFError, OSError):
+            return True
+
+    # Envoie les positions (au plus slotSize) et attend leurs résultats
+    def request(self, x):
+        n = len(x)
+        self.inputs[self.slot, :n] = x
+        self.event.clear()
+        self.requests.put((self.slot, n, time.monotonic()))
+        while(not self.event.wait(SERVER_CHECK_INTERVAL)):
+            if(self.serverStopped()):
+                raise RuntimeError("inference server is not running (client slot " + str(self.slot) + ")")
+        return self.outputs[self.slot, :n].copy()
+
+    # Même interface que model.predict : [politiques (n x 28), valeurs (n x 1)]
+    def predict(self, x, verbose=None):
+        x = np.asarray(x, dtype=np.float32)
+        if(x.ndim == 1):
+            x = x[np.newaxis, :]
+        results = [self.request(x[i:i + self.slotSize]) for i in range(0, len(x), self.slotSize)]
+        out = np.concatenate(results) if len(results) > 1 else results[0]
+        return [out[:, :28], out[:, 28:]]
+
+    # Version pour asyncio : l'attente se fait dans un thread, la boucle d'événements reste libre
+    async def predictAsync(self, x):
+        return await asyncio.to_thread(self.predict, x)
+
+
+class InferenceServer():
+
+    # network : NumpyNetwork (ou tout réseau sérialisable avec une méthode predict), ou chemin d'un modèle
+    #           (.keras ou fichier de poids plat) chargé dans le processus serveur
+    # maxClients : nombre de places (un client par recherche simultanée)
+    # slotSize : positions au plus par requête (un lot de MCTS.batchSize feuilles par exemple)
+    # maxBatch : positions au plus par appel au réseau
+    # maxDelay : attente maximale (secondes) après la première requête d'un lot avant l'appel au réseau
+    def __init__(self, network, maxClients=64, slotSize=32, maxBatch=1024, maxDelay=0.001):
+        self.maxClients = maxClients
+        self.slotSize = slotSize
+        shape = (maxClients, slotSize)
+        # "spawn" comme pour common.rnf_selfplay
+        context = multiprocessing.get_context("spawn")
+        self.inputMemory = shared_memory.SharedMemory(create=True, size=4 * maxClients * slotSize * INPUT_WIDTH)
+        self.outputMemory = shared_memory.SharedMemory(create=True, size=4 * maxClients * slotSize * OUTPUT_WIDTH)
+        self.shape = shape
+        self.requests = context.Queue()
+        self.events = [context.Event() for _ in range(0, maxClients)]
+        self.metricsArray = context.Array("d", METRIC_HISTOGRAM + HISTOGRAM_BINS)
+        self.clients = context.Value("i", 0)
+        self.serverRunning, serverWriter = context.Pipe(duplex=False)
+        self.process = context.Process(target=serveRequests,
+                                       args=(network, self.inputMemory.name, self.outputMemory.name, shape,
+                                             self.requests, self.events, self.metricsArray, self.clients, maxBatch,
+                                             maxDelay, serverWriter),
+                                       daemon=True)
+        self.process.start()
+        serverWriter.close()  # Seul le processus serveur garde l'extrémité d'écriture
+
+    # Nouveau client (une place des tampons partagés)
+    def client(self):
+        with self.clients.get_lock():
+            slot = self.clients.value
+            if(slot >= self.maxClients):
+                raise RuntimeError("no free client slot (maxClients=" + str(self.maxClients) + ")")
+            self.clients.value += 1
+        return InferenceClient(slot, self.slotSize, self.inputMemory.name, self.outputMemory.name, self.shape,
+                               self.requests, self.events[slot], self.serverRunning)
+
+    # Mesures depuis le lancement (ou la dernière remise à zéro)
+    def metrics(self):
+        with self.metricsArray.get_lock():
+            m = list(self.metricsArray)
+        batches = m[METRIC_BATCHES]
+        requests = m[METRIC_REQUESTS]
+        histogram = {}
+        for i in range(0, HISTOGRAM_BINS):
+            if(m[METRIC_HISTOGRAM + i] > 0):
+                histogram[str(1 << i) + "-" + str((1 << (i + 1)) - 1)] = int(m[METRIC_HISTOGRAM + i])
+        return {"batches": int(batches), "requests": int(requests), "positions": int(m[METRIC_POSITIONS]),
+                "meanBatch": m[METRIC_POSITIONS] / batches if batches else 0.0,
+                "maxBatch": int(m[METRIC_MAX_BATCH]),
+                "meanQueueLatency": m[METRIC_LATENCY_SUM] / requests if requests else 0.0,
+                "maxQueueLatency": m[METRIC_LATENCY_MAX], "batchSizes": histogram}
+
+    def resetMetrics(self):
+        with self.metricsArray.get_lock():
+            for i in range(0, len(self.metricsArray)):
+                self.metricsArray[i] = 0
+
+    def close(self):
+        if(self.process is not None):
+            self.requests.put(None)
+            self.process.join(5)
+            if(self.process.is_alive()):
+                self.process.terminate()
+            self.process = None
+            self.serverRunning.close()
+            self.inputMemory.close()
+            self.inputMemory.unlink()
+            self.outputMemory.close()
+            self.outputMemory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
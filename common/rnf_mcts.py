@@ -1,11 +1,22 @@
-import copy
 import numpy as np
 import math
-from common.game import Board  # Importation de la classe Board depuis le fichier common.game
+from common.game import Board, legalMoveMasks, maskPolicy  # Importation de la classe Board depuis le fichier common.game
 import random
+import time
+from common.search_stats import SearchStats
 
-# Classe représentant une arête dans l'arbre MCTS
+# Lignes du tableau de statistiques des enfants d'un noeud
+STAT_N = 0  # Nombre de visites de chaque arête enfant
+STAT_W = 1  # Somme des valeurs de récompense de chaque arête enfant
+STAT_Q = 2  # Valeur moyenne de chaque arête enfant
+STAT_P = 3  # Probabilité a priori calculée par le réseau de neurones
+STAT_VN = 4  # Sélections en attente d'évaluation (perte virtuelle)
+
+# Classe représentant l'arête qui mène à la racine de l'arbre MCTS
+# (les statistiques des autres arêtes sont stockées dans le tableau de leur noeud parent)
 class Edge():
+    __slots__ = ("parentNode", "move", "N", "W", "Q", "P", "virtualN")
+
     def __init__(self, move, parentNode):
         self.parentNode = parentNode  # Noeud parent
         self.move = move  # Mouvement associé à cette arête
@@ -13,87 +24,147 @@ class Edge():
         self.W = 0  # Somme des valeurs de récompense associées aux visites
         self.Q = 0  # Valeur moyenne des récompenses
         self.P = 0  # Probabilité calculée par le réseau de neurones
+        self.virtualN = 0  # Nombre de sélections en attente d'évaluation (perte virtuelle)
 
 # Classe représentant un noeud dans l'arbre MCTS
+# Les statistiques des enfants sont rangées dans un seul tableau NumPy (5 x nombre de coups),
+# une colonne par coup de self.moves. Les noeuds enfants et leur plateau ne sont créés qu'à leur
+# première sélection.
 class Node():
-    def __init__(self, board, parentEdge):
+    __slots__ = ("board", "parentEdge", "parent", "index", "moves", "children", "stats")
+
+    def __init__(self, board, parentEdge, parent=None, index=-1):
         self.board = board  # Position du jeu associée à ce noeud
-        self.parentEdge = parentEdge  # Arête parente
-        self.childEdgeNode = []  # Liste des arêtes et noeuds enfants
+        self.parentEdge = parentEdge  # Arête parente (uniquement pour la racine)
+        self.parent = parent  # Noeud parent
+        self.index = index  # Indice de ce noeud parmi les enfants du parent
+        self.moves = None  # Mouvements légaux, None tant que le noeud n'est pas étendu
+        self.children = None  # Noeuds enfants (None tant qu'ils n'ont pas été sélectionnés)
+        self.stats = None  # Statistiques N, W, Q, P, VN des arêtes enfants
+
+    # Nombre de visites du noeud lui-même (celles de l'arête qui y mène)
+    def visits(self):
+        if(self.parent is None):
+            return self.parentEdge.N
+        return self.parent.stats[STAT_N, self.index]
+
+    # Visites virtuelles de l'arête qui mène au noeud
+    def virtualVisits(self):
+        if(self.parent is None):
+            return self.parentEdge.virtualN
+        return self.parent.stats[STAT_VN, self.index]
 
     # Méthode pour étendre le noeud en ajoutant des arêtes et des noeuds enfants
     def expand(self, network):
-        moves = self.board.generateMoves()  # Générer les mouvements possibles depuis cette position
-        for m in moves:
-            child_board = copy.deepcopy(self.board)  # Copier la position actuelle
-            child_board.applyMove(m)  # Appliquer le mouvement
-            child_edge = Edge(m, self)  # Créer une nouvelle arête avec ce mouvement
-            childNode = Node(child_board, child_edge)  # Créer un nouveau noeud associé à la nouvelle position
-            self.childEdgeNode.append((child_edge,childNode))  # Ajouter l'arête et le noeud associés à la liste
         q = network.predict(np.array([self.board.toNetworkInput()]))  # Obtenir les prédictions du réseau pour cette position
-        prob_sum = 0.
-        for (edge,_) in self.childEdgeNode:
-            m_idx = self.board.getNetworkOutputIndex(edge.move)
-            edge.P = q[0][0][m_idx]  # Attribuer la probabilité calculée par le réseau à chaque arête enfant
-            prob_sum += edge.P
-        for edge,_ in self.childEdgeNode:
-            edge.P /= prob_sum  # Normaliser les probabilités des arêtes enfants pour qu'elles forment une distribution de probabilité
-        v = q[1][0][0]  # Récupérer la valeur estimée de cette position par le réseau
+        return self.expandWithPrediction(q[0][0], q[1][0][0])
+
+    # Méthode pour étendre le noeud à partir d'une prédiction déjà calculée (politique sur 28 sorties, valeur)
+    def expandWithPrediction(self, policy, v):
+        self.moves = self.board.generateMoves()  # Mouvements possibles depuis cette position
+        count = len(self.moves)
+        self.children = [None] * count
+        self.stats = np.zeros((5, count))
+        if(count > 0):
+            P = np.asarray(policy, dtype=np.float64)[self.board.legalMoveIndices()]  # Probabilités du réseau pour les coups légaux
+            self.stats[STAT_P] = P / P.sum()  # Normaliser pour obtenir une distribution de probabilité
+        return v  # Valeur estimée de cette position par le réseau
+
+    # Méthode pour étendre le noeud à partir de probabilités déjà normalisées sur les coups légaux
+    # (dans l'ordre de generateMoves), par exemple celles conservées par common.rnf_cache
+    def expandWithPriors(self, priors, v):
+        self.moves = self.board.generateMoves()
+        count = len(self.moves)
+        self.children = [None] * count
+        self.stats = np.zeros((5, count))
+        if(count > 0):
+            self.stats[STAT_P] = priors
         return v
 
+    # Méthode qui retourne l'enfant d'indice i, en le créant (avec son plateau) si besoin
+    def child(self, i):
+        node = self.children[i]
+        if(node is None):
+            board = self.board.copy(withHistory=False)
+            board.applyMove(self.moves[i])
+            node = Node(board, None, self, i)
+            self.children[i] = node
+        return node
+
     # Méthode pour vérifier si le noeud est une feuille (c'est-à-dire s'il n'a pas d'enfants)
     def isLeaf(self):
-        return self.childEdgeNode == []
+        return self.moves is None or len(self.moves) == 0
 
 # Classe pour effectuer une recherche MCTS
 class MCTS():
 
-    def __init__(self, network):
+    # batchSize : nombre de feuilles sélectionnées puis évaluées en un seul appel au réseau
+    # virtualLoss : perte virtuelle appliquée aux arêtes d'une feuille en attente d'évaluation
+    # maxReusedNodes : nombre maximal de noeuds étendus conservés par advance (None : tout le sous-arbre)
+    # cache : EvaluationCache (common.rnf_cache) partagé, utilisé à la place d'appels directs au réseau
+    # stats : SearchStats (common.search_stats) où sont comptés noeuds étendus, profondeur, appels au réseau et temps
+    def __init__(self, network, batchSize=1, virtualLoss=1.0, maxReusedNodes=None, cache=None, stats=None):
         self.network = network  # Réseau de neurones utilisé pour l'évaluation
         self.rootNode = None  # Noeud racine de l'arbre MCTS
         self.tau = 1.0  # Paramètre tau pour le calcul des probabilités de déplacement
         self.c_puct = 1.0  # Paramètre c_puct pour l'exploration UCT
+        self.numPlayouts = 100  # Nombre d'itérations de recherche
+        self.batchSize = batchSize
+        self.virtualLoss = virtualLoss
+        self.pending = 0  # Nombre de feuilles sélectionnées en attente d'évaluation
+        self.maxReusedNodes = maxReusedNodes
+        self.cache = cache
+        self.stats = stats if stats is not None else SearchStats()
 
-    # Méthode pour calculer la valeur UCT d'une arête
-    def uctValue(self, edge, parentN):
-        return self.c_puct * edge.P * (math.sqrt(parentN) / (1+edge.N))
+    # Méthode pour calculer en une fois (vectorisé) les scores de sélection de tous les enfants d'un noeud,
+    # du point de vue du joueur au trait. Les sélections en attente comptent comme des visites perdues.
+    def selectionScores(self, node):
+        stats = node.stats
+        N = stats[STAT_N] + stats[STAT_VN]
+        parentN = node.visits() + node.virtualVisits()
+        uct = (self.c_puct * math.sqrt(parentN)) * stats[STAT_P] / (1 + N)
+        W = stats[STAT_W]
+        if(node.board.turn == Board.BLACK):
+            W = -W
+        W = W - self.virtualLoss * stats[STAT_VN]
+        val = np.divide(W, N, out=np.zeros(len(N)), where=N > 0)
+        return val + uct
 
-    # Méthode de sélection d'un enfant à partir d'un noeud
+    # Méthode de sélection d'une feuille à partir d'un noeud
     def select(self, node):
-        if(node.isLeaf()):
-            return node
-        else:
-            maxUctChild = None
-            maxUctValue = -100000000.
-            for edge, child_node in node.childEdgeNode:
-                uctVal = self.uctValue(edge, edge.parentNode.parentEdge.N)
-                val = edge.Q
-                if(edge.parentNode.board.turn == Board.BLACK):
-                    val = -edge.Q
-                uctValChild = val + uctVal
-                if(uctValChild > maxUctValue):
-                    maxUctChild = child_node
-                    maxUctValue = uctValChild
-            allBestChilds = []
-            for edge, child_node in node.childEdgeNode:
-                uctVal = self.uctValue(edge, edge.parentNode.parentEdge.N)
-                val = edge.Q
-                if(edge.parentNode.board.turn == Board.BLACK):
-                    val = -edge.Q
-                uctValChild = val + uctVal
-                if(uctValChild == maxUctValue):
-                    allBestChilds.append(child_node)
-            if(maxUctChild == None):
+        parentN = node.visits()
+        depth = 0
+        while(not node.isLeaf()):
+            if(self.pending == 0):
+                # Sans perte virtuelle, les scores sont calculés sur les listes Python du tableau :
+                # pour les 2 à 6 coups d'une position de hexapawn c'est plus rapide qu'une suite d'opérations NumPy
+                N, _, Q, P, _ = node.stats.tolist()
+                k = self.c_puct * math.sqrt(parentN)
+                if(node.board.turn == Board.BLACK):
+                    scores = [k * p / (1 + n) - q for n, q, p in zip(N, Q, P)]
+                else:
+                    scores = [k * p / (1 + n) + q for n, q, p in zip(N, Q, P)]
+            else:
+                N = None
+                scores = self.selectionScores(node).tolist()
+            maxUctValue = max(scores)
+            allBest = [i for i, s in enumerate(scores) if s == maxUctValue]
+            if(len(allBest) == 0):
                 raise ValueError("could not identify child with best uct value")
+            if(len(allBest) > 1):
+                idx = allBest[random.randint(0, len(allBest)-1)]
             else:
-                if(len(allBestChilds) > 1):
-                    idx = random.randint(0, len(allBestChilds)-1)
-                    return self.select(allBestChilds[idx])
-                else:
-                    return self.select(maxUctChild)
+                idx = allBest[0]
+            if(N is not None):
+                parentN = N[idx]
+            node = node.child(idx)
+            depth += 1
+        if(depth > self.stats.depth):
+            self.stats.depth = depth  # Profondeur maximale atteinte par la sélection
+        return node
 
-    # Méthode pour étendre un noeud et évaluer les enfants
-    def expandAndEvaluate(self, node):
+    # Méthode qui retourne la valeur d'une position terminale, ou None si la partie continue
+    def terminalValue(self, node):
         terminal, winner = node.board.isTerminal()  # Vérifier si la position actuelle est terminale
         if(terminal == True):
             v = 0.0
@@ -101,32 +172,162 @@ class MCTS():
                 v = 1.0
             if(winner == Board.BLACK):
                 v = -1.0
-            self.backup(v, node.parentEdge)  # Effectuer une sauvegarde des valeurs de récompense rétrogradée
-            return
-        v = node.expand(self.network)  # Étendre le noeud et obtenir la valeur d'évaluation de la position
-        self.backup(v, node.parentEdge)  # Effectuer une sauvegarde des valeurs de récompense rétrogradée
-
-    # Méthode pour effectuer une sauvegarde des valeurs de récompense rétrogradée
-    def backup(self, v, edge):
-        edge.N += 1  # Incrémenter le nombre de visites de l'arête
-        edge.W = edge.W + v  # Ajouter la valeur de récompense à la somme des récompenses
-        edge.Q = edge.W / edge.N  # Calculer la valeur moyenne des récompenses
-        if(edge.parentNode != None):
-            if(edge.parentNode.parentEdge != None):
-                self.backup(v, edge.parentNode.parentEdge)  # Effectuer une sauvegarde rétrogradée récursive
+            return v
+        return None
+
+    # Méthode pour étendre un noeud et évaluer les enfants
+    def expandAndEvaluate(self, node):
+        v = self.terminalValue(node)
+        if(v is None):
+            v = self.expandNodes([node])[0]  # Étendre le noeud et obtenir la valeur d'évaluation de la position
+        self.backup(v, node)  # Effectuer une sauvegarde des valeurs de récompense rétrogradée
+
+    # Méthode pour étendre des noeuds non terminaux en un seul appel au réseau (ou au cache)
+    # Retourne la valeur estimée de chaque position
+    def expandNodes(self, nodes):
+        self.stats.nodes += len(nodes)
+        if(self.cache is not None):
+            evaluations = self.cache.evaluateBatch([node.board for node in nodes], self.stats)
+            return [node.expandWithPriors(priors, v) for node, (priors, v) in zip(nodes, evaluations)]
+        boards = [node.board for node in nodes]
+        q = self.stats.predict(self.network, np.array([board.toNetworkInput() for board in boards]))
+        # Masquage et renormalisation de toutes les politiques en une seule opération
+        P = maskPolicy(q[0], legalMoveMasks(boards))
+        return [node.expandWithPriors(P[i, board.legalMoveIndices()], q[1][i][0])
+                for i, (node, board) in enumerate(zip(nodes, boards))]
+
+    # Méthode pour rétropropager la valeur d'une feuille jusqu'à la racine (itérative)
+    def backup(self, v, node):
+        while(node.parent is not None):
+            stats = node.parent.stats
+            i = node.index
+            n = stats[STAT_N, i] + 1  # Incrémenter le nombre de visites de l'arête
+            w = stats[STAT_W, i] + v  # Ajouter la valeur de récompense à la somme des récompenses
+            stats[STAT_N, i] = n
+            stats[STAT_W, i] = w
+            stats[STAT_Q, i] = w / n  # Calculer la valeur moyenne des récompenses
+            node = node.parent
+        edge = node.parentEdge
+        edge.N += 1
+        edge.W = edge.W + v
+        edge.Q = edge.W / edge.N
+
+    # Méthode pour ajouter (delta=1) ou retirer (delta=-1) une perte virtuelle sur le chemin d'une feuille
+    def applyVirtualLoss(self, node, delta):
+        self.pending += delta
+        while(node.parent is not None):
+            node.parent.stats[STAT_VN, node.index] += delta
+            node = node.parent
+        node.parentEdge.virtualN += delta
+
+    # Méthode pour sélectionner jusqu'à batchSize feuilles, les évaluer en un seul appel au réseau
+    # puis rétropropager leurs valeurs
+    def searchBatch(self, count):
+        selected = []
+        for i in range(0, count):
+            node = self.select(self.rootNode)
+            self.applyVirtualLoss(node, 1)
+            selected.append(node)
+        # Les feuilles non terminales (sans doublon) sont évaluées ensemble
+        pending = []
+        for node in selected:
+            if(self.terminalValue(node) is None and not any(node is p for p in pending)):
+                pending.append(node)
+        values = {}
+        if(len(pending) > 0):
+            for node, v in zip(pending, self.expandNodes(pending)):
+                values[id(node)] = v
+        for node in selected:
+            self.applyVirtualLoss(node, -1)
+            v = self.terminalValue(node)
+            if(v is None):
+                v = values[id(node)]
+            self.backup(v, node)
 
     # Méthode pour effectuer une recherche MCTS à partir d'un noeud racine donné
-    def search(self, rootNode):
-        self.rootNode = rootNode
-        _ = self.rootNode.expand(self.network)  # Étendre le noeud racine
-        for i in range(0,100):  # Effectuer un certain nombre d'itérations de recherche
-            selected_node = self.select(rootNode)  # Sélectionner un noeud à explorer
-            self.expandAndEvaluate(selected_node)  # Étendre ce noeud et évaluer ses enfants
-        N_sum = 0  # Initialisation de la somme des visites pour le calcul des probabilités
+    # Sans argument, la recherche reprend depuis la racine courante (par exemple après advance)
+    def search(self, rootNode=None):
+        start = time.perf_counter()
+        if(rootNode is not None):
+            self.rootNode = rootNode
+        rootNode = self.rootNode
+        if(self.cache is not None):
+            self.cache.checkVersion()  # Vider le cache si les poids du réseau ont changé
+        if(rootNode.moves is None):
+            _ = self.expandNodes([rootNode])  # Étendre le noeud racine s'il ne l'est pas déjà
+        if(self.batchSize <= 1):
+            for i in range(0,self.numPlayouts):  # Effectuer un certain nombre d'itérations de recherche
+                selected_node = self.select(rootNode)  # Sélectionner un noeud à explorer
+                self.expandAndEvaluate(selected_node)  # Étendre ce noeud et évaluer ses enfants
+        else:
+            done = 0
+            while(done < self.numPlayouts):
+                count = min(self.batchSize, self.numPlayouts - done)
+                self.searchBatch(count)
+                done += count
+        visits = rootNode.stats[STAT_N]
+        N_sum = int(visits.sum())  # Somme des visites pour le calcul des probabilités
         moveProbs = []  # Initialisation de la liste des probabilités de déplacement
-        for edge, _ in rootNode.childEdgeNode:
-            N_sum += edge.N  # Calcul de la somme des visites de toutes les arêtes enfants
-        for (edge, node) in rootNode.childEdgeNode:
-            prob = (edge.N ** (1 / self.tau)) / ((N_sum) ** (1/self.tau))  # Calcul des probabilités de déplacement normalisées
-            moveProbs.append((edge.move, prob, edge.N, edge.Q))  # Ajout des probabilités à la liste des probabilités de déplacement
-        return moveProbs  # Retourner la liste des probabilités de déplacement
\ No newline at end of file
+        for i, move in enumerate(rootNode.moves):
+            N = int(visits[i])
+            prob = (N ** (1 / self.tau)) / ((N_sum) ** (1/self.tau))  # Calcul des probabilités de déplacement normalisées
+            moveProbs.append((move, prob, N, float(rootNode.stats[STAT_Q, i])))  # Ajout des probabilités à la liste des probabilités de déplacement
+        self.stats.playouts += self.numPlayouts
+        self.stats.searchTime += time.perf_counter() - start
+        if(self.stats.hooks):
+            self.stats.emit("search")
+        return moveProbs  # Retourner la liste des probabilités de déplacement
+
+    # Méthode pour faire de l'enfant correspondant au coup joué la nouvelle racine
+    # Le sous-arbre de ce coup (statistiques et probabilités du réseau) est conservé pour la recherche suivante
+    def advance(self, move):
+        rootNode = self.rootNode
+        if(rootNode is None or rootNode.moves is None):
+            raise ValueError("advance called before search")
+        idx = rootNode.moves.index(move)
+        child = rootNode.child(idx)
+        rootEdge = Edge(None, None)
+        rootEdge.N = max(1, int(rootNode.stats[STAT_N, idx]))
+        rootEdge.W = float(rootNode.stats[STAT_W, idx])
+        rootEdge.Q = float(rootNode.stats[STAT_Q, idx])
+        child.parent = None
+        child.index = -1
+        child.parentEdge = rootEdge
+        self.rootNode = child
+        if(self.maxReusedNodes is not None):
+            self.prune(child, self.maxReusedNodes)
+        return child
+
+    # Méthode qui retourne le nombre de noeuds étendus à chaque profondeur sous la racine (largeur de l'arbre)
+    def treeWidths(self):
+        widths = []
+        level = [self.rootNode]
+        while(len(level) > 0):
+            expanded = [node for node in level if node is not None and node.moves is not None]
+            if(len(expanded) == 0):
+                break
+            widths.append(len(expanded))
+            level = [child for node in expanded for child in node.children]
+        return widths
+
+    # Méthode pour ne garder que les maxNodes premiers noeuds étendus (parcours en largeur)
+    # Les noeuds au-delà redeviennent des feuilles ; les statistiques de leurs arêtes sont conservées
+    def prune(self, rootNode, maxNodes):
+        queue = [rootNode]
+        kept = 0
+        head = 0
+        while(head < len(queue)):
+            node = queue[head]
+            head += 1
+            if(node.moves is None):
+                continue
+            if(kept >= maxNodes):
+                node.moves = None
+                node.children = None
+                node.stats = None
+                continue
+            kept += 1
+            for child in node.children:
+                if(child is not None):
+                    queue.append(child)
+        return kept
@@ -0,0 +1,205 @@
+# Apprentissage par renforcement en pipeline : auto-apprentissage et entraînement en même temps
+# Dans le notebook Chapitre 2, les dix parties d'une itération puis model.fit s'exécutent l'un après
+# l'autre. Ici, des processus producteurs jouent des parties sans arrêt (common.rnf_selfplay.playGame,
+# recherche common.rnf_mcts) avec les derniers poids publiés, pendant que l'entraîneur (le processus
+# principal) consomme leurs parties, entraîne le modèle Keras et publie un nouveau point de contrôle
+# toutes les publishEvery itérations. Les producteurs rechargent les poids dès qu'une nouvelle version
+# est publiée, sans redémarrer. Le temps d'une itération tend vers le plus long des deux étages.
+# Utilisation : python -m common.rnf_pipeline common/random_model.keras --iterations 11 --producers 2
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import time
+
+import numpy as np
+
+from common.np_network import NumpyNetwork
+from common.rnf_cache import EvaluationCache
+from common.rnf_selfplay import loadNetwork, playGame
+
+# Nom du point de contrôle publié pour les producteurs : fichier de poids plat (NumpyNetwork.save),
+# rechargé sans Keras en quelques millisecondes
+LATEST_CHECKPOINT = "model_latest.npw"
+
+
+# Travail d'un producteur : joue des parties avec la dernière version publiée des poids
+# version : multiprocessing.Value, incrémentée par l'entraîneur à chaque publication
+# Chaque partie est envoyée sous la forme (producteur, version des poids, positions, probabilités, valeurs)
+def producerWorker(workerId, checkpointPath, version, games, stop, seed, numPlayouts):
+    random.seed(seed)  # Départage des égalités dans MCTS.select
+    rng = np.random.default_rng(seed)
+    loaded = None
+    cache = None
+    while(not stop.is_set()):
+        current = version.value
+        if(current != loaded):
+            # Nouveaux poids : rechargement du réseau, le cache d'évaluations est vidé
+            network = loadNetwork(checkpointPath)
+            network.version = current
+            if(cache is None):
+                cache = EvaluationCache(network)
+            else:
+                cache.setNetwork(network)
+            loaded = current
+        game = (workerId, loaded) + playGame(network, rng, numPlayouts, cache=cache)
+        while(not stop.is_set()):
+            try:
+                games.put(game, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+
+
+class TrainingPipeline():
+
+    # model : modèle Keras compilé (architecture de common/init_random_model.py)
+    # checkpointDir : dossier du point de contrôle publié et des model_it{i}.keras
+    # gamesPerIteration, epochs, batchSize : comme la boucle du notebook (10 parties, 256 époques, lots de 16)
+    # publishEvery : nombre d'itérations d'entraînement entre deux publications des poids
+    # saveEvery : les poids de l'itération i sont aussi enregistrés dans model_it{i}.keras si i % saveEvery == 0
+    # maxQueuedGames : parties en attente au plus (les producteurs attendent au-delà, ce qui limite
+    # l'écart entre les poids utilisés pour jouer et ceux entraînés)
+    def __init__(self, model, checkpointDir=".", numProducers=None, gamesPerIteration=10, epochs=256,
+                 batchSize=16, publishEvery=1, saveEvery=10, numPlayouts=100, seed=0, maxQueuedGames=None):
+        if(numProducers is None):
+            numProducers = max(1, (os.cpu_count() or 2) - 1)  # Un coeur reste à l'entraîneur
+        if(maxQueuedGames is None):
+            maxQueuedGames = gamesPerIteration
+        self.model = model
+        self.checkpointDir = checkpointDir
+        self.numProducers = numProducers
+        self.gamesPerIteration = gamesPerIteration
+        self.epochs = epochs
+        self.batchSize = batchSize
+        self.publishEvery = publishEvery
+        self.saveEvery = saveEvery
+        self.numPlayouts = numPlayouts
+        self.seed = seed
+        # "spawn" comme pour common.rnf_selfplay
+        self.context = multiprocessing.get_context("spawn")
+        self.version = self.context.Value("i", 0)
+        self.games = self.context.Queue(maxQueuedGames)
+        self.stop = self.context.Event()
+        self.producers = []
+        self.iteration = 0
+        self.history = []  # Mesures de chaque itération (dictionnaires)
+        os.makedirs(checkpointDir, exist_ok=True)
+
+    def checkpointPath(self):
+        return os.path.join(self.checkpointDir, LATEST_CHECKPOINT)
+
+    # Publie les poids actuels : écriture dans un fichier temporaire puis remplacement atomique,
+    # les producteurs ne lisent jamais un fichier à moitié écrit
+    def publish(self):
+        path = self.checkpointPath()
+        temporary = path + ".tmp"
+        NumpyNetwork.fromKerasModel(self.model).save(temporary)
+        os.replace(temporary, path)
+        with self.version.get_lock():
+            self.version.value += 1
+
+    # Publie les poids initiaux et lance les producteurs
+    def start(self):
+        self.publish()
+        for workerId in range(0, self.numProducers):
+            process = self.context.Process(target=producerWorker,
+                                           args=(workerId, self.checkpointPath(), self.version, self.games,
+                                                 self.stop, self.seed + workerId, self.numPlayouts),
+                                           daemon=True)
+            process.start()
+            self.producers.append(process)
+
+    # Attend count parties ; retourne (positions, [probabilités, valeurs], versions des poids utilisés)
+    def collect(self, count):
+        positions = []
+        moveProbs = []
+        values = []
+        versions = []
+        for _ in range(0, count):
+            _, version, pos, probs, vals = self.games.get()
+            positions += pos
+            moveProbs += probs
+            values += vals
+            versions.append(version)
+        return np.array(positions), [np.array(moveProbs), np.array(values)], versions
+
+    # Une itération : parties produites pendant l'itération précédente, entraînement, publication
+    def step(self):
+        i = self.iteration
+        start = time.perf_counter()
+        x, y, versions = self.collect(self.gamesPerIteration)
+        waited = time.perf_counter() - start
+        self.model.fit(x, y, epochs=self.epochs, batch_size=self.batchSize, verbose=0)
+        trained = time.perf_counter() - start - waited
+        if((i + 1) % self.publishEvery == 0):
+            self.publish()
+        if(i % self.saveEvery == 0):
+            self.model.save(os.path.join(self.checkpointDir, "model_it" + str(i) + ".keras"))
+        record = {"iteration": i, "positions": len(x), "waitTime": waited, "fitTime": trained,
+                  "totalTime": time.perf_counter() - start, "publishedVersion": self.version.value,
+                  "gameVersions": sorted(set(versions))}
+        self.history.append(record)
+        self.iteration += 1
+        return record
+
+    def run(self, iterations):
+        if(len(self.producers) == 0):
+            self.start()
+        for _ in range(0, iterations):
+            self.step()
+        return self.history
+
+    # Arrête les producteurs (les parties en attente sont abandonnées)
+    def close(self):
+        self.stop.set()
+        while(True):
+            try:
+                self.games.get_nowait()
+            except queue.Empty:
+                break
+        for process in self.producers:
+            process.join(5)
+            if(process.is_alive()):
+                process.terminate()
+        self.producers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipelined hexapawn self-play and training")
+    parser.add_argument("model", help="initial model file (.keras)")
+    parser.add_argument("--output-dir", default=".", help="directory for the checkpoints")
+    parser.add_argument("--iterations", type=int, default=11)
+    parser.add_argument("--producers", type=int, default=None)
+    parser.add_argument("--games", type=int, default=10, help="games per training iteration")
+    parser.add_argument("--epochs", type=int, default=256)
+    parser.add_argument("--publish-every", type=int, default=1, help="training iterations between weight updates")
+    parser.add_argument("--save-every", type=int, default=10)
+    parser.add_argument("--playouts", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import keras
+    model = keras.models.load_model(args.model)
+    start = time.perf_counter()
+    with TrainingPipeline(model, args.output_dir, args.producers, args.games, args.epochs,
+                          publishEvery=args.publish_every, saveEvery=args.save_every, numPlayouts=args.playouts,
+                          seed=args.seed) as pipeline:
+        pipeline.start()
+        for _ in range(0, args.iterations):
+            r = pipeline.step()
+            print("iteration " + str(r["iteration"]) + ": " + str(r["positions"]) + " positions (weights "
+                  + str(r["gameVersions"]) + "), waited " + str(round(r["waitTime"], 2)) + " s, fit "
+                  + str(round(r["fitTime"], 2)) + " s")
+    print(str(args.iterations) + " iterations in " + str(round(time.perf_counter() - start, 2)) + " s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# Tampon de rejeu (replay buffer) sur disque pour l'apprentissage par renforcement
+# Les positions (21 entrées), probabilités de coups (28 sorties) et valeurs sont rangées dans des
+# shards de taille fixe projetés en mémoire (np.memmap). Seules les windowSize positions les plus
+# récentes sont conservées : les shards plus anciens sont supprimés. Les mini-lots sont tirés
+# directement dans les fichiers, sans tout charger en mémoire, et l'état est enregistré dans
+# buffer.json pour qu'un entraînement interrompu reprenne sur le même tampon.
+import glob
+import json
+import os
+
+import numpy as np
+
+from common.game import mirrorTrainingData
+
+# Nom, largeur et type de chaque tableau d'un shard
+FIELDS = (("positions", 21, np.float32), ("moveprobs", 28, np.float32), ("outcomes", 1, np.float32))
+
+METADATA_FILE = "buffer.json"
+
+
+class ReplayBuffer():
+
+    def __init__(self, directory, windowSize=100000, shardSize=4096):
+        self.directory = directory
+        self.windowSize = windowSize
+        self.shardSize = shardSize
+        self.shards = []  # Liste de [identifiant du shard, nombre de positions écrites]
+        self.nextShardId = 0
+        self.maps = {}  # Tableaux projetés en mémoire ouverts, par identifiant de shard
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, METADATA_FILE)
+        if(os.path.exists(path)):
+            # Reprise d'un tampon existant
+            with open(path) as f:
+                metadata = json.load(f)
+            if(metadata["shardSize"] != shardSize):
+                raise ValueError("existing buffer uses shardSize " + str(metadata["shardSize"]))
+            self.shards = [list(s) for s in metadata["shards"]]
+            self.nextShardId = metadata["nextShardId"]
+
+    # Nombre de positions disponibles pour l'échantillonnage (au plus windowSize)
+    def __len__(self):
+        return min(self.windowSize, self.total())
+
+    # Nombre de positions contenues dans les shards conservés
+    def total(self):
+        return sum(count for (_, count) in self.shards)
+
+    # Chemin du fichier d'un tableau d'un shard
+    def shardPath(self, shardId, name):
+        return os.path.join(self.directory, "buffer_" + str(shardId).zfill(6) + "_" + name + ".npy")
+
+    # Tableaux (positions, moveprobs, outcomes) d'un shard, créés si besoin
+    def shardArrays(self, shardId, create=False):
+        arrays = self.maps.get(shardId)
+        if(arrays is None):
+            arrays = []
+            for (name, width, dtype) in FIELDS:
+                path = self.shardPath(shardId, name)
+                if(create):
+                    arrays.append(np.lib.format.open_memmap(path, mode="w+", dtype=dtype,
+                                                            shape=(self.shardSize, width)))
+                else:
+                    arrays.append(np.load(path, mmap_mode="r+"))
+            self.maps[shardId] = arrays
+        return arrays
+
+    # Ajoute les données d'une ou plusieurs parties (listes ou tableaux de même longueur)
+    def add(self, positions, moveProbs, values):
+        data = (np.asarray(positions, dtype=np.float32).reshape(-1, 21),
+                np.asarray(moveProbs, dtype=np.float32).reshape(-1, 28),
+                np.asarray(values, dtype=np.float32).reshape(-1, 1))
+        count = len(data[0])
+        if(len(data[1]) != count or len(data[2]) != count):
+            raise ValueError("positions, moveProbs and values must have the same length")
+        written = 0
+        while(written < count):
+            if(len(self.shards) == 0 or self.shards[-1][1] == self.shardSize):
+                self.shards.append([self.nextShardId, 0])
+                self.shardArrays(self.nextShardId, create=True)
+                self.nextShardId += 1
+            shard = self.shards[-1]
+            arrays = self.shardArrays(shard[0])
+            n = min(count - written, self.shardSize - shard[1])
+            for array, rows in zip(arrays, data):
+                array[shard[1]:shard[1] + n] = rows[written:written + n]
+            shard[1] += n
+            written += n
+        self.evict()
+        self.flush()
+
+    # Ajoute les shards écrits par common.rnf_selfplay dans un dossier
+    def addSelfPlayShards(self, shardDir):
+        for path in sorted(glob.glob(os.path.join(shardDir, "shard_*_positions.npy"))):
+            prefix = path[:-len("positions.npy")]
+            self.add(np.load(path), np.load(prefix + "moveprobs.npy"), np.load(prefix + "outcomes.npy"))
+
+    # Supprime les shards les plus anciens qui sont entièrement sortis de la fenêtre
+    def evict(self):
+        while(len(self.shards) > 1 and self.total() - self.shards[0][1] >= self.windowSize):
+            shardId, _ = self.shards.pop(0)
+            self.maps.pop(shardId, None)
+            for (name, _, _) in FIELDS:
+                path = self.shardPath(shardId, name)
+                if(os.path.exists(path)):
+                    os.remove(path)
+
+    # Écrit les données sur disque et enregistre l'état du tampon
+    def flush(self):
+        for arrays in self.maps.values():
+            for array in arrays:
+                array.flush()
+        metadata = {"shardSize": self.shardSize, "shards": self.shards, "nextShardId": self.nextShardId}
+        path = os.path.join(self.directory, METADATA_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(metadata, f)
+        os.replace(path + ".tmp", path)
+
+    # Tire batchSize positions au hasard parmi les windowSize plus récentes
+    # Retourne (positions, [probabilités de coups, valeurs]) comme attendu par model.fit
+    # mirror : chaque position tirée est remplacée une fois sur deux par son image par symétrie
+    # gauche-droite (augmentation des données, le tampon ne stocke qu'une orientation)
+    def sample(self, batchSize, rng=None, mirror=False):
+        if(rng is None):
+            rng = np.random.default_rng()
+        total = self.total()
+        size = len(self)
+        if(size == 0):
+            raise ValueError("replay buffer is empty")
+        # Indices globaux dans [total - size, total), puis conversion en (shard, ligne)
+        indices = np.sort(rng.integers(total - size, total, batchSize))
+        ends = np.cumsum([count for (_, count) in self.shards])
+        shardIndices = np.searchsorted(ends, indices, side="right")
+        starts = ends - np.array([count for (_, count) in self.shards])
+        batch = [np.empty((batchSize, width), dtype=dtype) for (_, width, dtype) in FIELDS]
+        for s in np.unique(shardIndices):
+            mask = shardIndices == s
+            rows = indices[mask] - starts[s]
+            for out, array in zip(batch, self.shardArrays(self.shards[s][0])):
+                out[mask] = array[rows]
+        positions, moveProbs, values = batch
+        if(mirror):
+            flip = rng.random(batchSize) < 0.5
+            positions[flip], moveProbs[flip] = mirrorTrainingData(positions[flip], moveProbs[flip])
+        return positions, [moveProbs, values[:, 0]]
+
+    # Générateur de mini-lots pour model.fit (numBatches=None : sans fin)
+    def batches(self, batchSize=16, numBatches=None, rng=None, mirror=False):
+        if(rng is None):
+            rng = np.random.default_rng()
+        produced = 0
+        while(numBatches is None or produced < numBatches):
+            positions, targets = self.sample(batchSize, rng, mirror)
+            yield positions, tuple(targets)
+            produced += 1
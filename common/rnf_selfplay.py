@@ -0,0 +1,169 @@
+# Parties d'auto-apprentissage (self-play) pour hexapawn, en parallèle sur plusieurs processus
+# Chaque processus charge le modèle une seule fois, joue ses parties avec sa propre graine
+# et écrit ses données dans ses propres fichiers (shards), au même format que
+# positions.npy / moveprobs.npy / outcomes.npy. mergeShards réunit ensuite les shards.
+# Utilisation : python -m common.rnf_selfplay modèle.keras dossier --games 100 --workers 4
+import argparse
+import glob
+import multiprocessing
+import os
+import random
+import time
+
+import numpy as np
+
+import common.rnf_mcts as rnf_mcts
+from common.game import Board
+from common.rnf_cache import EvaluationCache
+
+# Noms des trois tableaux écrits pour chaque shard
+DATA_NAMES = ("positions", "moveprobs", "outcomes")
+
+
+# Méthode pour jouer une partie et collecter les données d'apprentissage (comme ReinfLearn.playGame)
+# rng : générateur NumPy utilisé pour tirer les coups selon les probabilités de la recherche
+# cache : EvaluationCache partagé entre les parties (None : chaque position est évaluée par le réseau)
+def playGame(network, rng=None, numPlayouts=100, reuseTree=True, cache=None):
+    if(rng is None):
+        rng = np.random.default_rng()
+    positionsData = []
+    moveProbsData = []
+    valuesData = []
+
+    g = Board()
+    g.setStartingPosition()
+    rootEdge = rnf_mcts.Edge(None, None)
+    rootEdge.N = 1
+    mctsSearcher = rnf_mcts.MCTS(network, cache=cache)
+    mctsSearcher.numPlayouts = numPlayouts
+    mctsSearcher.rootNode = rnf_mcts.Node(g.copy(), rootEdge)
+
+    while(not g.isTerminal()[0]):
+        positionsData.append(g.toNetworkInput())
+        moveProbs = mctsSearcher.search()
+        # Vecteur de sortie sur les 28 coups, les coups illégaux ont une probabilité nulle
+        outputVec = [0.0 for x in range(0, 28)]
+        for (move, prob, _, _) in moveProbs:
+            outputVec[g.getNetworkOutputIndex(move)] = prob
+        # Le coup joué est tiré selon la distribution donnée par la recherche
+        idx = np.where(rng.multinomial(1, outputVec) == 1)[0][0]
+        nextMove = None
+        for move, _, _, _ in moveProbs:
+            if(g.getNetworkOutputIndex(move) == idx):
+                nextMove = move
+        if(g.turn == Board.WHITE):
+            valuesData.append(1)
+        else:
+            valuesData.append(-1)
+        moveProbsData.append(outputVec)
+        g.applyMove(nextMove)
+        if(reuseTree):
+            mctsSearcher.advance(nextMove)
+        else:
+            rootEdge = rnf_mcts.Edge(None, None)
+            rootEdge.N = 1
+            mctsSearcher.rootNode = rnf_mcts.Node(g.copy(), rootEdge)
+
+    # Le résultat final est propagé à toutes les positions de la partie
+    _, winner = g.isTerminal()
+    for i in range(0, len(moveProbsData)):
+        if(winner == Board.BLACK):
+            valuesData[i] = valuesData[i] * -1.0
+        if(winner == Board.WHITE):
+            valuesData[i] = valuesData[i] * 1.0
+    return (positionsData, moveProbsData, valuesData)
+
+
+# Chargement du réseau utilisé par un processus
+def loadNetwork(modelPath):
+    from common.np_network import NumpyNetwork
+    return NumpyNetwork.load(modelPath)
+
+
+# Chemin du fichier d'un tableau d'un shard
+def shardPath(outputDir, workerId, name):
+    return os.path.join(outputDir, "shard_" + str(workerId).zfill(3) + "_" + name + ".npy")
+
+
+# Travail d'un processus : charge le modèle, joue ses parties et écrit son shard
+def selfPlayWorker(task):
+    workerId, modelPath, numGames, seed, outputDir, numPlayouts = task
+    random.seed(seed)  # Départage des égalités dans MCTS.select
+    rng = np.random.default_rng(seed)
+    network = loadNetwork(modelPath)
+    cache = EvaluationCache(network)  # Un cache par processus, partagé par toutes ses parties
+    positions = []
+    moveProbs = []
+    outcomes = []
+    start = time.perf_counter()
+    for _ in range(0, numGames):
+        pos, probs, values = playGame(network, rng, numPlayouts, cache=cache)
+        positions += pos
+        moveProbs += probs
+        outcomes += values
+    elapsed = time.perf_counter() - start
+    arrays = (np.array(positions, dtype=np.int32).reshape(-1, 21),
+              np.array(moveProbs, dtype=np.float64).reshape(-1, 28),
+              np.array(outcomes, dtype=np.float64))
+    for name, array in zip(DATA_NAMES, arrays):
+        np.save(shardPath(outputDir, workerId, name), array)
+    return workerId, numGames, len(positions), elapsed
+
+
+# Lance numWorkers processus qui se partagent numGames parties
+# Le processus i utilise la graine seed + i : deux lancements identiques donnent les mêmes shards
+def runSelfPlay(modelPath, outputDir, numGames, numWorkers=None, seed=0, numPlayouts=100):
+    if(numWorkers is None):
+        numWorkers = os.cpu_count() or 1
+    os.makedirs(outputDir, exist_ok=True)
+    tasks = []
+    for workerId in range(0, numWorkers):
+        games = numGames // numWorkers + (1 if workerId < numGames % numWorkers else 0)
+        if(games > 0):
+            tasks.append((workerId, modelPath, games, seed + workerId, outputDir, numPlayouts))
+    if(len(tasks) == 1):
+        return [selfPlayWorker(tasks[0])]
+    # "spawn" : TensorFlow/JAX ne supportent pas d'être utilisés dans un processus obtenu par fork
+    with multiprocessing.get_context("spawn").Pool(len(tasks)) as pool:
+        return pool.map(selfPlayWorker, tasks)
+
+
+# Réunit les shards d'un dossier en positions.npy / moveprobs.npy / outcomes.npy
+# Les shards sont concaténés dans l'ordre des identifiants de processus
+def mergeShards(shardDir, outputDir=None):
+    if(outputDir is None):
+        outputDir = shardDir
+    merged = []
+    for name in DATA_NAMES:
+        paths = sorted(glob.glob(os.path.join(shardDir, "shard_*_" + name + ".npy")))
+        if(len(paths) == 0):
+            raise FileNotFoundError("no " + name + " shards in " + shardDir)
+        array = np.concatenate([np.load(path) for path in paths])
+        np.save(os.path.join(outputDir, name + ".npy"), array)
+        merged.append(array)
+    return tuple(merged)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel hexapawn self-play")
+    parser.add_argument("model", help="model file (.keras)")
+    parser.add_argument("output", help="directory for the shard files")
+    parser.add_argument("--games", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--playouts", type=int, default=100)
+    parser.add_argument("--merge", action="store_true", help="merge the shards once all games are played")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = runSelfPlay(args.model, args.output, args.games, args.workers, args.seed, args.playouts)
+    elapsed = time.perf_counter() - start
+    positions = sum(r[2] for r in results)
+    print(str(args.games) + " games, " + str(positions) + " positions on " + str(len(results))
+          + " workers in " + str(round(elapsed, 2)) + " s (" + str(round(args.games / elapsed, 2)) + " games/s)")
+    if(args.merge):
+        mergeShards(args.output)
+
+
+if __name__ == "__main__":
+    main()
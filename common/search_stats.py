@@ -0,0 +1,81 @@
+# Statistiques structurées des recherches (alpha-beta d'échecs, minimax et MCTS de hexapawn)
+# Chaque recherche reçoit (ou crée) une instance de SearchStats et y compte ses noeuds, coupures,
+# consultations de table ou de cache et appels au réseau. Les crochets (hooks) sont optionnels :
+# sans crochet enregistré, les moteurs ne testent qu'un dictionnaire vide.
+# Pour un journal par coup : stats.toDict() donne un dictionnaire sérialisable en JSON.
+import time
+
+
+class SearchStats():
+
+    def __init__(self):
+        self.hooks = {}  # Événement -> liste de fonctions appelées avec (stats, **données)
+        self.reset()
+
+    # Remet les compteurs à zéro (les crochets sont conservés)
+    def reset(self):
+        self.nodes = 0  # Noeuds explorés (alpha-beta, minimax) ou étendus (MCTS)
+        self.cutoffs = 0  # Coupures alpha-bêta
+        self.ttProbes = 0  # Consultations de la table de transposition
+        self.ttHits = 0  # Consultations dont le résultat a suffi sans explorer le noeud
+        self.cacheHits = 0  # Évaluations servies par le cache d'évaluations
+        self.cacheMisses = 0
+        self.networkCalls = 0  # Appels à network.predict
+        self.networkPositions = 0  # Positions évaluées par ces appels
+        self.networkTime = 0.0  # Temps passé dans network.predict (secondes)
+        self.searchTime = 0.0  # Temps total de la recherche (secondes)
+        self.depth = 0  # Dernière profondeur terminée (alpha-beta) ou profondeur de l'arbre (MCTS)
+        self.depthTimes = {}  # Profondeur -> temps passé sur cette itération (alpha-beta)
+        self.playouts = 0  # Playouts MCTS
+
+    # Enregistre une fonction appelée à chaque événement :
+    #   "iteration" (alpha-beta, profondeur terminée) : depth, move, value
+    #   "predict" (MCTS, appel au réseau) : positions, seconds
+    #   "search" (fin d'une recherche) : aucune donnée
+    def addHook(self, event, callback):
+        self.hooks.setdefault(event, []).append(callback)
+
+    def removeHooks(self, event=None):
+        if(event is None):
+            self.hooks.clear()
+        else:
+            self.hooks.pop(event, None)
+
+    def emit(self, event, **data):
+        for callback in self.hooks.get(event, ()):
+            callback(self, **data)
+
+    # Appel au réseau chronométré et compté
+    def predict(self, network, x):
+        start = time.perf_counter()
+        q = network.predict(x)
+        elapsed = time.perf_counter() - start
+        self.networkCalls += 1
+        self.networkPositions += len(x)
+        self.networkTime += elapsed
+        if(self.hooks):
+            self.emit("predict", positions=len(x), seconds=elapsed)
+        return q
+
+    # Ajoute les compteurs d'une autre instance (par exemple celle d'un processus)
+    def merge(self, other):
+        for name in ("nodes", "cutoffs", "ttProbes", "ttHits", "cacheHits", "cacheMisses", "networkCalls",
+                     "networkPositions", "networkTime", "searchTime", "playouts"):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        self.depth = max(self.depth, other.depth)
+        for depth, seconds in other.depthTimes.items():
+            self.depthTimes[depth] = self.depthTimes.get(depth, 0.0) + seconds
+
+    # Les crochets ne sont pas transmis d'un processus à l'autre
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["hooks"] = {}
+        return state
+
+    def toDict(self):
+        result = {name: value for name, value in self.__dict__.items() if name != "hooks"}
+        result["depthTimes"] = {str(depth): seconds for depth, seconds in self.depthTimes.items()}
+        if(self.searchTime > 0):
+            result["nodesPerSecond"] = self.nodes / self.searchTime
+            result["treeTime"] = self.searchTime - self.networkTime  # Temps hors appels au réseau
+        return result
@@ -0,0 +1,68 @@
+# Parité de common.np_network.NumpyNetwork avec keras predict, sur le modèle de common/init_random_model.py
+# Aucun fichier n'est nécessaire : le modèle est construit avec une graine fixe et évalué sur toutes les
+# positions non terminales de hexapawn, en lot et une par une.
+# Utilisation : python -m unittest tests.test_np_network (ou python -m pytest tests)
+import importlib.util
+import os
+import unittest
+
+import numpy as np
+
+# Keras utilise tensorflow par défaut : sans tensorflow, le premier autre moteur installé est choisi
+if("KERAS_BACKEND" not in os.environ and importlib.util.find_spec("tensorflow") is None):
+    for backend in ("jax", "torch"):
+        if(importlib.util.find_spec(backend) is not None):
+            os.environ["KERAS_BACKEND"] = backend
+            break
+
+try:
+    import keras
+except ImportError:
+    keras = None
+
+from common.game import Board
+from common.mnx_dataset import reachablePositions
+from common.np_network import NumpyNetwork
+
+# Tolérance sur l'écart maximal entre les sorties Keras et NumPy (calcul en float32)
+TOLERANCE = 1e-5
+
+
+@unittest.skipIf(keras is None, "keras is not available")
+class NumpyNetworkParityTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        from common.init_random_model import buildModel
+        keras.utils.set_random_seed(0)
+        cls.model = buildModel()
+        cls.network = NumpyNetwork.fromKerasModel(cls.model)
+        boards = [board for board in reachablePositions() if not board.isTerminal()[0]]
+        cls.positions = np.array([board.toNetworkInput() for board in boards], dtype=np.float32)
+
+    def assertParity(self, kerasOutputs, numpyOutputs):
+        for expected, actual in zip(kerasOutputs, numpyOutputs):
+            self.assertEqual(np.shape(expected), np.shape(actual))
+            self.assertLessEqual(float(np.max(np.abs(np.asarray(expected) - actual))), TOLERANCE)
+
+    def test_batch(self):
+        self.assertParity(self.model.predict(self.positions, verbose=0), self.network.predict(self.positions))
+
+    def test_single_positions(self):
+        for position in self.positions[:10]:
+            x = position[np.newaxis, :]
+            kerasPolicy, kerasValue = self.model.predict(x, verbose=0)
+            self.assertParity((kerasPolicy, kerasValue), self.network.predict(x))
+            # Vecteur de 21 entrées : même résultat que la ligne correspondante d'un lot
+            policy, value = self.network.evaluate(position)
+            self.assertParity((kerasPolicy[0], kerasValue[0][0]), (policy, value))
+
+    def test_starting_position(self):
+        board = Board()
+        board.setStartingPosition()
+        x = np.array([board.toNetworkInput()], dtype=np.float32)
+        self.assertParity(self.model.predict(x, verbose=0), self.network.predict(x))
+
+
+if __name__ == "__main__":
+    unittest.main()